@@ -1,63 +1,69 @@
 import pygame as pg
 import sys
-import json
 from os import path
 from math import sqrt
-from time import perf_counter
 from datetime import datetime
 from consts import *
 from funcs import *
 from Button import *
+from engine import HexEngine
+import cpu_worker
+import perf_log
 from complexity_stats_ui import show_complexity_stats_window
 
-LOG_FILE = 'cpu_performance_log.json'
-
-def _append_performance_log(strategy, avg_execution_time, moves_count):
-    """Append a per-session performance log entry. Create file if missing, append only."""
-    try:
-        if path.exists(LOG_FILE):
-            with open(LOG_FILE, 'r') as f:
-                data = json.load(f)
-        else:
-            data = []
-        if not isinstance(data, list):
-            data = []
-    except (json.JSONDecodeError, IOError):
-        data = []
+def _append_performance_log(strategy, avg_execution_time, moves_count, board_size, counts=None):
+    """Queue a per-session performance log entry; perf_log appends it in the background."""
     entry = {
         "strategy": strategy,
         "avg_execution_time": round(avg_execution_time, 6),
         "session_timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "moves_count": moves_count,
+        "board_size": board_size,
     }
-    data.append(entry)
-    try:
-        with open(LOG_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-    except IOError:
-        # Logging must never break the game.
-        pass
-
-class Game:
+    if counts is not None:
+        # session totals of the instrumented moves (see counters.py)
+        entry["counters"] = counts
+    perf_log.append(entry)
+
+# pre-rendered hexagon tiles by (colour, tile size), board layers by (size, tile size, background)
+_HEX_SPRITES = {}
+_BOARD_LAYERS = {}
+
+
+def _hexSprite(col, a):
+    '''a hexagon of circumradius a with the board outline, on a transparent surface'''
+    sprite = _HEX_SPRITES.get((col, a))
+    if sprite is None:
+        # integer centre so a blit at an integer offset matches drawHex at coords()
+        pad = 3
+        cx, cy = int(a) + pad, int(a*sqrt(3)/2) + pad
+        sprite = pg.Surface((2*cx + 1, 2*cy + 1), pg.SRCALPHA)
+        drawHex(sprite, col, LIGHTYELLOW, (cx, cy), a)
+        _HEX_SPRITES[(col, a)] = sprite
+    return sprite
+
+
+class Game(HexEngine):
+    '''pygame UI on top of the headless HexEngine'''
     def __init__(self, size):
         pg.init()
         self.screen = pg.display.set_mode((W, H))
         self.clock = pg.time.Clock()
-        self.size = size
+        # CPU moves are searched by cpu_worker, whose engine uses the worker pool
+        HexEngine.__init__(self, size)
+        cpu_worker.start()
+        # shown in the status line when the worker could not answer
+        self.cpu_error = None
         self.setTileSize()
-        self.state = [[0 for _ in range(self.size)] for __ in range(self.size)]
         self.origin = Point(W/2 - (H/2-50)/sqrt(3), 50)
-        self.move = 1
         self.started = False
         self.bg_color = BLACK
-        self.ai_mode = 'Greedy'  # Default AI mode: 'Greedy', 'D&C', or 'DP'
-        # Per-session CPU timing (seconds) by strategy
-        self.session_times = {
-            'Greedy': [],
-            'D&C': [],
-            'DP': [],
-            'Backtracking': []
-        }
+        # empty cell under the mouse, drawn in the colour of the player to move
+        self.hover = None
+        # cells to redraw on the next frame (see renderBoard)
+        self.dirty = set()
+        self.full_redraw = True
+        self._cell_rects_key = None
 
     def loadData(self):
         '''load all the data (images, files, etc)'''
@@ -85,902 +91,195 @@ class Game:
         y = self.origin.y + (c+2*r)*self.tile_size*sqrt(3)/2
         return int(x), int(y)
 
+    def cellAt(self, pos):
+        '''
+        grid coordinates (r, c) of the hexagon under the pixel pos, or None.
+        Inverts coords: c and r are the axial coordinates of the hexagon,
+        so one cube rounding step finds the nearest centre.
+        '''
+        a = self.tile_size
+        q = (pos[0] - self.origin.x) / (3/2*a)
+        r = (pos[1] - self.origin.y) / (a*sqrt(3)) - q/2
+        s = -q - r
+        rq, rr, rs = round(q), round(r), round(s)
+        dq, dr, ds = abs(rq - q), abs(rr - r), abs(rs - s)
+        # the coordinate that moved most is recomputed from the other two
+        if dq > dr and dq > ds:
+            rq = -rr - rs
+        elif dr > ds:
+            rr = -rq - rs
+        if 0 <= rr < self.size and 0 <= rq < self.size:
+            return rr, rq
+        return None
+
     def tick(self, pos):
         '''is called if mouse pressed, changes the state of the game (only for human player 1)'''
         # Only allow human to move when it's player 1's turn (Green)
         if self.move != 1:
             return
-        
-        for r in range(self.size):
-            for c in range(self.size):
-                x, y = self.coords(r, c)
-                if inHex(pos, x, y, self.tile_size) and self.state[r][c] != 2\
-                                                    and self.state[r][c] != 1:
-                    self.state[r][c] = self.move
-                    self.move = 3-self.move
-
-    def highlight(self, pos):
-        '''highlights the hexagon that is under the mouse'''
-        for r in range(self.size):
-            for c in range(self.size):
-                x, y = self.coords(r, c)
-                if self.state[r][c] == 0 and inHex(pos, x, y, self.tile_size):
-                    self.state[r][c] = self.move + 2
-                elif self.state[r][c] > 2 and not inHex(pos, x, y, self.tile_size):
-                    self.state[r][c] = 0
-
-    def showGrid(self):
-        '''shows hexagonal grid as well as players moves and destination sides'''
-        # draw bounds
-        A = (self.origin.x-self.tile_size, self.origin.y-self.tile_size*sqrt(3))
-        B = (self.origin.x-self.tile_size/2*(1-3*self.size),\
-             self.origin.y+self.tile_size*sqrt(3)/2*(self.size-2)+self.tile_size*sqrt(3)/6)
-        C = (self.origin.x-self.tile_size/2*(1-3*self.size), self.origin.y+self.tile_size*sqrt(3)/2*(2*self.size+self.size-1))
-        D = (self.origin.x-self.tile_size, self.origin.y+self.tile_size*sqrt(3)*(self.size-1/2)-self.tile_size*sqrt(3)/6)
-        M = ((A[0]+B[0])/2, (B[1]+C[1])/2)
-        pg.draw.polygon(self.screen, GREEN, [A, B, M])
-        pg.draw.polygon(self.screen, GREEN, [C, D, M])
-        pg.draw.polygon(self.screen, BLUE, [B, C, M])
-        pg.draw.polygon(self.screen, BLUE, [D, A, M])
-        for r in range(self.size):
-            for c in range(self.size):
-                x, y = self.coords(r, c)
-                # draw a tile
-                #self.screen.blit(self.tile_img, (x-self.tile_size, y-self.tile_size))
-                # draw players
-                if self.state[r][c] == 1:
-                    drawHex(self.screen, GREEN, LIGHTYELLOW, (x, y), self.tile_size)
-                elif self.state[r][c] == 2:
-                    drawHex(self.screen, BLUE, LIGHTYELLOW, (x, y), self.tile_size)
-                elif self.state[r][c] == 3:
-                    drawHex(self.screen, LIGHTGREEN, LIGHTYELLOW, (x, y), self.tile_size)
-                elif self.state[r][c] == 4:
-                    drawHex(self.screen, LIGHTBLUE, LIGHTYELLOW, (x, y), self.tile_size)
-                else:
-                    drawHex(self.screen, DARKRED, LIGHTYELLOW, (x, y), self.tile_size)
+        cell = self.cellAt(pos)
+        if cell is not None and self.state[cell[0]][cell[1]] == 0:
+            r, c = cell
+            self.placeStone(r, c, self.move)
+            self.move = 3-self.move
 
-    def checkWin(self):
-        '''checks if any of the players have won using Dijkstra's algorithm'''
-        from funcs import dijkstra_check_win
-        
-        # Check if player 2 (Blue) has won - connects left to right
-        if dijkstra_check_win(self.state, 2):
-            return 2
-        
-        # Check if player 1 (Green) has won - connects top to bottom
-        if dijkstra_check_win(self.state, 1):
-            return 1
-        
-        return 0
-
-    def estimateWinningDistance(self):
+    def requestCpuMove(self):
         '''
-        Uses Dijkstra's algorithm to estimate which player is closer to winning.
-        Models the game as a graph where each hex cell is a node.
-        Returns tuple (player1_distance, player2_distance) where:
-        - player1_distance: minimum moves needed for Green to connect top to bottom
-        - player2_distance: minimum moves needed for Blue to connect left to right
-        Lower distance means closer to winning.
+        starts the CPU move in the background worker; book moves are answered
+        in-process, they take microseconds. Without a worker only a proven
+        endgame win (bounded by endgame_budget_ms) is played in-process: a
+        search here would freeze the window, so the player retries by clicking
         '''
-        from funcs import estimate_winning_chance
-        return estimate_winning_chance(self.state)
+        self.cpu_error = None
+        if self.bookMove() is not None:
+            self.cpuMove()
+        elif not cpu_worker.submit(self) and not self.cpuMove(search=False):
+            self.cpu_error = 'CPU could not move - click to retry'
+
+    def thinking(self):
+        '''True while the background worker searches for the CPU move'''
+        return cpu_worker.busy()
+
+    def pollCpuMove(self):
+        '''plays the CPU move once the worker has answered; called every frame'''
+        result = cpu_worker.poll()
+        if result is None:
+            return
+        move, elapsed, stats, counts = result
+        if move is None:
+            # a search here would freeze the window; the player retries by clicking
+            self.cpu_error = 'CPU could not move - click to retry'
+            return
+        r, c = move
+        self.placeStone(r, c, 2)
+        self.move = 1
+        self.last_search_stats = stats
+        strategy = self.ai_mode if self.ai_mode in STRATEGIES else 'Greedy'
+        self.recordMove(strategy, elapsed, counts)
 
-    def cpuMove(self):
-        '''
-        CPU (Player 2, Blue) makes a move using the selected AI strategy.
-        '''
-        strategy = self.ai_mode if self.ai_mode in ('Greedy', 'D&C', 'DP', 'Backtracking') else 'Greedy'
-        start = perf_counter()
-        if self.ai_mode == 'Greedy':
-            self._cpuMoveGreedy()
-        elif self.ai_mode == 'D&C':
-            self._cpuMoveDivideConquer()
-        elif self.ai_mode == 'DP':
-            self._cpuMoveDynamicProgramming()
-        elif self.ai_mode == 'Backtracking':
-            self._cpuMoveBacktracking()
-        else:  # Default fallback to Greedy
-            self._cpuMoveGreedy()
-        end = perf_counter()
-        # Record per-move time in current session; actual log entry is per session at game over.
-        try:
-            self.session_times.setdefault(strategy, []).append(end - start)
-        except AttributeError:
-            self.session_times = {s: [] for s in ('Greedy', 'D&C', 'DP', 'Backtracking')}
-            self.session_times[strategy].append(end - start)
-    
-    def _cpuMoveGreedy(self):
+    def cancelCpuMove(self):
+        '''stops a running CPU search; returns True if there was one'''
+        return cpu_worker.cancel()
+
+    def highlight(self, pos):
         '''
-        Greedy AI: Uses Dijkstra's algorithm (a greedy algorithm) to find optimal moves.
-        Strategy: 
-        1. If CPU can win immediately, do it
-        2. If human is close to winning, prioritize blocking
-        3. Otherwise, balance winning and blocking
+        highlights the empty hexagon that is under the mouse; the hover cell is
+        kept in self.hover, not in the board. Returns the cells whose look changed
         '''
-        # Find all empty cells
-        empty_cells = []
+        cell = self.cellAt(pos)
+        if cell is not None and self.state[cell[0]][cell[1]] != 0:
+            cell = None
+        if cell == self.hover:
+            return []
+        changed = [c for c in (self.hover, cell) if c is not None]
+        self.hover = cell
+        for r, c in changed:
+            self.markDirty(r, c)
+        return changed
+
+    def _boardLayer(self):
+        '''background, border triangles and empty hexagons, rendered once per board and tile size'''
+        key = (self.size, self.tile_size, self.bg_color)
+        layer = _BOARD_LAYERS.get(key)
+        if layer is None:
+            layer = pg.Surface((W, H))
+            layer.fill(self.bg_color)
+            # draw bounds
+            A = (self.origin.x-self.tile_size, self.origin.y-self.tile_size*sqrt(3))
+            B = (self.origin.x-self.tile_size/2*(1-3*self.size),\
+                 self.origin.y+self.tile_size*sqrt(3)/2*(self.size-2)+self.tile_size*sqrt(3)/6)
+            C = (self.origin.x-self.tile_size/2*(1-3*self.size), self.origin.y+self.tile_size*sqrt(3)/2*(2*self.size+self.size-1))
+            D = (self.origin.x-self.tile_size, self.origin.y+self.tile_size*sqrt(3)*(self.size-1/2)-self.tile_size*sqrt(3)/6)
+            M = ((A[0]+B[0])/2, (B[1]+C[1])/2)
+            pg.draw.polygon(layer, GREEN, [A, B, M])
+            pg.draw.polygon(layer, GREEN, [C, D, M])
+            pg.draw.polygon(layer, BLUE, [B, C, M])
+            pg.draw.polygon(layer, BLUE, [D, A, M])
+            empty = _hexSprite(DARKRED, self.tile_size)
+            for rect in self.cellRects():
+                layer.blit(empty, rect)
+            layer = layer.convert()
+            _BOARD_LAYERS[key] = layer
+        return layer
+
+    def cellRects(self):
+        '''screen rect of every cell's sprite, by flat index r*size + c'''
+        key = (self.size, self.tile_size)
+        if self._cell_rects_key != key:
+            sprite = _hexSprite(DARKRED, self.tile_size)
+            self._cell_rects = []
+            for r in range(self.size):
+                for c in range(self.size):
+                    self._cell_rects.append(sprite.get_rect(center=self.coords(r, c)))
+            self._cell_rects_key = key
+        return self._cell_rects
+
+    def cellColor(self, r, c):
+        '''fill colour of a stone or the hover cell, None for a plain empty cell'''
+        if self.state[r][c] == 1:
+            return GREEN
+        if self.state[r][c] == 2:
+            return BLUE
+        if (r, c) == self.hover:
+            return LIGHTGREEN if self.move == 1 else LIGHTBLUE
+        return None
+
+    def showGrid(self):
+        '''shows hexagonal grid as well as players moves and destination sides'''
+        self.screen.blit(self._boardLayer(), (0, 0))
+        rects = self.cellRects()
         for r in range(self.size):
             for c in range(self.size):
-                if self.state[r][c] == 0:
-                    empty_cells.append((r, c))
-        
-        # If no empty cells, return
-        if not empty_cells:
-            return
-        
-        # Get current distances before CPU move using Dijkstra
-        human_dist_before, cpu_dist_before = self.estimateWinningDistance()
-        
-        best_move = None
-        best_score = float('-inf')
-        
-        # Try each empty cell to find the best move
-        for r, c in empty_cells:
-            # Temporarily place CPU's move here
-            self.state[r][c] = 2
-            
-            # Calculate distances after this move using Dijkstra
-            human_dist_after, cpu_dist_after = self.estimateWinningDistance()
-            
-            # Check if this move makes CPU win immediately
-            if cpu_dist_after == 0:
-                # CPU wins! This is the best move
-                self.state[r][c] = 0  # Undo temporary move
-                best_move = (r, c)
-                break
-            
-            # Calculate improvements
-            cpu_improvement = cpu_dist_before - cpu_dist_after  # How much closer CPU gets to winning
-            human_block = human_dist_after - human_dist_before  # How much further human is from winning
-            
-            # Determine threat level: how close is human to winning?
-            human_threat_level = human_dist_before
-            
-            # Dynamic scoring based on threat level
-            if human_threat_level <= 2:
-                # Human is very close to winning - prioritize blocking heavily
-                score = (5 * human_block) + cpu_improvement
-            elif human_threat_level <= 4:
-                # Human is moderately close - balance but favor blocking
-                score = (2.5 * human_block) + cpu_improvement
-            else:
-                # Human is not immediately threatening - balance both strategies
-                score = (1.5 * human_block) + cpu_improvement
-            
-            # Undo the temporary move
-            self.state[r][c] = 0
-            
-            # Keep track of best move
-            if score > best_score:
-                best_score = score
-                best_move = (r, c)
-        
-        # Make the best move
-        if best_move:
-            r, c = best_move
-            self.state[r][c] = 2
-            self.move = 1  # Switch back to human player
-
-    def _cpuMoveBacktracking(self):
+                col = self.cellColor(r, c)
+                if col is not None:
+                    self.screen.blit(_hexSprite(col, self.tile_size), rects[r*self.size + c])
+
+    def placeStone(self, r, c, player):
+        HexEngine.placeStone(self, r, c, player)
+        self.markDirty(r, c)
+        # the hover colour follows the player to move
+        if self.hover is not None:
+            self.markDirty(*self.hover)
+
+    def markDirty(self, r, c):
+        '''cell (r, c) is redrawn by the next renderBoard'''
+        self.dirty.add((r, c))
+
+    def invalidate(self):
+        '''the next renderBoard redraws the whole screen'''
+        self.full_redraw = True
+
+    def redrawArea(self, rect):
         '''
-        FULL logical backtracking for CPU (player 2, Blue).
-        CPU connects LEFT → RIGHT, human TOP → BOTTOM.
-
-        For each candidate CPU move M:
-            For every human reply H:
-                CPU must have at least one counter C (adjacent to H)
-                such that, after C, the human has NO immediate winning move.
-            If ANY human reply lacks such a CPU counter, M is rejected.
-
-        If we find a move M that survives all human replies, we play it
-        immediately. If none exist, fall back to a simple delaying move.
+        restores rect from the board layer and re-blits the sprites that
+        overlap it, in drawing order; returns the rect
         '''
-        board = self.state
-        n = self.size
-
-        def neighbors(r, c):
-            for dr, dc in [(-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0)]:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < n and 0 <= nc < n:
-                    yield nr, nc
-
-        def human_wins():
-            return self.checkWin() == 1
-
-        def cpu_wins():
-            return self.checkWin() == 2
-
-        def cpu_connectivity_score(local_board):
-            """
-            Approximate LEFT→RIGHT connectivity for CPU (player 2).
-            Lower score is better: smaller remaining horizontal gap.
-            """
-            cols = [c for r in range(n) for c in range(n) if local_board[r][c] == 2]
-            if not cols:
-                return n - 1
-            min_col = min(cols)
-            max_col = max(cols)
-            span = max_col - min_col
-            gap = (n - 1) - span
-            return gap
-
-        def human_immediate_wins():
-            """
-            True if human has any immediate winning move from
-            the CURRENT board by playing on an empty cell adjacent
-            to at least one human stone.
-            """
-            candidates = set()
-            for r in range(n):
-                for c in range(n):
-                    if board[r][c] == 1:
-                        for nr, nc in neighbors(r, c):
-                            if board[nr][nc] == 0:
-                                candidates.add((nr, nc))
-            if not candidates:
-                return False
-
-            for r, c in candidates:
-                if board[r][c] != 0:
-                    continue
-                board[r][c] = 1
-                if human_wins():
-                    board[r][c] = 0
-                    return True
-                board[r][c] = 0
-            return False
-        def get_player_groups(player):
-            """Return list of connected components (groups) for given player."""
-            visited = [[False] * n for _ in range(n)]
-            groups = []
-            for r in range(n):
-                for c in range(n):
-                    if board[r][c] == player and not visited[r][c]:
-                        stack = [(r, c)]
-                        visited[r][c] = True
-                        group = [(r, c)]
-                        while stack:
-                            cr, cc = stack.pop()
-                            for nr, nc in neighbors(cr, cc):
-                                if board[nr][nc] == player and not visited[nr][nc]:
-                                    visited[nr][nc] = True
-                                    stack.append((nr, nc))
-                                    group.append((nr, nc))
-                        groups.append(group)
-            return groups
-
-        def detectVirtualConnections(player):
-            """
-            Lightweight virtual connection detector.
-
-            For the given player:
-            - Find connected groups of stones.
-            - For each pair of groups, and for human also group+goal-edge,
-              find empty carrier cells that are adjacent to both structures.
-            - A virtual connection exists for that pair if there are >= 2
-              distinct carrier cells.
-
-            Returns: list of lists of carrier cells [(r, c), ...].
-            """
-            groups = get_player_groups(player)
-            if len(groups) < 1:
-                return []
-
-            empties = [(r, c) for r in range(n) for c in range(n) if board[r][c] == 0]
-            connections = []
-
-            # Group–group virtual connections
-            for i in range(len(groups)):
-                g1 = set(groups[i])
-                for j in range(i + 1, len(groups)):
-                    g2 = set(groups[j])
-                    carriers = []
-                    for er, ec in empties:
-                        touches_g1 = False
-                        touches_g2 = False
-                        for nr, nc in neighbors(er, ec):
-                            if (nr, nc) in g1:
-                                touches_g1 = True
-                            if (nr, nc) in g2:
-                                touches_g2 = True
-                            if touches_g1 and touches_g2:
-                                carriers.append((er, ec))
-                                break
-                    if len(carriers) >= 2:
-                        connections.append(carriers)
-
-            # For human (player 1), also consider group + goal edge (TOP/BOTTOM)
-            if player == 1:
-                for g in groups:
-                    gset = set(g)
-
-                    # Top edge: empties in row 0 adjacent to group
-                    top_carriers = []
-                    for er, ec in empties:
-                        if er != 0:
-                            continue
-                        if any((nr, nc) in gset for nr, nc in neighbors(er, ec)):
-                            top_carriers.append((er, ec))
-                    if len(top_carriers) >= 2:
-                        connections.append(top_carriers)
-
-                    # Bottom edge: empties in last row adjacent to group
-                    bottom_carriers = []
-                    for er, ec in empties:
-                        if er != n - 1:
-                            continue
-                        if any((nr, nc) in gset for nr, nc in neighbors(er, ec)):
-                            bottom_carriers.append((er, ec))
-                    if len(bottom_carriers) >= 2:
-                        connections.append(bottom_carriers)
-
-            return connections
-        
+        rect = pg.Rect(rect)
+        rects = self.cellRects()
+        self.screen.set_clip(rect)
+        self.screen.blit(self._boardLayer(), rect, rect)
+        for i in rect.collidelistall(rects):
+            col = self.cellColor(i // self.size, i % self.size)
+            if col is not None:
+                self.screen.blit(_hexSprite(col, self.tile_size), rects[i])
+        self.screen.set_clip(None)
+        return rect
+
+    def renderBoard(self):
         '''
-        # --- DEFENSIVE PRE-CHECK: if human is close to winning, prioritize blocking ---
-        try:
-            human_dist, cpu_dist = self.estimateWinningDistance()
-        except Exception:
-            human_dist = None
-        # If Dijkstra says human is very close (e.g., <= 2 moves), try a pure blocking move first.
-        if human_dist is not None and human_dist != float('inf') and human_dist <= 2:
-            best_block = None
-            
-            # Consider all empty cells as potential blocks
-            for r in range(n):
-                for c in range(n):
-                    if board[r][c] != 0:
-                        continue
-                    # Temporarily place CPU stone
-                    original = board[r][c]
-                    board[r][c] = 2
-                    human_after, _ = self.estimateWinningDistance()
-                    # We want to maximize human's distance to winning
-                    board[r][c]=original
-                
-                    if human_after > human_dist or human_after == float('inf'):
-                        best_block = (r, c)
-                        break
-                if best_block:
-                    break
-
-            if best_block:
-                br, bc = best_block
-                board[br][bc] = 2
-                self.move = 1
-                return
-            '''
-            
-        human_dist, cpu_dist = self.estimateWinningDistance()
-        # Only trigger expensive check if human can win in one move
-        if human_dist == 1:
-            for r in range(n):
-                for c in range(n):
-                    if board[r][c] != 0:
-                        continue
-
-                    # Simulate human move
-                    board[r][c] = 1
-                    if self.checkWin() == 1:
-                        # Block this winning cell
-                        board[r][c] = 2
-                        self.move = 1
-                        return
-                    board[r][c] = 0
-            
-        def cpu_has_response_after(h_r, h_c):
-            """
-            Given human has just played at (h_r, h_c),
-            check whether CPU has ANY counter move C adjacent to H
-            such that, after C, the human has NO immediate winning move.
-            """
-            responses = []
-            for nr, nc in neighbors(h_r, h_c):
-                if board[nr][nc] == 0:
-                    responses.append((nr, nc))
-
-            if not responses:
-                return False
-
-            # Connectivity baseline after H is already on board
-            base_conn = cpu_connectivity_score(board)
-
-            for cr, cc in responses:
-                if board[cr][cc] != 0:
-                    continue
-                board[cr][cc] = 2
-
-                # Reject counters that worsen CPU LEFT→RIGHT connectivity
-                if cpu_connectivity_score(board) > base_conn:
-                    board[cr][cc] = 0
-                    continue
-
-                # Accept if after C the human has no immediate winning move
-                if not human_immediate_wins():
-                    board[cr][cc] = 0
-                    return True
-
-                board[cr][cc] = 0
-
-            return False
-
-        # STEP 1: Generate CPU candidate moves
-        candidates = set()
-        for r in range(n):
-            for c in range(n):
-                if board[r][c] == 2:
-                    for nr, nc in neighbors(r, c):
-                        if board[nr][nc] == 0:
-                            candidates.add((nr, nc))
-
-        if not candidates:
-            # No neighbors: try center
-            center_r, center_c = n // 2, n // 2
-            if board[center_r][center_c] == 0:
-                candidates.add((center_r, center_c))
-            else:
-                for r in range(n):
-                    for c in range(n):
-                        if board[r][c] == 0:
-                            candidates.add((r, c))
-                            break
-                    if candidates:
-                        break
-
-        if not candidates:
-            return
-
-        candidates = list(candidates)
-
-        # Baseline CPU LEFT→RIGHT connectivity before any move
-        base_conn_before = cpu_connectivity_score(board)
-
-        # STEP 2: Try each candidate M with full logical backtracking
-        best_safe_move = None
-        best_safe_improvement = -1  # higher is better
-
-        for mr, mc in candidates:
-            if board[mr][mc] != 0:
-                continue
-
-            # CPU plays M
-            board[mr][mc] = 2
-
-            # Enforce connectivity invariant: do not worsen LEFT→RIGHT potential
-            conn_after_M = cpu_connectivity_score(board)
-            if conn_after_M > base_conn_before:
-                board[mr][mc] = 0
-                continue
-
-            # Immediate CPU win
-            if cpu_wins():
-                self.move = 1
-                return
-            # Human replies: empty cells adjacent to any human stone
-            human_replies = set()
-            for r in range(n):
-                for c in range(n):
-                    if board[r][c] == 1:
-                        for nr, nc in neighbors(r, c):
-                            if board[nr][nc] == 0:
-                                human_replies.add((nr, nc))
-
-            move_safe = True
-            for hr, hc in human_replies:
-                if board[hr][hc] != 0:
-                    continue
-
-                # Human plays H
-                board[hr][hc] = 1
-
-                # If this H already wins, M is unsafe
-                if human_wins():
-                    move_safe = False
-                    board[hr][hc] = 0
-                    break
-
-                # --- Virtual-connection pruning ---
-                # After H, see if human has any virtual connection that
-                # CPU cannot break by playing on *any* of its carrier cells
-                # without immediately losing or worsening its own connectivity.
-                human_vcs = detectVirtualConnections(player=1)
-                if human_vcs:
-                    base_conn_after_H = cpu_connectivity_score(board)
-                    forcing = False
-                    for carriers in human_vcs:
-                        has_block = False
-                        for cr, cc in carriers:
-                            if board[cr][cc] != 0:
-                                continue
-                            board[cr][cc] = 2
-                            # CPU block is acceptable only if:
-                            # - Human has no immediate winning reply after this block
-                            # - CPU's LEFT→RIGHT connectivity does not get worse
-                            if (not human_immediate_wins()) and (
-                                cpu_connectivity_score(board) <= base_conn_after_H
-                            ):
-                                has_block = True
-                                board[cr][cc] = 0
-                                break
-                            board[cr][cc] = 0
-                        if not has_block:
-                            forcing = True
-                            break
-
-                    if forcing:
-                        move_safe = False
-                        board[hr][hc] = 0
-                        break
-
-                # Otherwise CPU must have at least one valid counter adjacent to H
-                if not cpu_has_response_after(hr, hc):
-                    move_safe = False
-                    board[hr][hc] = 0
-                    break
-
-                board[hr][hc] = 0
-
-            # Undo M
-            board[mr][mc] = 0
-
-            if move_safe:
-                improvement = max(0, base_conn_before - conn_after_M)
-                # Keep the safe move that best improves CPU connectivity
-                if improvement > best_safe_improvement:
-                    best_safe_improvement = improvement
-                    best_safe_move = (mr, mc)
-
-        # STEP 3: Play chosen move
-        if best_safe_move is not None:
-            mr, mc = best_safe_move
-            if board[mr][mc] == 0:
-                board[mr][mc] = 2
-                self.move = 1
-                return
-
-        # No fully safe move respecting connectivity – choose a delaying move
-        center_r, center_c = n // 2, n // 2
-        if board[center_r][center_c] == 0:
-            board[center_r][center_c] = 2
-            self.move = 1
-            return
-
-        for mr, mc in candidates:
-            if board[mr][mc] == 0:
-                board[mr][mc] = 2
-                self.move = 1
-                return
-
-
-
-
-    def _dcScoreCell(self, r, c, colStart, colEnd):
-        """
-        SIMPLE scoring: Favor HORIZONTAL neighbors, discourage VERTICAL.
-        """
-        if self.state[r][c] != 0:
-            return float('-inf')
-        
-        # Count neighbors by direction
-        horizontal_neighbors = 0  # Left/right connections (good!)
-        vertical_neighbors = 0    # Up/down connections (bad for horizontal path!)
-        
-        for dr, dc in [(-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0)]:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < self.size and 0 <= nc < self.size:
-                if self.state[nr][nc] == 2:
-                    if dc != 0:
-                        # Column changes = horizontal neighbor
-                        horizontal_neighbors += 1
-                    else:
-                        # Only row changes = vertical neighbor
-                        vertical_neighbors += 1
-        
-        # Scoring: Horizontal good, vertical bad
-        score = horizontal_neighbors * 10.0  # Reward horizontal
-        score -= vertical_neighbors * 5.0     # Penalize vertical
-        
-        # If no neighbors, prefer center columns
-        if horizontal_neighbors == 0 and vertical_neighbors == 0:
-            center_col = self.size // 2
-            score = 5.0 - abs(c - center_col) * 0.1
-        
-        return score
-
-
-    def _dcSolve(self, rowStart, rowEnd, colStart, colEnd):
-        """
-        Simple D&C - unchanged.
-        """
-        height = rowEnd - rowStart + 1
-        width = colEnd - colStart + 1
-        
-        # BASE CASE
-        if width <= 4 or height <= 4:
-            best_r, best_c, best_score = None, None, float('-inf')
-            for r in range(rowStart, rowEnd + 1):
-                for c in range(colStart, colEnd + 1):
-                    if self.state[r][c] == 0:
-                        score = self._dcScoreCell(r, c, colStart, colEnd)
-                        if score > best_score:
-                            best_score = score
-                            best_r, best_c = r, c
-            return (best_r, best_c, best_score)
-        
-        # DIVIDE
-        mid_col = colStart + width // 2
-        
-        if mid_col <= colStart or mid_col > colEnd:
-            best_r, best_c, best_score = None, None, float('-inf')
-            for r in range(rowStart, rowEnd + 1):
-                for c in range(colStart, colEnd + 1):
-                    if self.state[r][c] == 0:
-                        score = self._dcScoreCell(r, c, colStart, colEnd)
-                        if score > best_score:
-                            best_score = score
-                            best_r, best_c = r, c
-            return (best_r, best_c, best_score)
-        
-        # CONQUER
-        left_result = self._dcSolve(rowStart, rowEnd, colStart, mid_col - 1)
-        right_result = self._dcSolve(rowStart, rowEnd, mid_col, colEnd)
-        
-        r_left, c_left, score_left = left_result
-        r_right, c_right, score_right = right_result
-        
-        # COMBINE
-        has_left = any(self.state[r][c] == 2 
-                    for r in range(self.size) 
-                    for c in range(colStart, min(mid_col, self.size)))
-        
-        has_right = any(self.state[r][c] == 2 
-                        for r in range(self.size) 
-                        for c in range(max(mid_col, 0), min(colEnd + 1, self.size)))
-        
-        if not has_left and not has_right:
-            return right_result if score_right > score_left else left_result
-        elif has_left and not has_right:
-            return right_result if r_right is not None else left_result
-        elif has_right and not has_left:
-            return left_result if r_left is not None else right_result
-        else:
-            return right_result if score_right > score_left else left_result
-
-
-    def _dcSolve(self, rowStart, rowEnd, colStart, colEnd):
-        """
-        Simple D&C - unchanged.
-        """
-        height = rowEnd - rowStart + 1
-        width = colEnd - colStart + 1
-        
-        # BASE CASE
-        if width <= 4 or height <= 4:
-            best_r, best_c, best_score = None, None, float('-inf')
-            for r in range(rowStart, rowEnd + 1):
-                for c in range(colStart, colEnd + 1):
-                    if self.state[r][c] == 0:
-                        score = self._dcScoreCell(r, c, colStart, colEnd)
-                        if score > best_score:
-                            best_score = score
-                            best_r, best_c = r, c
-            return (best_r, best_c, best_score)
-        
-        # DIVIDE
-        mid_col = colStart + width // 2
-        
-        if mid_col <= colStart or mid_col > colEnd:
-            best_r, best_c, best_score = None, None, float('-inf')
-            for r in range(rowStart, rowEnd + 1):
-                for c in range(colStart, colEnd + 1):
-                    if self.state[r][c] == 0:
-                        score = self._dcScoreCell(r, c, colStart, colEnd)
-                        if score > best_score:
-                            best_score = score
-                            best_r, best_c = r, c
-            return (best_r, best_c, best_score)
-        
-        # CONQUER
-        left_result = self._dcSolve(rowStart, rowEnd, colStart, mid_col - 1)
-        right_result = self._dcSolve(rowStart, rowEnd, mid_col, colEnd)
-        
-        r_left, c_left, score_left = left_result
-        r_right, c_right, score_right = right_result
-        
-        # COMBINE
-        has_left = any(self.state[r][c] == 2 
-                    for r in range(self.size) 
-                    for c in range(colStart, min(mid_col, self.size)))
-        
-        has_right = any(self.state[r][c] == 2 
-                        for r in range(self.size) 
-                        for c in range(max(mid_col, 0), min(colEnd + 1, self.size)))
-        
-        if not has_left and not has_right:
-            return right_result if score_right > score_left else left_result
-        elif has_left and not has_right:
-            return right_result if r_right is not None else left_result
-        elif has_right and not has_left:
-            return left_result if r_left is not None else right_result
-        else:
-            return right_result if score_right > score_left else left_result
-
-
-    def _cpuMoveDivideConquer(self):
-        """
-        Main entry point.
-        """
-        result = self._dcSolve(0, self.size - 1, 0, self.size - 1)
-        r, c, _ = result
-        if r is not None and c is not None and self.state[r][c] == 0:
-            self.state[r][c] = 2
-            self.move = 1
-            return
-        
-        for ri in range(self.size):
-            for cj in range(self.size):
-                if self.state[ri][cj] == 0:
-                    self.state[ri][cj] = 2
-                    self.move = 1
-                    return
-    
-    def _cpuMoveDynamicProgramming(self):
-        '''
-        Pure DP Table Solution using bidirectional shortest path.
-        
-        DP Tables:
-        1. dp_left[r][c] = minimum cost to reach (r,c) from LEFT edge
-        2. dp_right[r][c] = minimum cost from (r,c) to RIGHT edge
-        3. Combine: Pick empty cell that minimizes total path length
-        
-        Complexity: O(n²)
+        draws what changed since the last call and returns the screen rects
+        to pass to pg.display.update: only the dirty cells, or the whole
+        screen after invalidate
         '''
-        n = self.size
-        INF = 10 ** 9
-        
-        
-        # DP TABLE 1: dp_left[r][c] - Distance from LEFT to (r,c)
-        
-        
-        dp_left = [[INF] * n for _ in range(n)]
-        
-        # Base case: LEFT edge (column 0)
-        for r in range(n):
-            if self.state[r][0] == 2:
-                dp_left[r][0] = 0  # Our stone - free
-            elif self.state[r][0] == 0:
-                dp_left[r][0] = 1  # Empty - costs 1
-            else:
-                dp_left[r][0] = INF  # Opponent - blocked
-        
-        # Fill table column by column (left to right)
-        for c in range(1, n):
-            for r in range(n):
-                # Skip opponent cells
-                if self.state[r][c] == 1:
-                    continue
-                
-                # Cost of current cell
-                if self.state[r][c] == 2:
-                    cell_cost = 0
-                else:
-                    cell_cost = 1
-                
-                # Find minimum cost from previous positions
-                # Hexagonal neighbors that could lead to (r,c)
-                min_prev = INF
-                for dr, dc in [(-1, -1), (-1, 0), (0, -1), (1, -1), (1, 0)]:
-                    pr = r + dr
-                    pc = c + dc
-                    if 0 <= pr < n and 0 <= pc < n:
-                        min_prev = min(min_prev, dp_left[pr][pc])
-                
-                # DP recurrence
-                if min_prev < INF:
-                    dp_left[r][c] = min_prev + cell_cost
-        
-        
-        # DP TABLE 2: dp_right[r][c] - Distance from (r,c) to RIGHT
-        
-        
-        dp_right = [[INF] * n for _ in range(n)]
-        
-        # Base case: RIGHT edge (column n-1)
-        for r in range(n):
-            if self.state[r][n-1] == 2:
-                dp_right[r][n-1] = 0
-            elif self.state[r][n-1] == 0:
-                dp_right[r][n-1] = 1
-            else:
-                dp_right[r][n-1] = INF
-        
-        # Fill table column by column (right to left)
-        for c in range(n - 2, -1, -1):
-            for r in range(n):
-                # Skip opponent cells
-                if self.state[r][c] == 1:
-                    continue
-                
-                # Cost of current cell
-                if self.state[r][c] == 2:
-                    cell_cost = 0
-                else:
-                    cell_cost = 1
-                
-                # Find minimum cost to next positions
-                # Hexagonal neighbors that (r,c) can reach
-                min_next = INF
-                for dr, dc in [(-1, 0), (-1, 1), (0, 1), (1, 0), (1, 1)]:
-                    nr = r + dr
-                    nc = c + dc
-                    if 0 <= nr < n and 0 <= nc < n:
-                        min_next = min(min_next, dp_right[nr][nc])
-                
-                # DP recurrence
-                if min_next < INF:
-                    dp_right[r][c] = min_next + cell_cost
-        
-        
-        # DECISION: Find best empty cell to play
-        
-        
-        best_r, best_c = None, None
-        best_total = INF
-        
-        for r in range(n):
-            for c in range(n):
-                if self.state[r][c] != 0:
-                    continue  # Not empty
-                
-                
-                # Path = (LEFT → this cell) + (this cell → RIGHT)
-                
-                
-                # Best distance TO this cell (from left neighbors)
-                dist_to = INF
-                for dr, dc in [(-1, -1), (-1, 0), (0, -1), (1, -1), (1, 0)]:
-                    pr = r + dr
-                    pc = c + dc
-                    if 0 <= pr < n and 0 <= pc < n:
-                        dist_to = min(dist_to, dp_left[pr][pc])
-                
-                # Special case: if this is in column 0
-                if c == 0:
-                    dist_to = 0
-                
-                # Best distance FROM this cell (to right neighbors)
-                dist_from = INF
-                for dr, dc in [(-1, 0), (-1, 1), (0, 1), (1, 0), (1, 1)]:
-                    nr = r + dr
-                    nc = c + dc
-                    if 0 <= nr < n and 0 <= nc < n:
-                        dist_from = min(dist_from, dp_right[nr][nc])
-                
-                # Special case: if this is in column n-1
-                if c == n - 1:
-                    dist_from = 0
-                
-                # Total path length if we play here (this cell = 0 cost)
-                total = dist_to + 0 + dist_from
-                
-                # Track minimum
-                if total < best_total:
-                    best_total = total
-                    best_r, best_c = r, c
-        
-        # Make the move
-        if best_r is not None:
-            self.state[best_r][best_c] = 2
-            self.move = 1
-            return
-        
-        # Fallback: no valid move found (shouldn't happen)
-        for r in range(n):
-            for c in range(n):
-                if self.state[r][c] == 0:
-                    self.state[r][c] = 2
-                    self.move = 1
-                    return
+        if self.full_redraw:
+            self.full_redraw = False
+            self.dirty.clear()
+            self.showGrid()
+            return [self.screen.get_rect()]
+        rects = self.cellRects()
+        updated = [self.redrawArea(rects[r*self.size + c]) for r, c in self.dirty]
+        self.dirty.clear()
+        return updated
 
     def shadow(self):
         shadow = pg.Surface((W, H))
@@ -1005,8 +304,10 @@ class Game:
         greedy_btn = Button((grid_center_x - btn_spacing, strategy_y), btn_size, 'Greedy', col=GREEN)
         dnc_btn = Button((grid_center_x, strategy_y), btn_size, 'D&C', col=LIGHTBLUE)
         dp_btn = Button((grid_center_x + btn_spacing, strategy_y), btn_size, 'DP', col=YELLOW)
-        backtracking_btn = Button((grid_center_x, strategy_y2), btn_size, 'Backtracking', col=ORANGE)
-        mode_buttons = [greedy_btn, dnc_btn, dp_btn, backtracking_btn]
+        backtracking_btn = Button((grid_center_x - btn_spacing, strategy_y2), btn_size, 'Backtracking', col=ORANGE)
+        alphabeta_btn = Button((grid_center_x, strategy_y2), btn_size, 'Alpha-Beta', col=LIGHTGREEN)
+        mcts_btn = Button((grid_center_x + btn_spacing, strategy_y2), btn_size, 'MCTS', col=RED)
+        mode_buttons = [greedy_btn, dnc_btn, dp_btn, backtracking_btn, alphabeta_btn, mcts_btn]
 
         play_y = 400
         rules_y = 460
@@ -1030,6 +331,10 @@ class Game:
                         selected_ai_mode = 'DP'
                     elif backtracking_btn.triggered():
                         selected_ai_mode = 'Backtracking'
+                    elif alphabeta_btn.triggered():
+                        selected_ai_mode = 'Alpha-Beta'
+                    elif mcts_btn.triggered():
+                        selected_ai_mode = 'MCTS'
                     if play.triggered():
                         self.__init__(self.size)
                         self.ai_mode = selected_ai_mode
@@ -1056,9 +361,12 @@ class Game:
                 'Greedy': (grid_center_x - btn_spacing, strategy_y),
                 'D&C': (grid_center_x, strategy_y),
                 'DP': (grid_center_x + btn_spacing, strategy_y),
-                'Backtracking': (grid_center_x, strategy_y2),
+                'Backtracking': (grid_center_x - btn_spacing, strategy_y2),
+                'Alpha-Beta': (grid_center_x, strategy_y2),
+                'MCTS': (grid_center_x + btn_spacing, strategy_y2),
             }
-            strategy_colors = {'Greedy': GREEN, 'D&C': LIGHTBLUE, 'DP': YELLOW, 'Backtracking': ORANGE}
+            strategy_colors = {'Greedy': GREEN, 'D&C': LIGHTBLUE, 'DP': YELLOW, 'Backtracking': ORANGE,
+                               'Alpha-Beta': LIGHTGREEN, 'MCTS': RED}
             sx, sy = strategy_pos[selected_ai_mode]
             pg.draw.rect(self.screen, strategy_colors[selected_ai_mode],
                          (sx - 62, sy - 22, 124, 44), 2)
@@ -1102,6 +410,8 @@ class Game:
     def pauseScreen(self):
         '''shows pause screen, returns True if the game was resumed'''
         start = True
+        # pausing stops the CPU search; Resume starts it again
+        was_thinking = self.cancelCpuMove()
         # initializing buttons
         resume = Button((W/2, H/3), 80, 'Resume', col=ORANGE)
         home = Button((W/2, H/2), 50, 'Home', col=WHITE)
@@ -1120,6 +430,8 @@ class Game:
                         self.started = False
                         return True
                     if resume.triggered():
+                        if was_thinking:
+                            self.requestCpuMove()
                         return True
             # highlight buttons
             for button in buttons:
@@ -1138,12 +450,13 @@ class Game:
         '''shows game over screen, returns True if any key is hit'''
         # At game over, persist per-session timing stats for the active strategy.
         try:
-            strategy = self.ai_mode if self.ai_mode in ('Greedy', 'D&C', 'DP', 'Backtracking') else 'Unknown'
+            strategy = self.ai_mode if self.ai_mode in STRATEGIES else 'Unknown'
             times = getattr(self, 'session_times', {}).get(strategy, [])
             if times:
                 moves_count = len(times)
                 avg_time = sum(times) / moves_count
-                _append_performance_log(strategy, avg_time, moves_count)
+                _append_performance_log(strategy, avg_time, moves_count, self.size,
+                                        self.sessionCounts(strategy))
         except Exception:
             # Never allow logging issues to break the game-over screen.
             pass
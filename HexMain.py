@@ -3,49 +3,82 @@ from funcs import *
 from Game import *
 from consts import *
 
-game = Game(SIZE)
-game.loadData()
+if __name__ == '__main__':
+    # guarded so worker processes (parallel_eval) can import this module safely
+    game = Game(SIZE)
+    game.loadData()
 
-# button initializing
-pause = Button((30, 30), 50, img=game.pause_img)
-buttons = [pause]
-#print(game.state)
-# draw()
-run = True
-while run:
-    # sticking to fps
-    game.clock.tick(FPS)
-    if not game.started:
-        run = game.startScreen()
-    else:
-        # --------------------EVENTS---------------------
-        game.highlight(pg.mouse.get_pos())
-        for event in pg.event.get():
-            if event.type == pg.QUIT:
-                # if exit button is pressed
-                run = False
-            elif event.type == pg.MOUSEBUTTONDOWN:
-                # human player (player 1) moves
-                old_move = game.move
-                game.tick(pg.mouse.get_pos())
-                # If human made a move, CPU moves automatically
-                if old_move == 1 and game.move == 2:
-                    game.cpuMove()
-                if pause.triggered():
-                    run = game.pauseScreen()
+    # button initializing
+    pause = Button((30, 30), 50, img=game.pause_img)
+    buttons = [pause]
+    #print(game.state)
+    # draw()
+    # bottom band for the "thinking" / playout-rate line
+    status_rect = pg.Rect(0, H - 50, W, 50)
+    status_shown = False
+    run = True
+    while run:
+        # sticking to fps
+        game.clock.tick(FPS)
+        if not game.started:
+            run = game.startScreen()
+            game.invalidate()
+            # double processing
+            pg.display.flip()
+        else:
+            # --------------------EVENTS---------------------
+            if not game.thinking():
+                game.highlight(pg.mouse.get_pos())
+            for event in pg.event.get():
+                if event.type == pg.QUIT:
+                    # if exit button is pressed
+                    run = False
+                elif event.type == pg.MOUSEBUTTONDOWN:
+                    # human player (player 1) moves
+                    old_move = game.move
+                    game.tick(pg.mouse.get_pos())
+                    # If human made a move, CPU moves in the background
+                    if old_move == 1 and game.move == 2 and not game.checkWin():
+                        game.requestCpuMove()
+                    elif game.cpu_error and not game.thinking():
+                        game.requestCpuMove()
+                    if pause.triggered():
+                        run = game.pauseScreen()
+                        game.invalidate()
 
-        # highlight buttons
-        for button in buttons:
-            button.highlighted()
+            # highlight buttons
+            for button in buttons:
+                button.highlighted()
 
-        # --------------------STUFF-----------------------
-        game.screen.fill(game.bg_color)
-        game.showGrid()
-        for button in buttons:
-            button.show(game.screen)
-        if game.checkWin():
-            run = game.GOScreen(game.checkWin())
-    # double processing
-    pg.display.flip()
+            # pick up the CPU move once the worker is done
+            game.pollCpuMove()
 
-pg.quit()
+            # --------------------STUFF-----------------------
+            # only changed cells are redrawn and sent to the display
+            rects = game.renderBoard()
+            for button in buttons:
+                rects.append(game.redrawArea(button.bigger_img.get_rect(center=button.pos).inflate(4, 4)))
+                button.show(game.screen)
+            status = None
+            # the last search's statistics may come from another strategy
+            stats = game.last_search_stats or {}
+            if game.thinking():
+                status = ('CPU thinking' + '.' * (1 + pg.time.get_ticks() // 300 % 3), 30)
+            elif game.cpu_error:
+                status = (game.cpu_error, 24)
+            elif game.ai_mode == 'MCTS' and 'playouts_per_second' in stats:
+                status = ('MCTS: {:,.0f} playouts/s'.format(stats['playouts_per_second']), 24)
+            elif game.ai_mode == 'D&C' and 'hit_rate' in stats:
+                status = ('D&C cache: {:.0%} hits'.format(stats['hit_rate']), 24)
+            if status or status_shown:
+                rects.append(game.redrawArea(status_rect))
+                if status:
+                    textOut(game.screen, status[0], status[1], LIGHTBLUE, (W/2, H - 30))
+                status_shown = bool(status)
+            pg.display.update(rects)
+            winner = game.checkWin()
+            if winner:
+                run = game.GOScreen(winner)
+                game.invalidate()
+
+    pg.quit()
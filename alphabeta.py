@@ -0,0 +1,174 @@
+"""
+Time-budgeted iterative-deepening negamax search with alpha-beta pruning.
+
+Positions are scored from the side to move as
+    opponent's winning distance - own winning distance
+(the 0/1 shortest-path model of funcs.dijkstra_winning_distance). A
+distance of 0 means the player has connected, which doubles as the win
+test, so no separate win detector is needed.
+
+At every node all empty cells are scored one ply deep in a single batch
+(batch_eval.candidate_distances, or place/undo on a DistanceEngine when
+numpy is missing). Those scores order the moves, and only the best
+`width` of them are searched deeper. A depth-1 node is just that batch.
+
+The search deepens one ply at a time until the millisecond budget runs
+out. Depth 1 always completes, so a move is always available. Each new
+iteration searches the previous best move first. If time runs out in
+the middle of an iteration, the best move found so far in that
+iteration is kept, because it is at least as good as the previous best.
+"""
+from time import perf_counter
+
+import batch_eval
+import counters
+from distance_engine import DistanceEngine
+
+# default per-move budget in milliseconds
+DEFAULT_BUDGET_MS = 500
+# moves searched below the root at each node, best-ordered first
+DEFAULT_WIDTH = 8
+# deepest iteration tried, even with time left
+MAX_DEPTH = 12
+# score of a connected position; faster wins score higher
+WIN_SCORE = 10000
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class AlphaBetaSearch:
+    def __init__(self, grid, budget_ms=DEFAULT_BUDGET_MS, width=DEFAULT_WIDTH, max_depth=MAX_DEPTH,
+                 stop=None):
+        self.n = len(grid)
+        self.grid = [row[:] for row in grid]
+        self.budget_ms = budget_ms
+        self.width = width
+        self.max_depth = max_depth
+        # callable that ends the search early, like the budget running out
+        self.stop = stop
+        # the numpy batch re-reads self.grid; without numpy the engine follows the grid
+        self.engine = None if batch_eval.available() else DistanceEngine(self.grid)
+        self.deadline = None
+        self.nodes = 0
+        self.depth_reached = 0
+
+    def play(self, r, c, player):
+        self.grid[r][c] = player
+        if self.engine is not None:
+            self.engine.place(r, c, player)
+
+    def unplay(self, r, c):
+        self.grid[r][c] = 0
+        if self.engine is not None:
+            self.engine.undo()
+
+    def empty_cells(self):
+        return [(r, c) for r in range(self.n) for c in range(self.n) if self.grid[r][c] == 0]
+
+    def _distances_after(self, cells, player):
+        if self.engine is None:
+            return batch_eval.candidate_distances(self.grid, cells, player)
+        out = []
+        for r, c in cells:
+            self.engine.place(r, c, player)
+            out.append(self.engine.distances())
+            self.engine.undo()
+        return out
+
+    def children(self, player, depth):
+        '''
+        [(score, cell)] for every move of player, best first, scored one ply
+        deep from player's point of view; wins carry the remaining depth.
+        Ties go to the cell nearer the centre.
+        '''
+        cells = self.empty_cells()
+        counters.add('candidates_evaluated', len(cells))
+        mid = (self.n - 1) / 2.0
+        scored = []
+        for cell, dists in zip(cells, self._distances_after(cells, player)):
+            own, other = dists[player - 1], dists[2 - player]
+            if own == 0:
+                score = WIN_SCORE + depth
+            else:
+                score = other - own
+            scored.append((score, cell))
+        scored.sort(key=lambda sc: (-sc[0], abs(sc[1][0] - mid) + abs(sc[1][1] - mid)))
+        return scored
+
+    def _check_time(self):
+        self.nodes += 1
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise SearchTimeout
+        if self.stop is not None and self.stop():
+            raise SearchTimeout
+
+    def negamax(self, player, depth, alpha, beta):
+        '''value of the position for player (to move), searched depth plies deep'''
+        self._check_time()
+        scored = self.children(player, depth)
+        if not scored:
+            return 0
+        if depth <= 1 or scored[0][0] > WIN_SCORE:
+            return scored[0][0]
+        best = -float('inf')
+        searched = 0
+        for _, (r, c) in scored[:self.width]:
+            self.play(r, c, player)
+            searched += 1
+            try:
+                value = -self.negamax(3 - player, depth - 1, -beta, -alpha)
+            finally:
+                self.unplay(r, c)
+            if value > best:
+                best = value
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+        # moves cut off by the width limit or by a beta cutoff
+        counters.add('candidates_pruned', len(scored) - searched)
+        return best
+
+    def search(self, player=2):
+        '''
+        best move for player within the time budget, as (r, c), or None if
+        the board is full
+        '''
+        start = perf_counter()
+        self.nodes = 0
+        self.deadline = None
+        # depth 1 is a single batch and always completes
+        root = self.children(player, 1)
+        if not root:
+            return None
+        best_move = root[0][1]
+        self.depth_reached = 1
+        if root[0][0] > WIN_SCORE:
+            return best_move
+        order = [cell for _, cell in root[:2 * self.width]]
+        self.deadline = start + self.budget_ms / 1000.0
+        for depth in range(2, self.max_depth + 1):
+            iteration_best = None
+            alpha, beta = -float('inf'), float('inf')
+            try:
+                for r, c in order:
+                    self.play(r, c, player)
+                    try:
+                        value = -self.negamax(3 - player, depth - 1, -beta, -alpha)
+                    finally:
+                        self.unplay(r, c)
+                    if value > alpha:
+                        alpha = value
+                        iteration_best = (r, c)
+                        best_move = iteration_best
+            except SearchTimeout:
+                break
+            self.depth_reached = depth
+            if iteration_best is not None:
+                order.remove(iteration_best)
+                order.insert(0, iteration_best)
+            if alpha > WIN_SCORE or alpha < -WIN_SCORE:
+                break  # forced result, deeper search cannot change it
+        return best_move
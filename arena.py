@@ -0,0 +1,248 @@
+"""
+Strategy tournament arena.
+
+Plays the CPU strategies (and a uniformly random baseline) against each
+other on a list of board sizes, spreading the games across a process
+pool, and reports per size: win rates, Elo ratings and per-move latency
+percentiles for every strategy.
+
+The strategies are written for Blue (player 2, left -> right). To let a
+strategy play Green, it is given the transposed board with the colours
+swapped: the hex neighbourhood is symmetric under transposition, so
+Green's top -> bottom problem becomes Blue's left -> right one.
+
+Usage:
+    python arena.py --sizes 5 7 9 --games 10 --workers 8 --json arena.json
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+from math import ceil
+from itertools import permutations
+from time import perf_counter
+
+from consts import MIN_BOARD_SIZE, MAX_BOARD_SIZE, STRATEGIES
+from engine import HexEngine
+
+RANDOM = 'Random'
+PLAYERS = STRATEGIES + (RANDOM,)
+ELO_START = 1500.0
+ELO_K = 32.0
+
+
+class _Seat:
+    '''one side of a game: a strategy and its own view of the board'''
+
+    def __init__(self, name, size, player, rng):
+        self.name = name
+        self.player = player
+        self.rng = rng
+        self.engine = None
+        if name != RANDOM:
+            self.engine = HexEngine(size)
+            self.engine.ai_mode = name
+            # compare the strategies themselves, not the shared opening book
+            # and endgame solver
+            self.engine.use_book = False
+            self.engine.endgame_threshold = 0
+
+    def _view(self, r, c):
+        # Green sees the transposed board, where it plays as Blue
+        return (c, r) if self.player == 1 else (r, c)
+
+    def observe(self, r, c, player):
+        '''records a stone placed on the real board'''
+        if self.engine is not None:
+            vr, vc = self._view(r, c)
+            self.engine.placeStone(vr, vc, player if self.player == 2 else 3 - player)
+
+    def choose(self, empty):
+        '''
+        returns (real-board move, seconds taken, fell back to random); the
+        seat's own view already holds the stone afterwards
+        '''
+        start = perf_counter()
+        if self.engine is not None:
+            before = self.engine.last_move
+            self.engine.move = 2
+            self.engine.cpuMove()
+            if self.engine.last_move != before:
+                return self._view(*self.engine.last_move), perf_counter() - start, False
+        # random baseline, or a strategy that found no move
+        r, c = self.rng.choice(sorted(empty))
+        self.observe(r, c, self.player)
+        return (r, c), perf_counter() - start, self.engine is not None
+
+
+def play_game(task):
+    '''
+    plays one game; task = (game_id, size, green, blue, seed, opening_moves).
+    The first opening_moves plies are random so that repeated games between
+    deterministic strategies differ.
+    '''
+    game_id, size, green, blue, seed, opening_moves = task
+    rng = random.Random(seed)
+    board = HexEngine(size)
+    seats = {1: _Seat(green, size, 1, rng), 2: _Seat(blue, size, 2, rng)}
+    empty = set((r, c) for r in range(size) for c in range(size))
+    latencies = {1: [], 2: []}
+    fallbacks = 0
+    player = 1
+    ply = 0
+    while empty and not board.checkWin():
+        if ply < opening_moves:
+            r, c = rng.choice(sorted(empty))
+            seats[player].observe(r, c, player)
+        else:
+            (r, c), elapsed, fell_back = seats[player].choose(empty)
+            latencies[player].append(elapsed)
+            fallbacks += fell_back
+        empty.discard((r, c))
+        board.placeStone(r, c, player)
+        seats[3 - player].observe(r, c, player)
+        player = 3 - player
+        ply += 1
+    return {
+        'game_id': game_id,
+        'size': size,
+        'green': green,
+        'blue': blue,
+        'winner': board.checkWin(),
+        'moves': size * size - len(empty),
+        'latency': {green: latencies[1], blue: latencies[2]},
+        'fallbacks': fallbacks,
+    }
+
+
+def schedule(sizes, players, games, seed, opening_moves=2):
+    '''every ordered pairing of distinct players, games times per size'''
+    tasks = []
+    for size in sizes:
+        for green, blue in permutations(players, 2):
+            for _ in range(games):
+                game_id = len(tasks)
+                tasks.append((game_id, size, green, blue, seed * 1000003 + game_id, opening_moves))
+    return tasks
+
+
+def percentile(sorted_values, q):
+    '''nearest-rank percentile of an already sorted list'''
+    if not sorted_values:
+        return None
+    k = max(0, ceil(q / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+def elo(results, players):
+    '''Elo ratings after replaying the games in game_id order'''
+    rating = {p: ELO_START for p in players}
+    for res in sorted(results, key=lambda g: g['game_id']):
+        g, b = res['green'], res['blue']
+        expected_g = 1.0 / (1.0 + 10 ** ((rating[b] - rating[g]) / 400.0))
+        score_g = 1.0 if res['winner'] == 1 else 0.0
+        rating[g] += ELO_K * (score_g - expected_g)
+        rating[b] -= ELO_K * (score_g - expected_g)
+    return rating
+
+
+def summarize(results, players):
+    '''per size: {player: {games, wins, win_rate, elo, p50_ms, p90_ms, p99_ms, max_ms}}'''
+    report = {}
+    for size in sorted(set(r['size'] for r in results)):
+        games = [r for r in results if r['size'] == size]
+        ratings = elo(games, players)
+        table = {}
+        for p in players:
+            played = [r for r in games if p in (r['green'], r['blue'])]
+            wins = sum(1 for r in played
+                       if (r['winner'] == 1 and r['green'] == p) or (r['winner'] == 2 and r['blue'] == p))
+            times = sorted(t for r in played for t in r['latency'].get(p, []))
+            table[p] = {
+                'games': len(played),
+                'wins': wins,
+                'win_rate': wins / len(played) if played else None,
+                'elo': round(ratings[p], 1),
+                'p50_ms': _ms(percentile(times, 50)),
+                'p90_ms': _ms(percentile(times, 90)),
+                'p99_ms': _ms(percentile(times, 99)),
+                'max_ms': _ms(times[-1] if times else None),
+                'moves': len(times),
+            }
+        report[size] = table
+    return report
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000.0, 3)
+
+
+def run(sizes, players, games, workers, seed, opening_moves=2, progress=None):
+    tasks = schedule(sizes, players, games, seed, opening_moves)
+    results = []
+    if workers <= 1:
+        for task in tasks:
+            results.append(play_game(task))
+            if progress:
+                progress(len(results), len(tasks))
+    else:
+        with mp.get_context('spawn').Pool(workers) as pool:
+            for res in pool.imap_unordered(play_game, tasks, chunksize=1):
+                results.append(res)
+                if progress:
+                    progress(len(results), len(tasks))
+    return results
+
+
+def print_report(report):
+    fmt = lambda v, spec: 'N/A' if v is None else format(v, spec)
+    for size, table in report.items():
+        pct = lambda st: None if st['win_rate'] is None else st['win_rate'] * 100
+        print('\nBoard {0}x{0}'.format(size))
+        print('{:<14}{:>7}{:>8}{:>9}{:>10}{:>10}{:>10}{:>10}'.format(
+            'Strategy', 'Games', 'Win %', 'Elo', 'p50 ms', 'p90 ms', 'p99 ms', 'max ms'))
+        for p, st in sorted(table.items(), key=lambda kv: -kv[1]['elo']):
+            print('{:<14}{:>7}{:>8}{:>9}{:>10}{:>10}{:>10}{:>10}'.format(
+                p, st['games'], fmt(pct(st), '.1f'),
+                fmt(st['elo'], '.1f'), fmt(st['p50_ms'], '.3f'), fmt(st['p90_ms'], '.3f'),
+                fmt(st['p99_ms'], '.3f'), fmt(st['max_ms'], '.3f')))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play the CPU strategies against each other.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 7, 9],
+                        help='board sizes, each between {} and {}'.format(MIN_BOARD_SIZE, MAX_BOARD_SIZE))
+    parser.add_argument('--strategies', nargs='+', default=list(PLAYERS), choices=PLAYERS,
+                        help='players taking part (Random is the baseline)')
+    parser.add_argument('--games', type=int, default=4,
+                        help='games per ordered pairing and size (each side plays both colours)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--opening-moves', type=int, default=2,
+                        help='random plies at the start of every game')
+    parser.add_argument('--json', help='write the raw results and the report to this file')
+    args = parser.parse_args(argv)
+
+    for size in args.sizes:
+        if not MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE:
+            parser.error('board size {} is outside {}..{}'.format(size, MIN_BOARD_SIZE, MAX_BOARD_SIZE))
+    players = tuple(dict.fromkeys(args.strategies))
+    if len(players) < 2:
+        parser.error('need at least two strategies')
+
+    def progress(done, total):
+        print('\r{}/{} games'.format(done, total), end='', flush=True)
+
+    results = run(args.sizes, players, args.games, args.workers, args.seed,
+                  args.opening_moves, progress)
+    print()
+    report = summarize(results, players)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'results': results, 'report': report}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
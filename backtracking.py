@@ -0,0 +1,398 @@
+"""
+Logical backtracking search for the CPU (player 2, Blue).
+CPU connects LEFT → RIGHT, human TOP → BOTTOM.
+
+For each candidate CPU move M:
+    For every human reply H:
+        CPU must have at least one counter C (adjacent to H)
+        such that, after C, the human has NO immediate winning move.
+    If ANY human reply lacks such a CPU counter, M is rejected.
+
+The search runs on a BitBoard, so group detection and reply generation are
+bit-parallel mask operations. Win checks after M and H come from a
+union-find win detector that is updated per placement and undone on
+backtrack. Each candidate is judged independently (evaluate), which lets
+parallel_eval hand candidates to worker processes.
+
+The search keeps an incremental Zobrist hash of the board. With a
+TranspositionTable attached, human win checks, human virtual connections
+and "does this human reply refute M" verdicts are cached by position, so
+boards reached through different move orders (M/H/C transpositions) are
+judged only once.
+"""
+from bitboard import BitBoard
+from union_find import HexUnionFind
+from consts import OFFSETS
+from topology import topology
+import counters
+import zobrist
+
+# verdicts of BacktrackingSearch.evaluate
+WIN = 'win'
+SAFE = 'safe'
+UNSAFE = 'unsafe'
+REJECTED = 'rejected'
+
+# neighbours in row-major order; the candidate order (and so tie-breaking) follows it
+NEIGHBOR_ORDER = tuple(sorted(OFFSETS))
+
+# per size, the topology's neighbour and bridge tables in bitboard terms
+_BIT_TABLES = {}
+
+
+def bit_tables(size):
+    '''
+    per bit index of a cell: its neighbours as a mask, and its bridges as
+    (target bit index, carrier mask) pairs
+    '''
+    table = _BIT_TABLES.get(size)
+    if table is None:
+        topo = topology(size)
+        stride = size + 1
+
+        def bit(i):
+            return i // size * stride + i % size
+
+        table = _BIT_TABLES[size] = {
+            bit(i): (sum(1 << bit(j) for j in topo.neighbors[i]),
+                     tuple((bit(t), 1 << bit(a) | 1 << bit(b)) for t, a, b in topo.bridges[i]))
+            for i in range(topo.cells)}
+    return table
+
+
+class BacktrackingSearch:
+    def __init__(self, board, wins, table=None):
+        self.board = board
+        self.wins = wins
+        self.n = board.size
+        self.neighbor_cells = topology(self.n).cell_table(NEIGHBOR_ORDER)
+        # optional zobrist.TranspositionTable shared across searches
+        self.table = table
+        self.green_keys, self.blue_keys, self.move_keys = zobrist.zobrist_keys(self.n)
+        self.hash = zobrist.board_hash(board)
+
+    @classmethod
+    def from_grid(cls, grid, table=None):
+        return cls(BitBoard.from_grid(grid), HexUnionFind.from_grid(grid), table)
+
+    def neighbors(self, r, c):
+        return self.neighbor_cells[r * self.n + c]
+
+    def human_wins(self):
+        counters.add('win_checks')
+        return self.wins.has_won(1)
+
+    def cpu_wins(self):
+        counters.add('win_checks')
+        return self.wins.has_won(2)
+
+    def put(self, r, c, player):
+        '''sets a stone on the bitboard only, keeping the hash in step'''
+        self.board.set(r, c, player)
+        keys = self.green_keys if player == 1 else self.blue_keys
+        self.hash ^= keys[r * self.n + c]
+
+    def take(self, r, c):
+        '''removes a stone set with put'''
+        player = self.board.get(r, c)
+        self.board.set(r, c, 0)
+        keys = self.green_keys if player == 1 else self.blue_keys
+        self.hash ^= keys[r * self.n + c]
+
+    def play(self, r, c, player):
+        self.put(r, c, player)
+        self.wins.place(r, c, player)
+
+    def unplay(self, r, c):
+        self.take(r, c)
+        self.wins.undo()
+
+    def _probe(self, kind, extra=0):
+        if self.table is None:
+            return zobrist.MISS
+        return self.table.probe(self.hash ^ zobrist.SALTS[kind] ^ extra, kind)
+
+    def _store(self, kind, value, cost, extra=0):
+        if self.table is not None:
+            self.table.store(self.hash ^ zobrist.SALTS[kind] ^ extra, value, cost)
+
+    def cpu_connectivity_score(self):
+        """
+        Approximate LEFT→RIGHT connectivity for CPU (player 2).
+        Lower score is better: smaller remaining horizontal gap.
+        """
+        board = self.board
+        n = self.n
+        blue = board.blue
+        if not blue:
+            return n - 1
+        cols = [c for c in range(n) if blue & board.column(c)]
+        span = cols[-1] - cols[0]
+        gap = (n - 1) - span
+        return gap
+
+    def human_immediate_wins(self):
+        """
+        True if human has any immediate winning move from
+        the CURRENT board by playing on an empty cell adjacent
+        to at least one human stone.
+        """
+        cached = self._probe(zobrist.WIN_CHECK)
+        if cached is not zobrist.MISS:
+            return cached
+        counters.add('win_checks')
+        wins = bool(self.board.winning_cells(1))
+        self._store(zobrist.WIN_CHECK, wins, 1)
+        return wins
+
+    def detect_virtual_connections(self, player):
+        """
+        Lightweight virtual connection detector.
+
+        For the given player:
+        - Find connected groups of stones.
+        - For each pair of groups, and for human also group+goal-edge,
+          find empty carrier cells that are adjacent to both structures.
+        - A virtual connection exists for that pair if there are >= 2
+          distinct carrier cells.
+
+        Returns: list of carrier masks (see BitBoard.cells).
+        """
+        cached = self._probe(zobrist.VIRTUAL_CONNECTIONS, player)
+        if cached is not zobrist.MISS:
+            return list(cached)
+        counters.add('vc_detections')
+        connections = self._virtual_connections(player)
+        self._store(zobrist.VIRTUAL_CONNECTIONS, tuple(connections), 2, player)
+        return connections
+
+    def _virtual_connections(self, player):
+        board = self.board
+        groups = board.components(player)
+        if len(groups) < 1:
+            return []
+
+        empty = board.empty()
+        tables = bit_tables(self.n)
+        # empty cells touching each group; single stones (most groups) use
+        # the neighbour table instead of a dilation
+        reach = []
+        singles = {}
+        larger = []
+        for i, g in enumerate(groups):
+            if g & (g - 1):
+                larger.append(i)
+                reach.append(board.dilate(g) & empty)
+            else:
+                bit = g.bit_length() - 1
+                singles[bit] = i
+                reach.append(tables[bit][0] & empty)
+        connections = []
+
+        # Group–group virtual connections. Two single stones share two empty
+        # neighbours only across a bridge with both carriers empty, so those
+        # pairs come from the bridge table; pairs with a larger group compare reach.
+        for bit, i in singles.items():
+            for target, carriers in tables[bit][1]:
+                if singles.get(target, -1) > i and carriers & empty == carriers:
+                    connections.append(carriers)
+        done = set()
+        for i in larger:
+            done.add(i)
+            for j in range(len(reach)):
+                if j not in done:
+                    carriers = reach[i] & reach[j]
+                    if carriers.bit_count() >= 2:
+                        connections.append(carriers)
+
+        # For human (player 1), also consider group + goal edge (TOP/BOTTOM)
+        if player == 1:
+            top, bottom = board.edges(1)
+            for g_reach in reach:
+                top_carriers = g_reach & top
+                if top_carriers.bit_count() >= 2:
+                    connections.append(top_carriers)
+                bottom_carriers = g_reach & bottom
+                if bottom_carriers.bit_count() >= 2:
+                    connections.append(bottom_carriers)
+
+        return connections
+
+    def blocking_move(self):
+        """The first cell where the human would win on the spot, if any."""
+        board = self.board
+        if self.human_wins():
+            return None
+        threats = board.winning_cells(1)
+        if threats:
+            return next(board.cells(threats))
+        return None
+
+    def cpu_has_response_after(self, h_r, h_c):
+        """
+        Given human has just played at (h_r, h_c),
+        check whether CPU has ANY counter move C adjacent to H
+        such that, after C, the human has NO immediate winning move.
+        """
+        board = self.board
+        responses = []
+        for nr, nc in self.neighbors(h_r, h_c):
+            if board.get(nr, nc) == 0:
+                responses.append((nr, nc))
+
+        if not responses:
+            return False
+
+        # Connectivity baseline after H is already on board
+        base_conn = self.cpu_connectivity_score()
+
+        for cr, cc in responses:
+            self.put(cr, cc, 2)
+
+            # Reject counters that worsen CPU LEFT→RIGHT connectivity
+            if self.cpu_connectivity_score() > base_conn:
+                self.take(cr, cc)
+                continue
+
+            # Accept if after C the human has no immediate winning move
+            if not self.human_immediate_wins():
+                self.take(cr, cc)
+                return True
+
+            self.take(cr, cc)
+
+        return False
+
+    def candidates(self):
+        """CPU candidate moves: empty cells next to CPU stones, else the centre or first empty cell."""
+        board = self.board
+        n = self.n
+        candidates = set()
+        for r, c in board.cells(board.blue):
+            for nr, nc in self.neighbors(r, c):
+                if board.get(nr, nc) == 0:
+                    candidates.add((nr, nc))
+
+        if not candidates:
+            # No neighbors: try center
+            center_r, center_c = n // 2, n // 2
+            if board.get(center_r, center_c) == 0:
+                candidates.add((center_r, center_c))
+            else:
+                empty = board.empty()
+                if empty:
+                    candidates.add(next(board.cells(empty)))
+
+        return list(candidates)
+
+    def reply_refutes(self, hr, hc):
+        """
+        True if the human reply H = (hr, hc), already on the board, refutes
+        the CPU move before it. Depends only on the board and on H, so the
+        verdict is cached under the position hash mixed with H.
+        """
+        extra = self.move_keys[hr * self.n + hc]
+        cached = self._probe(zobrist.REFUTATION, extra)
+        if cached is not zobrist.MISS:
+            return cached
+        refuted = self._reply_refutes(hr, hc)
+        self._store(zobrist.REFUTATION, refuted, 4, extra)
+        return refuted
+
+    def _reply_refutes(self, hr, hc):
+        board = self.board
+
+        # If this H already wins, M is unsafe
+        if self.human_wins():
+            return True
+
+        # --- Virtual-connection pruning ---
+        # After H, see if human has any virtual connection that
+        # CPU cannot break by playing on *any* of its carrier cells
+        # without immediately losing or worsening its own connectivity.
+        human_vcs = self.detect_virtual_connections(player=1)
+        if human_vcs:
+            base_conn_after_H = self.cpu_connectivity_score()
+            for carriers in human_vcs:
+                has_block = False
+                for cr, cc in board.cells(carriers):
+                    self.put(cr, cc, 2)
+                    # CPU block is acceptable only if:
+                    # - Human has no immediate winning reply after this block
+                    # - CPU's LEFT→RIGHT connectivity does not get worse
+                    if (not self.human_immediate_wins()) and (
+                        self.cpu_connectivity_score() <= base_conn_after_H
+                    ):
+                        has_block = True
+                        self.take(cr, cc)
+                        break
+                    self.take(cr, cc)
+                if not has_block:
+                    return True
+
+        # Otherwise CPU must have at least one valid counter adjacent to H
+        return not self.cpu_has_response_after(hr, hc)
+
+    def evaluate(self, mr, mc, base_conn_before):
+        """
+        Full logical backtracking for one candidate M.
+        Returns (verdict, improvement): WIN if M wins on the spot, REJECTED if
+        it worsens CPU connectivity, UNSAFE if some human reply refutes it,
+        SAFE otherwise. The board is left unchanged.
+        """
+        board = self.board
+        counters.add('candidates_evaluated')
+
+        # CPU plays M
+        self.play(mr, mc, 2)
+
+        # Enforce connectivity invariant: do not worsen LEFT→RIGHT potential
+        conn_after_M = self.cpu_connectivity_score()
+        if conn_after_M > base_conn_before:
+            self.unplay(mr, mc)
+            counters.add('candidates_pruned')
+            return REJECTED, 0
+
+        # Immediate CPU win
+        if self.cpu_wins():
+            self.unplay(mr, mc)
+            return WIN, 0
+        # Human replies: empty cells adjacent to any human stone
+        human_replies = board.dilate(board.green) & board.empty()
+
+        move_safe = True
+        for hr, hc in board.cells(human_replies):
+            # Human plays H
+            self.play(hr, hc, 1)
+            refuted = self.reply_refutes(hr, hc)
+            self.unplay(hr, hc)
+            if refuted:
+                move_safe = False
+                break
+
+        # Undo M
+        self.unplay(mr, mc)
+
+        if not move_safe:
+            counters.add('candidates_pruned')
+            return UNSAFE, 0
+        return SAFE, max(0, base_conn_before - conn_after_M)
+
+
+def pick_move(candidates, verdicts):
+    """
+    Combines per-candidate verdicts in candidate order: the first immediate
+    win is played at once, otherwise the safe move that best improves CPU
+    connectivity (first one on ties). Returns (cell, is_win) or (None, False).
+    verdicts may be a lazy iterable; it is consumed only up to a win.
+    """
+    best_safe_move = None
+    best_safe_improvement = -1  # higher is better
+    for move, (verdict, improvement) in zip(candidates, verdicts):
+        if verdict == WIN:
+            return move, True
+        if verdict == SAFE and improvement > best_safe_improvement:
+            # Keep the safe move that best improves CPU connectivity
+            best_safe_improvement = improvement
+            best_safe_move = move
+    return best_safe_move, False
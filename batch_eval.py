@@ -0,0 +1,371 @@
+"""
+NumPy-batched evaluation of CPU candidate moves.
+
+For every candidate cell we need the (human_dist, cpu_dist) pair that
+funcs.estimate_winning_chance would return after a CPU stone is put there.
+Instead of placing, measuring and undoing one cell at a time, all K
+candidate boards are stacked into (K, n, n) weight arrays and solved
+together with Bellman-Ford style relaxation sweeps: each sweep takes the
+minimum over the six shifted neighbour views of the whole stack at once,
+until nothing changes.
+
+numpy is optional; callers check available() and fall back to the
+incremental DistanceEngine when it is missing.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+INF = float('inf')
+# stands in for "blocked/unreachable" inside int32 arrays
+BIG = 1 << 20
+
+def available():
+    return np is not None
+
+
+def _weights(board, player):
+    '''0 for own stones, 1 for empty cells, BIG for everything else'''
+    w = np.full(board.shape, BIG, dtype=np.int32)
+    w[board == player] = 0
+    w[board == 0] = 1
+    return w
+
+
+def _row_pass(row, prefix, suffix):
+    '''
+    relaxes a stack of rows along the row in both directions at once:
+    walking from c' to c costs the weights after c' up to c, so prefix sums
+    plus a running minimum replace the cell-by-cell scan
+    '''
+    np.minimum(row, prefix + np.minimum.accumulate(row - prefix, axis=1), out=row)
+    rev = (row - suffix)[:, ::-1]
+    np.minimum(row, suffix + np.minimum.accumulate(rev, axis=1)[:, ::-1], out=row)
+    return row
+
+
+def _relax(weights, dist):
+    '''
+    solves the 0/1 vertex-weighted distances from the top edge for a stack
+    of boards; dist holds upper bounds (BIG where unknown). Rows are swept
+    top-down, then bottom-up; when the upward sweep changes nothing every
+    cell is consistent with all six neighbours and the fixpoint is reached.
+    '''
+    k, n, _ = weights.shape
+    weights = weights.astype(np.int64)
+    dist = dist.astype(np.int64)
+    prefix = np.cumsum(weights, axis=2)
+    suffix = np.cumsum(weights[:, :, ::-1], axis=2)[:, :, ::-1]
+    while True:
+        for r in range(n):
+            if r == 0:
+                # the top edge itself is at distance 0
+                incoming = weights[:, 0, :]
+            else:
+                # (r-1, c) and (r-1, c+1) are the neighbours above
+                up = dist[:, r - 1, :]
+                incoming = up.copy()
+                np.minimum(incoming[:, :-1], up[:, 1:], out=incoming[:, :-1])
+                incoming += weights[:, r, :]
+            row = np.minimum(dist[:, r, :], incoming)
+            dist[:, r, :] = _row_pass(row, prefix[:, r, :], suffix[:, r, :])
+        changed = False
+        for r in range(n - 2, -1, -1):
+            # (r+1, c) and (r+1, c-1) are the neighbours below
+            down = dist[:, r + 1, :]
+            below = down.copy()
+            np.minimum(below[:, 1:], down[:, :-1], out=below[:, 1:])
+            below += weights[:, r, :]
+            if (below < dist[:, r, :]).any():
+                row = np.minimum(dist[:, r, :], below)
+                dist[:, r, :] = _row_pass(row, prefix[:, r, :], suffix[:, r, :])
+                changed = True
+        if not changed:
+            return np.minimum(dist, BIG)
+
+
+def _solve(weights, dist, player):
+    '''
+    distances from player's start edge; Blue's left-to-right problem is the
+    transposed top-to-bottom one (the hex neighbourhood is symmetric under
+    transposition)
+    '''
+    if player == 1:
+        return _relax(weights, dist)
+    t = (0, 2, 1)
+    solved = _relax(np.ascontiguousarray(weights.transpose(t)),
+                    np.ascontiguousarray(dist.transpose(t)))
+    return solved.transpose(t)
+
+
+def _goal_distance(dist, player):
+    '''per-board minimum over the goal edge, as Python ints or inf'''
+    if player == 1:
+        goal = dist[:, -1, :].min(axis=1)
+    else:
+        goal = dist[:, :, -1].min(axis=1)
+    return [INF if d >= BIG else int(d) for d in goal.tolist()]
+
+
+def board_distances(grid):
+    '''(player1_distance, player2_distance) for a single board'''
+    board = np.array(grid, dtype=np.int8)[None]
+    start = np.full(board.shape, BIG, dtype=np.int32)
+    green = _goal_distance(_solve(_weights(board, 1), start, 1), 1)[0]
+    blue = _goal_distance(_solve(_weights(board, 2), start, 2), 2)[0]
+    return (green, blue)
+
+
+def _solve_from_goal(weights, player):
+    '''distances from player's goal edge, via the 180 degree rotated board'''
+    rotated = np.ascontiguousarray(weights[:, ::-1, ::-1])
+    start = np.full(rotated.shape, BIG, dtype=np.int32)
+    return _solve(rotated, start, player)[:, ::-1, ::-1]
+
+
+def _field(board, player):
+    '''(weights, distance from start, best distance, cost of best path through each cell)'''
+    weights = _weights(board, player)[None]
+    start = np.full(weights.shape, BIG, dtype=np.int32)
+    from_start = _solve(weights, start, player)
+    through = from_start + _solve_from_goal(weights, player) - weights
+    best = _goal_distance(from_start, player)[0]
+    return weights, from_start, best, through[0]
+
+
+def candidate_fields(grid, player=2):
+    '''
+    the part of candidate_distances that does not depend on the candidates:
+    (mover's best distance, mover's cost through each cell, opponent's best
+    distance, opponent's cost through each cell). Callers that split the
+    candidates (parallel_eval) compute it once per board and pass it on
+    '''
+    board = np.array(grid, dtype=np.int8)
+    _, _, own_best, own_through = _field(board, player)
+    _, _, opp_best, opp_through = _field(board, 3 - player)
+    return own_best, own_through, opp_best, opp_through
+
+
+def candidate_distances(grid, cells, player=2, fields=None):
+    '''
+    For each empty (r, c) in cells, the (player1_distance, player2_distance)
+    pair after player puts a stone on that cell, in the order of cells.
+
+    The mover's new distance has a closed form: the best path through the
+    cell gets one step cheaper, so it is min(best, through - 1). The
+    opponent only loses distance-neutral cells unless the cell lies on one
+    of its shortest paths, so only those candidate boards are stacked and
+    re-solved together with the relaxation sweeps. fields is
+    candidate_fields(grid, player), computed here if not given.
+    '''
+    if not cells:
+        return []
+    board = np.array(grid, dtype=np.int8)
+    k = len(cells)
+    rows = np.fromiter((r for r, _ in cells), dtype=np.intp, count=k)
+    cols = np.fromiter((c for _, c in cells), dtype=np.intp, count=k)
+    opponent = 3 - player
+    if fields is None:
+        fields = candidate_fields(grid, player)
+    own_best, own_through, opp_best, opp_through = fields
+
+    through = own_through[rows, cols]
+    own = [min(own_best, INF if d >= BIG else int(d) - 1) for d in through.tolist()]
+
+    opp = [opp_best] * k
+    if opp_best < BIG:
+        hit = np.nonzero(opp_through[rows, cols] <= opp_best)[0]
+        if len(hit):
+            opp_w = _weights(board, opponent)[None]
+            stack = np.repeat(opp_w, len(hit), axis=0)
+            stack[np.arange(len(hit)), rows[hit], cols[hit]] = BIG
+            # blocking a cell only lengthens paths, so start from scratch
+            start = np.full(stack.shape, BIG, dtype=np.int32)
+            for j, d in zip(hit.tolist(), _goal_distance(_solve(stack, start, opponent), opponent)):
+                opp[j] = d
+
+    if player == 1:
+        return list(zip(own, opp))
+    return list(zip(opp, own))
+
+
+def _min_of_offsets(tables, offsets):
+    '''per cell of a (k, n, n) stack, the minimum at the in-board offsets (BIG where none)'''
+    k, n, _ = tables.shape
+    padded = np.full((k, n + 2, n + 2), BIG, dtype=tables.dtype)
+    padded[:, 1:-1, 1:-1] = tables
+    out = np.full_like(tables, BIG)
+    for da, db in offsets:
+        np.minimum(out, padded[:, 1 + da:1 + da + n, 1 + db:1 + db + n], out=out)
+    return out
+
+
+# predecessors of the DP strategy's left table, as (dc, dr) offsets in the
+# column-major layout used below: engine.DP_PREDECESSORS with the axes swapped
+_DP_PREDECESSORS_T = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1))
+
+
+def _column_steps(cost):
+    '''
+    For a column-major (k, n, n) cost stack, step[b, c, p, r]: the cost of
+    entering column c next to row p of column c - 1 (rows p - 1, p, p + 1)
+    and walking along column c to row r, both ends included. With inclusive
+    prefix sums S and exclusive ones P, walking from e to r costs
+    S[r] - P[e] if e <= r and S[e] - P[r] otherwise; the other expression is
+    never larger, so the walk is the maximum of the two.
+    '''
+    inclusive = np.cumsum(cost, axis=2)
+    exclusive = inclusive - cost
+    walk = inclusive[..., None, :] - exclusive[..., :, None]
+    np.maximum(walk, inclusive[..., :, None] - exclusive[..., None, :], out=walk)
+    np.minimum(walk, BIG, out=walk)
+    step = walk.copy()
+    np.minimum(step[..., 1:, :], walk[..., :-1, :], out=step[..., 1:, :])
+    np.minimum(step[..., :-1, :], walk[..., 1:, :], out=step[..., :-1, :])
+    return step
+
+
+def _dp_sweep(step, dp, start=1, stop=None):
+    '''
+    one left-to-right pass over the columns start..stop-1 (default: to the
+    end) of a column-major (k, n, n) stack; each column is a min-plus
+    product of the column before with its step matrix
+    '''
+    start = max(start, 1)
+    stop = dp.shape[1] if stop is None else stop
+    paths = np.empty_like(step[:, 0])
+    for c in range(start, stop):
+        np.add(dp[:, c - 1, :, None], step[:, c], out=paths)
+        np.minimum.reduce(paths, axis=1, out=dp[:, c, :])
+    np.minimum(dp[:, start:stop], BIG, out=dp[:, start:stop])
+
+
+def _dp_cost(board):
+    '''column-major stack of Blue's weights and their mirror image, for dp_left and dp_right'''
+    w = _weights(board, 2)
+    return np.ascontiguousarray(np.stack((w.T, w[:, ::-1].T)))
+
+
+def _dp_recurrence(dp, cost):
+    '''the right-hand side of the DP recurrence at every cell of a stack'''
+    relaxed = np.minimum(_min_of_offsets(dp, _DP_PREDECESSORS_T) + cost, BIG)
+    relaxed[:, 0, :] = np.minimum(cost[:, 0, :], BIG)
+    return relaxed
+
+
+def _dp_solve(cost, step):
+    '''the column-major (dp_left, mirrored dp_right) stack, swept until it satisfies the recurrence'''
+    dp = np.full(cost.shape, BIG, dtype=np.int32)
+    dp[:, 0, :] = np.minimum(cost[:, 0, :], BIG)
+    while True:
+        _dp_sweep(step, dp)
+        if not (_dp_recurrence(dp, cost) < dp).any():
+            return dp
+
+
+def dp_tables(grid):
+    '''
+    The DP strategy's (dp_left, dp_right) tables of Blue as (n, n) int32
+    arrays, BIG where a cell cannot be reached.
+
+    dp_right is dp_left of the mirrored board (the successor offsets mirror
+    onto the predecessor offsets), so both are built as one stack of two
+    boards, stored column-major so that a column is a contiguous row. A
+    sweep fills the columns in order, each with one min-plus product over
+    all the ways into it, so paths that double back along a column are
+    included. Sweeps repeat until the tables satisfy the recurrence
+    everywhere.
+    '''
+    cost = _dp_cost(np.array(grid, dtype=np.int8))
+    dp = _dp_solve(cost, _column_steps(cost))
+    return dp[0].T, dp[1].T[:, ::-1]
+
+
+class DPTables:
+    '''
+    The DP strategy's tables (as built by dp_tables), kept between turns.
+
+    update() compares the board with the one the tables were last brought
+    up to date for. A change in column c can only affect dp_left from
+    column c on, and dp_right up to column c. In the mirrored half of the
+    stack that is also "from column n - 1 - c on". So only the step
+    matrices of the changed columns are rebuilt, and each half is swept
+    from the first column it needs (jointly once both need a column). The
+    tables must then satisfy the
+    recurrence exactly. If they do not, or the board size changed, they
+    are rebuilt from scratch.
+    '''
+    def __init__(self):
+        self.board = None
+        self.cost = self.step = self.dp = None
+        self.updates = 0
+        self.rebuilds = 0
+        # columns of both tables recomputed by the last update
+        self.columns_swept = 0
+
+    def _rebuild(self, board):
+        self.board = board
+        self.cost = _dp_cost(board)
+        self.step = _column_steps(self.cost)
+        self.dp = _dp_solve(self.cost, self.step)
+        self.rebuilds += 1
+        self.columns_swept = 2 * board.shape[0]
+
+    def update(self, board):
+        '''brings the tables up to date with an (n, n) int8 board; returns the column-major stack'''
+        self.updates += 1
+        if self.board is None or self.board.shape != board.shape:
+            self._rebuild(board)
+            return self.dp
+        changed = np.flatnonzero((board != self.board).any(axis=0))
+        if not len(changed):
+            self.columns_swept = 0
+            return self.dp
+        n = board.shape[0]
+        self.board = board
+        cost = self.cost = _dp_cost(board)
+        mirrored = n - 1 - changed
+        self.step[0, changed] = _column_steps(cost[:1, changed])[0]
+        self.step[1, mirrored] = _column_steps(cost[1:, mirrored])[0]
+        starts = (int(changed[0]), int(mirrored[-1]))
+        dp, step = self.dp, self.step
+        dp[:, 0, :] = np.minimum(cost[:, 0, :], BIG)
+        # the half with the earlier start goes alone until the other joins
+        h = 0 if starts[0] < starts[1] else 1
+        joint = max(starts)
+        _dp_sweep(step[h:h + 1], dp[h:h + 1], starts[h], joint)
+        _dp_sweep(step, dp, joint)
+        self.columns_swept = 2 * n - sum(starts)
+        if (_dp_recurrence(dp, cost) != dp).any():
+            self._rebuild(board)
+        return self.dp
+
+    def stats(self):
+        return {'updates': self.updates, 'rebuilds': self.rebuilds,
+                'columns_swept': self.columns_swept}
+
+
+def dp_choice(grid, tables=None):
+    '''
+    The DP strategy's move for Blue: the empty cell with the shortest
+    left-to-right path through it, the first in row-major order on ties;
+    None if no empty cell lies on any path. With a DPTables, its tables
+    are updated instead of built from scratch.
+    '''
+    board = np.array(grid, dtype=np.int8)
+    n = board.shape[0]
+    if tables is None:
+        cost = _dp_cost(board)
+        dp = _dp_solve(cost, _column_steps(cost))
+    else:
+        dp = tables.update(board)
+    reach = _min_of_offsets(dp, _DP_PREDECESSORS_T)
+    # cells on the left edge start a path, cells on the right edge end one
+    reach[:, 0, :] = 0
+    total = reach[0].T + reach[1].T[:, ::-1]
+    total[board != 0] = 4 * BIG
+    best = int(total.argmin())
+    if total.flat[best] >= BIG:
+        return None
+    return divmod(best, n)
@@ -0,0 +1,184 @@
+"""
+Board-size scaling benchmark for the CPU strategies.
+
+For every strategy, board size and fill ratio a few seeded positions are
+generated (random stones, Green to have moved last, nobody connected
+yet). Each strategy then picks a move on a fresh engine for every
+position: first some untimed warmup runs, then repeated timed runs.
+Results are written as JSON keyed "strategy|size|fill", and can be
+checked against a stored baseline file; any case whose median time grew
+by more than the threshold is reported and the exit status is 1.
+
+Usage:
+    python benchmark.py --out bench.json --save-baseline bench_baseline.json
+    python benchmark.py --out bench.json --baseline bench_baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+from datetime import datetime
+from time import perf_counter
+
+from consts import MIN_BOARD_SIZE, MAX_BOARD_SIZE, STRATEGIES
+from engine import HexEngine
+
+DEFAULT_FILLS = (0.0, 0.1, 0.25, 0.4)
+# cases faster than this (ms) are too noisy to call a regression
+NOISE_FLOOR_MS = 0.05
+
+
+def generate_positions(size, fill, count, seed):
+    '''
+    count seeded positions with about fill * size^2 stones, Green having one
+    stone more than Blue (so it is Blue's turn) and no winner yet
+    '''
+    rng = random.Random('{}:{}:{}'.format(seed, size, fill))
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    stones = int(fill * size * size)
+    if stones % 2 == 0 and stones:
+        stones -= 1  # odd count: Green moved last
+    positions = []
+    while len(positions) < count:
+        engine = HexEngine(size)
+        rng.shuffle(cells)
+        for i, (r, c) in enumerate(cells[:stones]):
+            engine.placeStone(r, c, 1 if i % 2 == 0 else 2)
+        if not engine.checkWin():
+            positions.append([row[:] for row in engine.state])
+    return positions
+
+
+def _engine_for(position, strategy):
+    engine = HexEngine(len(position))
+    engine.ai_mode = strategy
+    # time the strategy itself, not an opening book hit or an endgame solve
+    engine.use_book = False
+    engine.endgame_threshold = 0
+    for r, row in enumerate(position):
+        for c, v in enumerate(row):
+            if v:
+                engine.placeStone(r, c, v)
+    engine.move = 2
+    return engine
+
+
+def time_case(strategy, positions, warmup, repeat):
+    '''per-move seconds of strategy over positions, warmup runs discarded'''
+    for position in positions:
+        for _ in range(warmup):
+            _engine_for(position, strategy).cpuMove()
+    times = []
+    for position in positions:
+        for _ in range(repeat):
+            engine = _engine_for(position, strategy)
+            start = perf_counter()
+            engine.cpuMove()
+            times.append(perf_counter() - start)
+    return times
+
+
+def run(strategies, sizes, fills, positions, warmup, repeat, seed, progress=None):
+    results = {}
+    cases = [(s, n, f) for n in sizes for f in fills for s in strategies]
+    for done, (strategy, size, fill) in enumerate(cases, 1):
+        boards = generate_positions(size, fill, positions, seed)
+        times = time_case(strategy, boards, warmup, repeat)
+        results['{}|{}|{}'.format(strategy, size, fill)] = {
+            'strategy': strategy,
+            'size': size,
+            'fill': fill,
+            'runs': len(times),
+            'median_ms': round(statistics.median(times) * 1000.0, 4),
+            'mean_ms': round(statistics.mean(times) * 1000.0, 4),
+            'min_ms': round(min(times) * 1000.0, 4),
+            'max_ms': round(max(times) * 1000.0, 4),
+        }
+        if progress:
+            progress(done, len(cases), strategy, size, fill)
+    return results
+
+
+def compare(results, baseline, threshold):
+    '''list of (key, baseline_ms, current_ms, ratio) for cases slower than 1 + threshold'''
+    regressions = []
+    for key, current in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            continue
+        base_ms, cur_ms = base['median_ms'], current['median_ms']
+        if cur_ms - base_ms < NOISE_FLOOR_MS:
+            continue
+        ratio = cur_ms / base_ms if base_ms > 0 else float('inf')
+        if ratio > 1.0 + threshold:
+            regressions.append((key, base_ms, cur_ms, ratio))
+    return regressions
+
+
+def _metadata(args):
+    return {
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'positions': args.positions,
+        'warmup': args.warmup,
+        'repeat': args.repeat,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time every CPU strategy across board sizes.')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=STRATEGIES)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=list(range(MIN_BOARD_SIZE, MAX_BOARD_SIZE + 1)))
+    parser.add_argument('--fills', type=float, nargs='+', default=list(DEFAULT_FILLS),
+                        help='fraction of the board covered by stones')
+    parser.add_argument('--positions', type=int, default=3, help='positions per size and fill')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs per position')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per position')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='bench_results.json', help='where to write the results')
+    parser.add_argument('--baseline', help='baseline results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed relative slowdown of the median before failing')
+    parser.add_argument('--save-baseline', help='also write the results as a new baseline file')
+    args = parser.parse_args(argv)
+
+    for size in args.sizes:
+        if not MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE:
+            parser.error('board size {} is outside {}..{}'.format(size, MIN_BOARD_SIZE, MAX_BOARD_SIZE))
+
+    def progress(done, total, strategy, size, fill):
+        print('\r[{}/{}] {} {}x{} fill {}'.format(done, total, strategy, size, size, fill).ljust(60),
+              end='', flush=True)
+
+    results = run(args.strategies, args.sizes, args.fills, args.positions,
+                  args.warmup, args.repeat, args.seed, progress)
+    print()
+    document = {'meta': _metadata(args), 'results': results}
+    with open(args.out, 'w') as f:
+        json.dump(document, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(document, f, indent=2)
+
+    for key, res in results.items():
+        print('{:<28}{:>12.3f} ms'.format(key, res['median_ms']))
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f).get('results', {})
+        regressions = compare(results, baseline, args.threshold)
+        for key, base_ms, cur_ms, ratio in regressions:
+            print('REGRESSION {}: {:.3f} ms -> {:.3f} ms (x{:.2f})'.format(key, base_ms, cur_ms, ratio))
+        if regressions:
+            return 1
+        print('no regressions beyond {:.0%}'.format(args.threshold))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Bitboard representation of a Hex position.
+
+Each player's stones are stored as one Python integer used as a bitmask.
+Cell (r, c) lives at bit r*stride + c where stride = size + 1: every row
+carries one always-empty guard column, so shifting a mask by +-1 never
+wraps a stone onto the neighbouring row. The six hex neighbours of every
+stone on the board are therefore reached with six shifts and one mask,
+which makes flood fill and edge-to-edge connectivity bit-parallel over
+whole rows instead of cell-by-cell Python loops.
+
+The board also speaks the list-of-lists protocol (len(board), board[r][c],
+board[r][c] = v) so the existing strategies and the Dijkstra helpers in
+funcs.py can run on it unchanged.
+"""
+
+# per-size geometry masks, computed once
+_GEOMETRY = {}
+
+
+def geometry(size):
+    """(valid, top, bottom, left, right, column masks) of a board size, shared by every board of that size."""
+    geo = _GEOMETRY.get(size)
+    if geo is None:
+        stride = size + 1
+        row = (1 << size) - 1
+        valid = 0
+        for r in range(size):
+            valid |= row << (r * stride)
+        top = row
+        bottom = row << ((size - 1) * stride)
+        columns = []
+        for c in range(size):
+            col = 0
+            for r in range(size):
+                col |= 1 << (r * stride + c)
+            columns.append(col)
+        geo = (valid, top, bottom, columns[0], columns[-1], tuple(columns))
+        _GEOMETRY[size] = geo
+    return geo
+
+
+class _BitRow:
+    '''row view so that board[r][c] reads and writes work like a list'''
+    __slots__ = ('board', 'r')
+
+    def __init__(self, board, r):
+        self.board = board
+        self.r = r
+
+    def __len__(self):
+        return self.board.size
+
+    def __getitem__(self, c):
+        return self.board.get(self.r, c)
+
+    def __setitem__(self, c, value):
+        self.board.set(self.r, c, value)
+
+    def __iter__(self):
+        return (self.board.get(self.r, c) for c in range(self.board.size))
+
+
+class BitBoard:
+    """
+    Hex board with one integer bitmask per player.
+    Player 1 (Green) connects top to bottom, player 2 (Blue) left to right.
+    """
+    __slots__ = ('size', 'stride', 'green', 'blue')
+
+    def __init__(self, size, green=0, blue=0):
+        self.size = size
+        self.stride = size + 1
+        self.green = green
+        self.blue = blue
+
+    @classmethod
+    def from_grid(cls, grid):
+        '''builds a bitboard from a list-of-lists board (values other than 1/2 are empty)'''
+        size = len(grid)
+        stride = size + 1
+        green = blue = 0
+        for r, row in enumerate(grid):
+            base = r * stride
+            for c, v in enumerate(row):
+                if v == 1:
+                    green |= 1 << (base + c)
+                elif v == 2:
+                    blue |= 1 << (base + c)
+        return cls(size, green, blue)
+
+    def to_grid(self):
+        '''returns the position as a list-of-lists board'''
+        return [[self.get(r, c) for c in range(self.size)] for r in range(self.size)]
+
+    def copy(self):
+        return BitBoard(self.size, self.green, self.blue)
+
+    def key(self):
+        '''hashable snapshot of the position'''
+        return (self.size, self.green, self.blue)
+
+    def __eq__(self, other):
+        return isinstance(other, BitBoard) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    # ------------------------- cell access -------------------------
+
+    def bit(self, r, c):
+        return 1 << (r * self.stride + c)
+
+    def cell(self, index):
+        '''translates a bit index back to (r, c)'''
+        return divmod(index, self.stride)
+
+    def get(self, r, c):
+        b = 1 << (r * self.stride + c)
+        if self.green & b:
+            return 1
+        if self.blue & b:
+            return 2
+        return 0
+
+    def set(self, r, c, player):
+        '''puts a stone of player on (r, c); any other value clears the cell'''
+        b = 1 << (r * self.stride + c)
+        self.green &= ~b
+        self.blue &= ~b
+        if player == 1:
+            self.green |= b
+        elif player == 2:
+            self.blue |= b
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, r):
+        return _BitRow(self, r)
+
+    def __iter__(self):
+        return (_BitRow(self, r) for r in range(self.size))
+
+    # ------------------------- masks -------------------------
+
+    def stones(self, player):
+        return self.green if player == 1 else self.blue
+
+    def empty(self):
+        return geometry(self.size)[0] & ~(self.green | self.blue)
+
+    def edges(self, player):
+        '''(start edge, goal edge) masks of a player'''
+        _, top, bottom, left, right, _ = geometry(self.size)
+        return (top, bottom) if player == 1 else (left, right)
+
+    def column(self, c):
+        return geometry(self.size)[5][c]
+
+    def dilate(self, mask):
+        '''mask plus all of its hex neighbours, computed for every stone at once'''
+        s = self.stride
+        grown = (mask | mask << 1 | mask >> 1 | mask << s | mask >> s
+                 | mask << (s - 1) | mask >> (s - 1))
+        return grown & geometry(self.size)[0]
+
+    def flood(self, seed, within):
+        '''all cells of within connected to seed (seed is clipped to within)'''
+        s = self.stride
+        valid = geometry(self.size)[0]
+        within &= valid
+        region = seed & within
+        while True:
+            grown = (region | region << 1 | region >> 1 | region << s | region >> s
+                     | region << (s - 1) | region >> (s - 1)) & within
+            if grown == region:
+                return region
+            region = grown
+
+    def components(self, player):
+        '''connected groups of a player as masks, ordered by their first cell'''
+        rest = self.stones(player)
+        groups = []
+        while rest:
+            group = self.flood(rest & -rest, rest)
+            groups.append(group)
+            rest &= ~group
+        return groups
+
+    def cells(self, mask):
+        '''yields (r, c) of every set bit in row-major order'''
+        s = self.stride
+        while mask:
+            low = mask & -mask
+            yield divmod(low.bit_length() - 1, s)
+            mask ^= low
+
+    # ------------------------- connectivity -------------------------
+
+    def has_won(self, player):
+        '''True if player's stones join their two edges'''
+        own = self.stones(player)
+        start, goal = self.edges(player)
+        return bool(self.flood(own & start, own) & goal)
+
+    def winner(self):
+        '''2 if Blue has won, 1 if Green has won, 0 otherwise'''
+        if self.has_won(2):
+            return 2
+        if self.has_won(1):
+            return 1
+        return 0
+
+    def winning_cells(self, player):
+        '''
+        mask of empty cells next to player's stones that win the game on the spot
+        (every such cell if the player has already connected)
+        '''
+        own = self.stones(player)
+        if not own:
+            return 0
+        start, goal = self.edges(player)
+        empty = self.empty()
+        touching = self.dilate(own) & empty
+        from_start = self.flood(own & start, own)
+        if from_start & goal:
+            return touching
+        from_goal = self.flood(own & goal, own)
+        return (touching & (self.dilate(from_start) | start)
+                & (self.dilate(from_goal) | goal))
@@ -0,0 +1,144 @@
+"""
+Offline builder of the opening books read by opening_book.py.
+
+The builder enumerates every position Green can reach in its first
+`plies` moves, with Blue answering each from the book built so far, and
+searches Blue's reply to every new position. Each reply comes from a
+deep search, by default Alpha-Beta with a much larger time budget than
+the UI allows. Positions that match an earlier one under the 180-degree
+rotation are searched only once. The searches are spread across a
+process pool.
+
+Usage:
+    python book_builder.py --sizes 5 7 9 11 --plies 1 --budget-ms 2000
+    python book_builder.py --sizes 5 --plies 2 --strategy MCTS --playouts 20000
+"""
+import argparse
+import multiprocessing as mp
+import os
+
+from consts import MIN_BOARD_SIZE, MAX_BOARD_SIZE, STRATEGIES
+from engine import HexEngine
+import opening_book
+import zobrist
+
+DEFAULT_STRATEGY = 'Alpha-Beta'
+DEFAULT_BUDGET_MS = 2000
+
+
+def position_hashes(size, stones):
+    '''(hash, hash of the 180-degree rotation) of [(cell, player)], as HexEngine keeps them'''
+    keys = zobrist.zobrist_keys(size)
+    h = h180 = 0
+    for cell, player in stones:
+        h ^= keys[player - 1][cell]
+        h180 ^= keys[player - 1][opening_book.rotate(size, cell)]
+    return h, h180
+
+
+def search_reply(task):
+    '''Blue's reply to one position; task = (size, stones, strategy, settings)'''
+    size, stones, strategy, settings = task
+    engine = HexEngine(size)
+    engine.ai_mode = strategy
+    engine.use_book = False
+    for name, value in settings.items():
+        setattr(engine, name, value)
+    for cell, player in stones:
+        engine.placeStone(cell // size, cell % size, player)
+    engine.move = 2
+    before = engine.last_move
+    engine.cpuMove()
+    if engine.last_move == before or engine.checkWin():
+        # no move, or the game is over after it: nothing worth continuing
+        reply = None if engine.last_move == before else engine.last_move
+        return stones, reply, True
+    return stones, engine.last_move, False
+
+
+def build(size, plies, strategy, settings, workers, progress=None):
+    '''{canonical key: flat move} for Green's first `plies` moves'''
+    entries = {}
+    frontier = [[]]
+    for ply in range(plies):
+        seen = set()
+        tasks = []
+        for stones in frontier:
+            taken = {cell for cell, _ in stones}
+            for cell in range(size * size):
+                if cell in taken:
+                    continue
+                position = stones + [(cell, 1)]
+                key = min(position_hashes(size, position))
+                if key in seen or key in entries:
+                    continue
+                seen.add(key)
+                tasks.append((size, position, strategy, settings))
+        frontier = []
+        done = 0
+        if workers <= 1:
+            results = map(search_reply, tasks)
+        else:
+            pool = mp.get_context('spawn').Pool(workers)
+            results = pool.imap_unordered(search_reply, tasks, chunksize=1)
+        try:
+            for stones, reply, finished in results:
+                done += 1
+                if progress:
+                    progress(size, ply + 1, done, len(tasks))
+                if reply is None:
+                    continue
+                cell = reply[0] * size + reply[1]
+                h, h180 = position_hashes(size, stones)
+                if h180 < h:
+                    entries[h180] = opening_book.rotate(size, cell)
+                else:
+                    entries[h] = cell
+                if not finished:
+                    frontier.append(stones + [(cell, 2)])
+        finally:
+            if workers > 1:
+                pool.terminate()
+                pool.join()
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the opening books for the CPU.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 7, 9, 11],
+                        help='board sizes, each between {} and {}'.format(MIN_BOARD_SIZE, MAX_BOARD_SIZE))
+    parser.add_argument('--plies', type=int, default=1,
+                        help='Green moves covered by the book')
+    parser.add_argument('--strategy', default=DEFAULT_STRATEGY, choices=STRATEGIES,
+                        help='search that picks the book replies')
+    parser.add_argument('--budget-ms', type=int, default=DEFAULT_BUDGET_MS,
+                        help='per-position time budget of Alpha-Beta and MCTS')
+    parser.add_argument('--playouts', type=int, default=None,
+                        help='per-position playout limit of MCTS')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--out-dir', default=opening_book.BOOK_DIR)
+    args = parser.parse_args(argv)
+
+    for size in args.sizes:
+        if not MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE:
+            parser.error('board size {} is outside {}..{}'.format(size, MIN_BOARD_SIZE, MAX_BOARD_SIZE))
+    if args.plies < 1:
+        parser.error('--plies must be at least 1')
+    if args.budget_ms < 1:
+        parser.error('--budget-ms must be at least 1')
+    settings = {'ab_budget_ms': args.budget_ms, 'mcts_budget_ms': args.budget_ms,
+                'mcts_playouts': args.playouts}
+
+    def progress(size, ply, done, total):
+        print('\r{0}x{0} ply {1}: {2}/{3} positions'.format(size, ply, done, total), end='', flush=True)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for size in args.sizes:
+        entries = build(size, args.plies, args.strategy, settings, args.workers, progress)
+        path = opening_book.book_path(size, args.out_dir)
+        opening_book.write_book(path, size, entries)
+        print('\n{}: {} positions'.format(path, len(entries)))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,56 +4,25 @@ Displays per-strategy session statistics in a pygame UI table and
 provides a button to open the matplotlib time complexity graph.
 """
 
-import json
 from datetime import datetime
 
 import pygame as pg
 
-from consts import W, H, WHITE, BLACK, ORANGE, LIGHTYELLOW, GREEN, BLUE, YELLOW
-from funcs import textOut
+from stats_store import stats_store
+from consts import W, H, WHITE, BLACK, ORANGE, LIGHTYELLOW, GREEN, LIGHTGREEN, BLUE, YELLOW, RED, STRATEGIES
+from funcs import textOut, renderText
 from time_complexity_dashboard import show_time_complexity_dashboard
 
+# row colour of each strategy
+COLORS = {'Greedy': GREEN, 'D&C': BLUE, 'DP': YELLOW, 'Backtracking': ORANGE,
+          'Alpha-Beta': LIGHTGREEN, 'MCTS': RED}
+
 
 def _load_stats():
-    """Load session-based stats from cpu_performance_log.json and aggregate per strategy."""
-    log_file = 'cpu_performance_log.json'
-    try:
-        with open(log_file, 'r') as f:
-            data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        data = []
-
-    if not isinstance(data, list):
-        data = []
-
-    strategies = ['Greedy', 'D&C', 'DP', 'Backtracking']
-    stats = {
-        s: {
-            'last': None,
-            'best': None,
-            'worst': None,
-            'count': 0,
-        }
-        for s in strategies
-    }
-
-    for entry in data:
-        s = entry.get('strategy')
-        if s not in stats:
-            continue
-        t_val = entry.get('avg_execution_time', entry.get('execution_time'))
-        if not isinstance(t_val, (int, float)):
-            continue
-        # Incremental aggregation; assume file is append-only in time order.
-        st = stats[s]
-        st['count'] += 1
-        st['last'] = t_val
-        if st['best'] is None or t_val < st['best']:
-            st['best'] = t_val
-        if st['worst'] is None or t_val > st['worst']:
-            st['worst'] = t_val
-
-    return stats
+    """Per-strategy session stats, updated from whatever was logged since the last call."""
+    store = stats_store()
+    store.refresh()
+    return store.summaries()
 
 
 def show_complexity_stats_ui(screen):
@@ -84,7 +53,7 @@ def show_complexity_stats_ui(screen):
                 if graph_rect.collidepoint(mx, my):
                     show_time_complexity_dashboard()
 
-        # Load stats each frame in case file is updated between sessions
+        # Picks up sessions logged since the last frame; an unchanged log costs one stat call
         stats = _load_stats()
 
         # Draw background
@@ -109,12 +78,8 @@ def show_complexity_stats_ui(screen):
         row_y_start = header_y + 45
         row_h = 45
         row_idx = 0
-        for strategy, color in [
-            ('Greedy', GREEN),
-            ('D&C', BLUE),
-            ('DP', YELLOW),
-            ('Backtracking', ORANGE),
-        ]:
+        for strategy in STRATEGIES:
+            color = COLORS[strategy]
             st = stats.get(strategy, {})
             y = row_y_start + row_idx * row_h
             last = st.get('last')
@@ -161,11 +126,9 @@ def show_complexity_stats_window():
     clock = pg.time.Clock()
     running = True
 
-    # Fonts
-    title_font = pg.font.SysFont(None, 32)
-    header_font = pg.font.SysFont(None, 30)
-    row_font = pg.font.SysFont(None, 28)
-    button_font = pg.font.SysFont(None, 28)
+    # Text is rendered with the default font through the shared text cache
+    def text(txt, size, col):
+        return renderText(txt, size, col, True, None)
 
     # Button rect for "Show Graph"
     show_graph_rect = pg.Rect(width // 2 - 100, height - 70, 200, 45)
@@ -188,39 +151,37 @@ def show_complexity_stats_window():
         screen.fill(BLACK)
 
         # Title
-        title_surf = title_font.render('CPU Strategy Complexity Stats', True, ORANGE)
+        title_surf = text('CPU Strategy Complexity Stats', 32, ORANGE)
         title_rect = title_surf.get_rect(center=(width // 2, 60))
         screen.blit(title_surf, title_rect)
 
         # Column headers
         header_y = 130
         col_x = [
-            width * 0.15,  # Strategy
-            width * 0.35,  # Last Avg
-            width * 0.55,  # Best Avg
-            width * 0.75,  # Worst Avg
-            width * 0.90,  # Sessions
+            width * 0.09,  # Strategy
+            width * 0.22,  # Last Avg
+            width * 0.33,  # Best Avg
+            width * 0.44,  # Worst Avg
+            width * 0.56,  # p50
+            width * 0.67,  # p95
+            width * 0.78,  # p99
+            width * 0.91,  # Sessions
         ]
-        headers = ['Strategy', 'Last Avg (s)', 'Best Avg (s)', 'Worst Avg (s)', 'Sessions']
-        for x, text in zip(col_x, headers):
-            surf = header_font.render(text, True, LIGHTYELLOW)
+        headers = ['Strategy', 'Last (s)', 'Best (s)', 'Worst (s)', 'p50 (s)', 'p95 (s)', 'p99 (s)', 'Sessions']
+        for x, label in zip(col_x, headers):
+            surf = text(label, 26, LIGHTYELLOW)
             rect = surf.get_rect(center=(int(x), header_y))
             screen.blit(surf, rect)
 
         # Draw rows
         row_y_start = header_y + 50
         row_h = 50
-        strategies = [
-            ('Greedy', GREEN),
-            ('D&C', BLUE),
-            ('DP', YELLOW),
-            ('Backtracking', ORANGE),
-        ]
 
         def fmt(val):
             return f'{val:.6f}' if isinstance(val, (int, float)) else 'N/A'
 
-        for idx, (strategy, color) in enumerate(strategies):
+        for idx, strategy in enumerate(STRATEGIES):
+            color = COLORS[strategy]
             st = stats.get(strategy, {})
             y = row_y_start + idx * row_h
             last = st.get('last')
@@ -233,16 +194,19 @@ def show_complexity_stats_window():
                 fmt(last),
                 fmt(best),
                 fmt(worst),
+                fmt(st.get('p50')),
+                fmt(st.get('p95')),
+                fmt(st.get('p99')),
                 str(count),
             ]
-            for x, text in zip(col_x, row_values):
-                surf = row_font.render(text, True, color if text == strategy else WHITE)
+            for x, value in zip(col_x, row_values):
+                surf = text(value, 24, color if value == strategy else WHITE)
                 rect = surf.get_rect(center=(int(x), y))
                 screen.blit(surf, rect)
 
         # "Show Graph" button
         pg.draw.rect(screen, ORANGE, show_graph_rect, border_radius=6)
-        btn_surf = button_font.render('Show Graph', True, BLACK)
+        btn_surf = text('Show Graph', 28, BLACK)
         btn_rect = btn_surf.get_rect(center=show_graph_rect.center)
         screen.blit(btn_surf, btn_rect)
 
@@ -1,5 +1,29 @@
-import pygame as pg
-from funcs import Point
+from math import hypot
+
+
+# 2D point, also used for the hex neighbour offsets in `moves`
+class Point:
+    def __init__(self, *pos):
+        if len(pos) == 1:
+            self.x, self.y = pos[0]
+            self.X, self.Y = list(map(int, pos[0]))
+        else:
+            self.x, self.y = pos
+            self.X, self.Y = list(map(int, pos))
+
+    def dist(self, other):
+        return hypot(self.x - other.x, self.y - other.y)
+
+    def __add__(self, other):
+        return Point(self.x + other.x, self.y + other.y)
+
+    def __str__(self):
+        return '[x:{x}, y:{y}]'.format(x=self.x, y=self.y)
+
+    def __iter__(self):
+        '''for unpacking'''
+        return (x for x in (self.x, self.y))
+
 
 # constants
 DARKRED = (155, 0, 0)
@@ -17,6 +41,8 @@ EPS = 0.0000000001
 FPS = 30
 MAX_BOARD_SIZE = 20
 MIN_BOARD_SIZE = 5
+# CPU strategies, in menu and stats table order
+STRATEGIES = ('Greedy', 'D&C', 'DP', 'Backtracking', 'Alpha-Beta', 'MCTS')
 
 # setup()
 TILE_IMG = 'tile.png'
@@ -31,4 +57,6 @@ W = 600
 H = 600
 # size of the grid
 SIZE = 11
-moves = [Point(1, 0), Point(1, -1), Point(0, 1), Point(0, -1), Point(-1, 1), Point(-1, 0)]
+# (dr, dc) offsets of the six hex neighbours; topology.py builds its tables from these
+OFFSETS = ((1, 0), (1, -1), (0, 1), (0, -1), (-1, 1), (-1, 0))
+moves = [Point(dr, dc) for dr, dc in OFFSETS]
@@ -0,0 +1,109 @@
+"""
+Opt-in search-effort counters.
+
+Wall time alone cannot tell "more nodes" from "slower nodes". When
+counting is on, the searches add up the work they do:
+- heap pushes, pops and settled nodes of the Dijkstra kernels (funcs,
+  distance_engine);
+- win checks and virtual-connection detections of the backtracking
+  search;
+- candidates evaluated and pruned by every strategy;
+- D&C calls, subproblem cache hits and recursion depth;
+- MCTS playouts and opening book hits;
+- endgame solver nodes and solved moves.
+
+The counters are process-wide, like the worker pools. HexEngine.cpuMove
+calls start() and stop() around each move when engine.instrument is set.
+Pool workers send their counts back with their results (merge), so one
+move's counts cover every process that worked on it.
+
+Counting is off by default. Each call site then costs one function
+call that returns at once. Hot loops keep plain local counts and report
+them once per call. Set HEX_COUNTERS=1 in the environment to switch it
+on for every engine.
+"""
+import os
+
+# event counters, summed over a move
+COUNTERS = ('heap_pushes', 'heap_pops', 'nodes_settled', 'win_checks', 'vc_detections',
+            'candidates_evaluated', 'candidates_pruned', 'dc_calls', 'dc_cache_hits',
+            'playouts', 'book_hits', 'endgame_solves', 'endgame_nodes')
+# high-water marks, combined with max instead of sum
+PEAKS = ('dc_max_depth',)
+
+# default of HexEngine.instrument
+DEFAULT = os.environ.get('HEX_COUNTERS', '') not in ('', '0')
+
+# read by the call sites; change it with enable/start/stop
+ENABLED = False
+_counts = dict.fromkeys(COUNTERS + PEAKS, 0)
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+
+def reset():
+    for name in _counts:
+        _counts[name] = 0
+
+
+def add(name, n=1):
+    '''adds n to a counter if counting is on'''
+    if ENABLED:
+        _counts[name] += n
+
+
+def peak(name, value):
+    '''raises a high-water mark to value if counting is on'''
+    if ENABLED and value > _counts[name]:
+        _counts[name] = value
+
+
+def heap(pushes, pops, settled):
+    '''one Dijkstra run's heap traffic'''
+    if ENABLED:
+        _counts['heap_pushes'] += pushes
+        _counts['heap_pops'] += pops
+        _counts['nodes_settled'] += settled
+
+
+def snapshot():
+    '''the counts so far as a dict'''
+    return dict(_counts)
+
+
+def merge(counts):
+    '''adds counts gathered elsewhere (e.g. by a pool worker)'''
+    if ENABLED and counts:
+        for name, value in counts.items():
+            if name in PEAKS:
+                _counts[name] = max(_counts[name], value)
+            else:
+                _counts[name] += value
+
+
+def start():
+    '''switches counting on with all counters at zero'''
+    reset()
+    enable(True)
+
+
+def stop():
+    '''switches counting off and returns the counts'''
+    counts = snapshot()
+    enable(False)
+    return counts
+
+
+def total(moves):
+    '''combines per-move counts into one dict (sums, and max for PEAKS)'''
+    out = dict.fromkeys(COUNTERS + PEAKS, 0)
+    for counts in moves:
+        for name, value in counts.items():
+            if name in PEAKS:
+                out[name] = max(out.get(name, 0), value)
+            else:
+                out[name] = out.get(name, 0) + value
+    return out
@@ -0,0 +1,210 @@
+"""
+Background process for CPU moves.
+
+The UI hands the board to a single long-lived worker process (submit)
+and polls for the answer once per frame (poll), so a long search never
+blocks event handling or redraws. A slow search in a thread would still
+hold the GIL, so the work runs in a separate process.
+
+The worker keeps one HexEngine per board size and only places the
+stones that are new since its last move, so the win detector, distance
+fields and search caches stay warm. A board that lost stones (a new
+game) gets a fresh engine, which inherits the caches.
+
+Each request gets a ticket number; answers with an old ticket are
+dropped. cancel() marks the pending ticket as cancelled in shared
+memory. The searches check it through HexEngine.stop and return early,
+so the worker and its parallel_eval pool stay alive. If the worker dies,
+poll() starts a new one and resubmits the request once. If no worker
+process can be started, submit returns False; every submit tries to
+start one again. The caller must not fall back to a full search on the
+UI thread (Game only plays book and endgame moves in-process).
+"""
+import atexit
+import multiprocessing as mp
+import queue
+import signal
+import sys
+from time import perf_counter
+
+from engine import HexEngine, SEARCH_SETTINGS
+
+_process = None
+_requests = None
+_results = None
+_ticket = 0
+# highest cancelled ticket, shared with the worker
+_cancelled = None
+# ticket of the request being worked on, or None
+_pending = None
+# the pending request, kept to resubmit it to a new worker
+_task = None
+_resubmitted = False
+
+
+def _catch_up(engine, grid):
+    '''
+    places the stones of grid that engine lacks; False (and nothing placed)
+    if engine has a stone that grid does not
+    '''
+    new = []
+    for r, row in enumerate(grid):
+        mine = engine.state[r]
+        for c, v in enumerate(row):
+            if mine[c] != v:
+                if mine[c]:
+                    return False
+                new.append((r, c, v))
+    for r, c, v in new:
+        engine.placeStone(r, c, v)
+    return True
+
+
+def _serve(requests, results, cancelled):
+    '''worker loop: (ticket, grid, ai_mode, settings) in, (ticket, move, seconds, stats, counts) out'''
+    # shutdown() terminates this process; exiting through SystemExit lets
+    # multiprocessing also stop the worker pool of parallel_eval
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    engines = {}
+    while True:
+        task = requests.get()
+        if task is None:
+            return
+        ticket, grid, ai_mode, settings = task
+        if cancelled.value >= ticket:
+            continue
+        size = len(grid)
+        engine = engines.get(size)
+        if engine is None or not _catch_up(engine, grid):
+            # the worker is a normal process, so the engine may start its own pool
+            fresh = HexEngine(size, parallel=True)
+            if engine is not None:
+                # a new game: the backtracking, endgame, D&C and DP caches
+                # check the position themselves, so they carry over
+                fresh.transposition_table = engine.transposition_table
+                fresh.endgame_cache = engine.endgame_cache
+                fresh.dc_cache = engine.dc_cache
+                fresh.dp_tables = engine.dp_tables
+            engine = engines[size] = fresh
+            _catch_up(engine, grid)
+        engine.ai_mode = ai_mode
+        for name, value in settings.items():
+            setattr(engine, name, value)
+        engine.move = 2
+        engine.last_search_stats = None
+        engine.stop = lambda: cancelled.value >= ticket
+        before = engine.last_move
+        start = perf_counter()
+        engine.cpuMove()
+        elapsed = perf_counter() - start
+        engine.stop = None
+        move = engine.last_move if engine.last_move != before else None
+        results.put((ticket, move, elapsed, engine.last_search_stats, engine.last_move_counts))
+
+
+def _start():
+    global _process, _requests, _results, _cancelled
+    if _process is not None and _process.is_alive():
+        return True
+    # a dead worker's queues may hold half-written messages
+    shutdown()
+    try:
+        ctx = mp.get_context('spawn')
+        _requests = ctx.Queue()
+        _results = ctx.Queue()
+        _cancelled = ctx.RawValue('q', 0)
+        process = ctx.Process(target=_serve, args=(_requests, _results, _cancelled), name='hex-cpu')
+        process.start()
+    except (OSError, ValueError):
+        return False
+    # only a started process is kept, so shutdown can always terminate it
+    _process = process
+    return True
+
+
+def start():
+    '''starts the worker ahead of the first move; False if it cannot run'''
+    return _start()
+
+
+def submit(engine):
+    '''
+    asks the worker for Blue's move on the engine's board with its
+    strategy and SEARCH_SETTINGS; returns False if no worker can be started
+    '''
+    global _ticket, _pending, _task, _resubmitted
+    if not _start():
+        return False
+    _ticket += 1
+    _pending = _ticket
+    stones = [row[:] for row in engine.state]
+    settings = {name: getattr(engine, name) for name in SEARCH_SETTINGS}
+    _task = (_ticket, stones, engine.ai_mode, settings)
+    _resubmitted = False
+    _requests.put(_task)
+    return True
+
+
+def busy():
+    return _pending is not None
+
+
+def poll():
+    '''
+    (move, seconds, stats, counts) once the pending request is answered,
+    else None; move is None if the strategy found nothing to play or the
+    worker died twice on this request, counts is None unless the engine is
+    instrumented
+    '''
+    global _pending, _resubmitted
+    if _pending is None:
+        return None
+    while True:
+        try:
+            ticket, move, elapsed, stats, counts = _results.get_nowait()
+        except queue.Empty:
+            if _process is not None and _process.is_alive():
+                return None
+            # worker died: a new one gets the request once
+            if not _resubmitted and _start():
+                _resubmitted = True
+                _requests.put(_task)
+                return None
+            _pending = None
+            return (None, 0.0, None, None)
+        if ticket == _pending:
+            _pending = None
+            return (move, elapsed, stats, counts)
+
+
+def cancel():
+    '''
+    stops the pending search, if any; returns True if one was running.
+    The worker sees the cancelled ticket at its searches' next check and
+    stays up for the next request. Alpha-Beta, MCTS, the endgame solver,
+    Backtracking and Greedy without numpy check it per node, playout or
+    candidate, and the worker pool between chunks. The NumPy Greedy batch,
+    D&C and DP run to the end; they take milliseconds even on 20x20
+    '''
+    global _pending
+    if _pending is None:
+        return False
+    if _cancelled is not None:
+        _cancelled.value = _pending
+    _pending = None
+    return True
+
+
+@atexit.register
+def shutdown():
+    '''terminates the worker process'''
+    global _process, _requests, _results
+    if _process is not None:
+        _process.terminate()
+        _process.join()
+        _process = None
+    for q in (_requests, _results):
+        if q is not None:
+            q.close()
+            q.cancel_join_thread()
+    _requests = _results = None
@@ -0,0 +1,98 @@
+"""
+D&C subproblem results, kept across moves.
+
+HexEngine._dcSolve only ever splits the board into column bands. A band's
+result depends on the cells of its own columns and of one column on each
+side, because cell scores count Blue neighbours. So an entry is keyed by
+the band's bounds and stored with a fingerprint of those columns: the
+XOR of their Zobrist hashes, which HexEngine keeps per column as stones
+are placed. A prefix-XOR over the columns makes a fingerprint O(1).
+
+A move changes only a couple of columns. sync() compares the engine's
+column hashes with the previous move's and drops the entries that cover
+a changed column. In the recursion tree these are the ancestors of the
+bands around the new stones. Everything else is reused, so a move
+re-solves O(log n) bands instead of the whole tree. Lookups check the
+fingerprint too, so an entry never answers for different contents. The
+cell scores are kept here as well, so only the columns around a change
+are rescored.
+"""
+
+
+class SubproblemCache:
+    def __init__(self, size):
+        self.size = size
+        # (rowStart, rowEnd, colStart, colEnd) -> (fingerprint, result)
+        self.entries = {}
+        # column hashes seen by the last sync (None before the first)
+        self.columns = None
+        # D&C cell scores of the board as of the last sync, kept up to date
+        # by HexEngine._dcTables
+        self.scores = None
+        self._prefix = [0] * (size + 1)
+        self.hits = self.misses = self.invalidated = 0
+        self.move_hits = self.move_misses = 0
+
+    def _span(self, colStart, colEnd):
+        '''the columns a band's result depends on'''
+        return max(colStart - 1, 0), min(colEnd + 1, self.size - 1)
+
+    def sync(self, column_hashes):
+        '''
+        starts a move: drops the entries over changed columns and returns
+        the changed columns (None before the first sync, when all are new)
+        '''
+        first = self.columns is None
+        if first:
+            changed = list(range(self.size))
+        else:
+            changed = [c for c in range(self.size) if column_hashes[c] != self.columns[c]]
+        stale = []
+        if changed:
+            for key in self.entries:
+                lo, hi = self._span(key[2], key[3])
+                if any(lo <= c <= hi for c in changed):
+                    stale.append(key)
+            for key in stale:
+                del self.entries[key]
+        self.invalidated += len(stale)
+        self.columns = list(column_hashes)
+        prefix = self._prefix
+        for c, h in enumerate(self.columns):
+            prefix[c + 1] = prefix[c] ^ h
+        self.move_hits = self.move_misses = 0
+        return None if first else changed
+
+    def _fingerprint(self, colStart, colEnd):
+        lo, hi = self._span(colStart, colEnd)
+        return self._prefix[hi + 1] ^ self._prefix[lo]
+
+    def get(self, rowStart, rowEnd, colStart, colEnd):
+        '''the stored result of a band, or None'''
+        entry = self.entries.get((rowStart, rowEnd, colStart, colEnd))
+        if entry is not None and entry[0] == self._fingerprint(colStart, colEnd):
+            self.hits += 1
+            self.move_hits += 1
+            return entry[1]
+        self.misses += 1
+        self.move_misses += 1
+        return None
+
+    def put(self, rowStart, rowEnd, colStart, colEnd, result):
+        self.entries[(rowStart, rowEnd, colStart, colEnd)] = (
+            self._fingerprint(colStart, colEnd), result)
+
+    def stats(self):
+        '''lookups, hits and hit rate overall and for the last move, plus size and invalidations'''
+        lookups = self.hits + self.misses
+        move_lookups = self.move_hits + self.move_misses
+        return {
+            'entries': len(self.entries),
+            'invalidated': self.invalidated,
+            'lookups': lookups,
+            'hits': self.hits,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'move_lookups': move_lookups,
+            'move_hits': self.move_hits,
+            'move_hit_rate': self.move_hits / move_lookups if move_lookups else 0.0,
+        }
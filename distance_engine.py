@@ -0,0 +1,199 @@
+"""
+Incremental winning-distance fields for both players.
+
+A DistanceField holds, for one player, the 0/1-weighted shortest distance
+from that player's start edge to every cell (own stone = 0, empty = 1,
+anything else = blocked), i.e. the same model as
+funcs.dijkstra_winning_distance. When a single cell changes owner only the
+affected region is repaired:
+
+- a cheaper cell (empty -> own) can only lower distances, so improvements
+  are propagated outward from that cell;
+- a dearer cell (empty -> opponent) invalidates the cells whose shortest
+  paths ran through it; those are reset and re-solved from the untouched
+  cells around them.
+
+Every changed distance is written to a trail, so undo just restores the
+old values. DistanceEngine keeps both fields in step with the board and
+answers estimateWinningDistance-style queries without a full Dijkstra.
+"""
+import heapq
+from collections import deque
+
+from topology import topology, INF
+import counters
+
+
+class DistanceField:
+    """Shortest distances from one player's start edge under place/undo."""
+
+    def __init__(self, size, player, owner, topo):
+        self.size = size
+        self.player = player
+        self.owner = owner
+        self.nbrs = topo.neighbors
+        # Green: top -> bottom, Blue: left -> right
+        self.start = topo.start_edge(player)
+        self.goal = topo.bottom if player == 1 else topo.right
+        self.is_start = [False] * (size * size)
+        for s in self.start:
+            self.is_start[s] = True
+        self.dist = [INF] * (size * size)
+        self.rebuild()
+
+    def weight(self, i):
+        o = self.owner[i]
+        if o == self.player:
+            return 0
+        if o == 0:
+            return 1
+        return INF
+
+    def rebuild(self):
+        '''full 0-1 BFS from the start edge'''
+        dist = self.dist
+        for i in range(len(dist)):
+            dist[i] = INF
+        dq = deque()
+        for s in self.start:
+            w = self.weight(s)
+            if w == 0:
+                dist[s] = 0
+                dq.appendleft(s)
+            elif w == 1:
+                dist[s] = 1
+                dq.append(s)
+        while dq:
+            u = dq.popleft()
+            du = dist[u]
+            for v in self.nbrs[u]:
+                w = self.weight(v)
+                nd = du + w
+                if nd < dist[v]:
+                    dist[v] = nd
+                    if w == 0:
+                        dq.appendleft(v)
+                    else:
+                        dq.append(v)
+
+    def distance(self):
+        '''minimum number of empty cells the player still needs to connect'''
+        dist = self.dist
+        return min(dist[g] for g in self.goal)
+
+    def _propagate(self, heap, trail):
+        dist = self.dist
+        # the seeds count as pushes; totals go to counters once per call
+        pushes, pops, settled = len(heap), 0, 0
+        while heap:
+            d, u = heapq.heappop(heap)
+            pops += 1
+            if d > dist[u]:
+                continue
+            settled += 1
+            for v in self.nbrs[u]:
+                nd = d + self.weight(v)
+                if nd < dist[v]:
+                    trail.append((v, dist[v]))
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+                    pushes += 1
+        counters.heap(pushes, pops, settled)
+
+    def update(self, i, old_weight):
+        '''repairs distances after cell i changed weight; returns the undo trail'''
+        trail = []
+        new_weight = self.weight(i)
+        if new_weight == old_weight:
+            return trail
+        dist = self.dist
+        nbrs = self.nbrs
+        if new_weight < old_weight:
+            # cheaper cell: only improvements, starting at i
+            best = new_weight if self.is_start[i] else INF
+            for u in nbrs[i]:
+                if dist[u] + new_weight < best:
+                    best = dist[u] + new_weight
+            if best < dist[i]:
+                trail.append((i, dist[i]))
+                dist[i] = best
+                self._propagate([(best, i)], trail)
+            return trail
+
+        # dearer cell: collect everything whose shortest path may use i
+        affected = {i}
+        stack = [i]
+        while stack:
+            u = stack.pop()
+            du = dist[u]
+            if du == INF:
+                continue
+            for v in nbrs[u]:
+                if v in affected:
+                    continue
+                dv = dist[v]
+                if dv == INF:
+                    continue
+                wv = self.weight(v)
+                if dv == du + wv and not (self.is_start[v] and dv == wv):
+                    affected.add(v)
+                    stack.append(v)
+        for v in affected:
+            trail.append((v, dist[v]))
+            dist[v] = INF
+        # re-seed the reset region from its untouched surroundings
+        heap = []
+        for v in affected:
+            wv = self.weight(v)
+            if wv == INF:
+                continue
+            best = wv if self.is_start[v] else INF
+            for u in nbrs[v]:
+                if dist[u] + wv < best:
+                    best = dist[u] + wv
+            if best < INF:
+                dist[v] = best
+                heap.append((best, v))
+        heapq.heapify(heap)
+        self._propagate(heap, trail)
+        return trail
+
+    def restore(self, trail):
+        dist = self.dist
+        for i, old in reversed(trail):
+            dist[i] = old
+
+
+class DistanceEngine:
+    """
+    Both players' distance fields for one board, kept alive across
+    placements. place() repairs the fields, undo() rolls the last placement back.
+    """
+
+    def __init__(self, grid):
+        self.size = size = len(grid)
+        self.owner = [grid[r][c] for r in range(size) for c in range(size)]
+        topo = topology(size)
+        self.fields = (DistanceField(size, 1, self.owner, topo),
+                       DistanceField(size, 2, self.owner, topo))
+        # undo records: (cell, old owner, trail of each field)
+        self.history = []
+
+    def place(self, r, c, player):
+        '''sets cell (r, c) to player (0 clears it) and repairs both fields'''
+        i = r * self.size + c
+        old_owner = self.owner[i]
+        old_weights = [f.weight(i) for f in self.fields]
+        self.owner[i] = player
+        trails = [f.update(i, w) for f, w in zip(self.fields, old_weights)]
+        self.history.append((i, old_owner, trails))
+
+    def undo(self):
+        i, old_owner, trails = self.history.pop()
+        for f, trail in zip(self.fields, trails):
+            f.restore(trail)
+        self.owner[i] = old_owner
+
+    def distances(self):
+        '''(player1_distance, player2_distance) like funcs.estimate_winning_chance'''
+        return (self.fields[0].distance(), self.fields[1].distance())
@@ -0,0 +1,287 @@
+"""
+Exact endgame solver: with few empty cells left, prove which move wins.
+
+The solver is a boolean negamax on the BitBoard masks. "Does the player
+to move win?" is answered with the first winning move found. Hex has no
+draws, and an extra stone never hurts its owner, which makes these
+shortcuts sound:
+- if the opponent cannot join their edges even with every empty cell,
+  the player to move has won, and the other way round;
+- a winning cell for the player to move wins at once;
+- two or more winning cells for the opponent lose, because only one can
+  be blocked; a single one must be blocked;
+- only cells on some possible path of either player (the reachable
+  region from both of its edges) are tried. A move anywhere else is a
+  pass, so it cannot do better.
+
+Moves are tried in this order: first cells touching both colours, then
+cells touching any stone, then the rest. Results are kept in a cache
+keyed by (player to move, own stones, opponent stones). It is exact
+because the masks describe the position completely, and it carries over
+between moves of a game.
+
+The solver stops at a time budget, in which case the strategy moves as
+usual. When it is tried depends on the board size and that budget:
+threshold() reads the largest number of empty cells that random
+positions solved within the budget, as measured by calibrate() for
+every board size and a few budgets (python endgame.py --budgets 100 250
+500 1000 prints THRESHOLDS). Each value is a low percentile over several
+seeds, and the table is then made monotone: never more empty cells on a
+larger board, never fewer with a larger budget. A single noisy
+measurement therefore cannot switch the solver on where it would time
+out.
+"""
+import argparse
+import random
+from time import perf_counter
+
+from bitboard import BitBoard, geometry
+from consts import MIN_BOARD_SIZE, MAX_BOARD_SIZE
+import counters
+
+# per-move time budget of the solver, in milliseconds
+DEFAULT_BUDGET_MS = 250
+# {budget_ms: {board size: empty cells at which to try the solver}}: calibrate() over
+# 8 seeds (10th percentile), made monotone by monotone()
+THRESHOLDS = {
+    100: {5: 10, 6: 9, 7: 9, 8: 9, 9: 9, 10: 9, 11: 9, 12: 9,
+          13: 9, 14: 9, 15: 9, 16: 9, 17: 9, 18: 9, 19: 9, 20: 9},
+    250: {5: 10, 6: 10, 7: 10, 8: 10, 9: 10, 10: 10, 11: 10, 12: 10,
+          13: 10, 14: 10, 15: 10, 16: 10, 17: 10, 18: 10, 19: 10, 20: 10},
+    500: {5: 10, 6: 10, 7: 10, 8: 10, 9: 10, 10: 10, 11: 10, 12: 10,
+          13: 10, 14: 10, 15: 10, 16: 10, 17: 10, 18: 10, 19: 10, 20: 10},
+    1000: {5: 12, 6: 12, 7: 12, 8: 12, 9: 10, 10: 10, 11: 10, 12: 10,
+           13: 10, 14: 10, 15: 10, 16: 10, 17: 10, 18: 10, 19: 10, 20: 10},
+}
+# the cache is cleared once it holds this many positions
+CACHE_LIMIT = 1 << 20
+# nodes between clock checks
+CHECK_EVERY = 256
+
+
+class SolverTimeout(Exception):
+    pass
+
+
+class EndgameSolver:
+    def __init__(self, size, budget_ms=DEFAULT_BUDGET_MS, cache=None, stop=None):
+        self.size = size
+        self.stride = size + 1
+        self.valid, top, bottom, left, right, _ = geometry(size)
+        # (start, goal) edge masks per player
+        self.edges = {1: (top, bottom), 2: (left, right)}
+        self.budget_ms = budget_ms
+        # callable that ends the search early, like the budget running out
+        self.stop = stop
+        self.cache = {} if cache is None else cache
+        self.nodes = 0
+        self.deadline = None
+
+    def _dilate(self, mask):
+        s = self.stride
+        return (mask | mask << 1 | mask >> 1 | mask << s | mask >> s
+                | mask << (s - 1) | mask >> (s - 1)) & self.valid
+
+    def _flood(self, seed, within):
+        s, t = self.stride, self.stride - 1
+        region = seed & within
+        while True:
+            grown = (region | region << 1 | region >> 1 | region << s | region >> s
+                     | region << t | region >> t) & within
+            if grown == region:
+                return region
+            region = grown
+
+    def _corridor(self, stones, empty, player):
+        '''cells of stones|empty reachable from both of player's edges (0 if not connected)'''
+        start, goal = self.edges[player]
+        within = stones | empty
+        from_start = self._flood(start, within)
+        if not from_start & goal:
+            return 0
+        return from_start & self._flood(goal, within)
+
+    def _winning_cells(self, stones, empty, player):
+        '''empty cells that join player's edges at once'''
+        start, goal = self.edges[player]
+        from_start = self._flood(stones & start, stones)
+        from_goal = self._flood(stones & goal, stones)
+        return empty & (self._dilate(from_start) | start) & (self._dilate(from_goal) | goal)
+
+    def _tick(self):
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            if self.deadline is not None and perf_counter() > self.deadline:
+                raise SolverTimeout
+            if self.stop is not None and self.stop():
+                raise SolverTimeout
+
+    def _wins(self, own, other, player):
+        '''True if player, to move with stones own against other, wins'''
+        key = (player, own, other)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        self._tick()
+        move = self._winning_move(own, other, player)
+        if len(self.cache) >= CACHE_LIMIT:
+            self.cache.clear()
+        self.cache[key] = move is not None
+        return move is not None
+
+    def _winning_move(self, own, other, player):
+        '''a winning cell (single-bit mask) for player to move, or None'''
+        opponent = 3 - player
+        empty = self.valid & ~(own | other)
+        their_corridor = self._corridor(other, empty, opponent)
+        if not their_corridor:
+            # the opponent is cut off for good; any move keeps it that way
+            return empty & -empty if empty else 0
+        my_corridor = self._corridor(own, empty, player)
+        if not my_corridor:
+            return None
+        wins = self._winning_cells(own, empty, player)
+        if wins:
+            return wins & -wins
+        threats = self._winning_cells(other, empty, opponent)
+        if threats:
+            if threats & (threats - 1):
+                return None
+            candidates = threats
+        else:
+            candidates = empty & (my_corridor | their_corridor)
+        near_own, near_other = self._dilate(own), self._dilate(other)
+        first = candidates & near_own & near_other
+        second = candidates & (near_own | near_other) & ~first
+        rest = candidates & ~(first | second)
+        for group in (first, second, rest):
+            while group:
+                bit = group & -group
+                group ^= bit
+                if not self._wins(other, own | bit, opponent):
+                    return bit
+        return None
+
+    def solve(self, board, player=2):
+        '''
+        (result, move) for player to move on a BitBoard: (True, (r, c)) with a
+        proven winning move, (False, None) if every move loses, or (None, None)
+        if the time budget ran out
+        '''
+        own, other = board.stones(player), board.stones(3 - player)
+        self.nodes = 0
+        self.deadline = None if self.budget_ms is None else perf_counter() + self.budget_ms / 1000.0
+        try:
+            bit = self._winning_move(own, other, player)
+        except SolverTimeout:
+            return None, None
+        finally:
+            counters.add('endgame_nodes', self.nodes)
+        if bit is None:
+            return False, None
+        if bit == 0:
+            # the game is already decided in player's favour with no cell left
+            return True, None
+        return True, divmod(bit.bit_length() - 1, self.stride)
+
+
+def random_position(size, empty, rng):
+    '''a BitBoard with `empty` empty cells, Blue to move and no winner yet'''
+    stones = size * size - empty
+    if stones % 2 == 0:
+        raise ValueError('Blue is to move only with an odd number of stones')
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    while True:
+        rng.shuffle(cells)
+        board = BitBoard(size)
+        for i, (r, c) in enumerate(cells[:stones]):
+            # Green moves first, so it has one stone more when Blue is to move
+            board.set(r, c, 1 if i % 2 == 0 else 2)
+        if not board.winner():
+            return board
+
+
+def threshold(size, budget_ms=DEFAULT_BUDGET_MS):
+    '''
+    most empty cells at which to try the solver on a size x size board with
+    budget_ms per move: the calibrated value of the largest measured budget
+    that fits (of the nearest measured size), or 0 if none fits
+    '''
+    fitting = [budget for budget in THRESHOLDS if budget <= budget_ms]
+    if not fitting:
+        return 0
+    table = THRESHOLDS[max(fitting)]
+    return table[min(table, key=lambda measured: (abs(measured - size), measured))]
+
+
+def _calibrate_seed(size, budget_ms, samples, seed):
+    rng = random.Random(seed)
+    best = 0
+    empty = 1 if size * size % 2 == 0 else 2
+    while empty < size * size:
+        for _ in range(samples):
+            board = random_position(size, empty, rng)
+            solver = EndgameSolver(size, budget_ms=budget_ms)
+            if solver.solve(board)[0] is None:
+                return best
+        best = empty
+        empty += 2
+    return best
+
+
+def calibrate(size, budget_ms=DEFAULT_BUDGET_MS, samples=10, seeds=range(8), percentile=10):
+    '''
+    largest number of empty cells (odd, Blue to move) at which every one of
+    `samples` random positions solves from an empty cache within budget_ms.
+    It is measured once per seed, and the given low percentile of those
+    runs is returned, so one lucky run does not raise the threshold
+    '''
+    found = sorted(_calibrate_seed(size, budget_ms, samples, seed) for seed in seeds)
+    return found[int(percentile / 100.0 * (len(found) - 1))]
+
+
+def monotone(thresholds):
+    '''
+    a copy of a THRESHOLDS table made non-increasing in board size at each
+    budget (a larger board never gets more empty cells) and then
+    non-decreasing in budget at each size (what fits a smaller budget fits a
+    larger one)
+    '''
+    fixed = {}
+    below = {}
+    for budget in sorted(thresholds):
+        row = {}
+        cap = None
+        for size in sorted(thresholds[budget]):
+            value = thresholds[budget][size]
+            cap = value if cap is None else min(cap, value)
+            row[size] = max(cap, below.get(size, 0))
+        fixed[budget] = below = row
+    return fixed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calibrate the endgame thresholds per board size and budget.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(range(MIN_BOARD_SIZE, MAX_BOARD_SIZE + 1)))
+    parser.add_argument('--budgets', type=int, nargs='+', default=[DEFAULT_BUDGET_MS],
+                        help='per-move budgets in milliseconds')
+    parser.add_argument('--samples', type=int, default=10)
+    parser.add_argument('--seeds', type=int, default=8, help='calibration runs per size and budget')
+    parser.add_argument('--percentile', type=float, default=10,
+                        help='percentile of the runs used as the threshold')
+    args = parser.parse_args(argv)
+    measured = {}
+    for budget in args.budgets:
+        measured[budget] = {}
+        for size in args.sizes:
+            measured[budget][size] = calibrate(size, budget, args.samples, range(args.seeds),
+                                               args.percentile)
+            print('budget {} ms, size {}: {}'.format(budget, size, measured[budget][size]), flush=True)
+    print('THRESHOLDS = {')
+    for budget, row in sorted(monotone(measured).items()):
+        print('    {}: {{{}}},'.format(budget, ', '.join('{}: {}'.format(*item) for item in sorted(row.items()))))
+    print('}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,788 @@
+"""
+Headless Hex engine: board state, legal moves, win detection and the CPU
+strategies, with no pygame import. Game (Game.py) is the pygame UI on top
+of it; batch jobs and worker processes use HexEngine directly.
+"""
+from itertools import accumulate, takewhile
+from operator import add
+from time import perf_counter
+
+from bitboard import BitBoard
+from union_find import HexUnionFind
+from distance_engine import DistanceEngine
+import batch_eval
+import counters
+import parallel_eval
+from backtracking import BacktrackingSearch, pick_move
+from dc_cache import SubproblemCache
+import zobrist
+from zobrist import TranspositionTable
+import opening_book
+import endgame
+import alphabeta
+import mcts
+from topology import topology, HORIZONTAL, VERTICAL
+from consts import STRATEGIES
+
+# directed neighbours of the DP tables: cells a path from the left may come
+# from, and cells a path to the right may continue to
+DP_PREDECESSORS = ((-1, -1), (-1, 0), (0, -1), (1, -1), (1, 0))
+DP_SUCCESSORS = ((-1, 0), (-1, 1), (0, 1), (1, 0), (1, 1))
+# engine attributes that tune the searches; cpu_worker copies them to its engine
+SEARCH_SETTINGS = ('ab_budget_ms', 'mcts_budget_ms', 'mcts_playouts', 'instrument', 'use_book',
+                   'endgame_threshold', 'endgame_budget_ms')
+
+
+class HexEngine:
+    def __init__(self, size, parallel=False):
+        self.size = size
+        self.state = [[0 for _ in range(self.size)] for __ in range(self.size)]
+        # incremental win detection, updated once per placed stone
+        self.win_detector = HexUnionFind(self.size)
+        # both players' winning-distance fields, repaired per placed stone
+        self.distance_engine = DistanceEngine(self.state)
+        # hand candidate evaluation to the worker pool on large boards
+        self.parallel = parallel
+        if parallel:
+            parallel_eval.prepare(self.size)
+        # backtracking search cache, kept across moves; created on first use
+        self.transposition_table = None
+        # DP strategy tables, kept between turns; created on first use
+        self.dp_tables = None
+        # D&C subproblem cache, kept across moves; created on first use
+        self.dc_cache = None
+        # D&C lookup tables of the current move (see _dcTables)
+        self._dc_stones = None
+        self._dc_scores = None
+        # opening book of this size (None if there is none), and the Zobrist
+        # hashes of the board and of its 180-degree rotation that key it
+        self.book = opening_book.book(size)
+        self.use_book = True
+        self.zobrist_keys = zobrist.zobrist_keys(size)[:2]
+        self.hash = self.hash180 = 0
+        # Zobrist hash of each column's stones, for the D&C cache fingerprints
+        self.column_hashes = [0] * size
+        # solve the position exactly once at most endgame_threshold cells are
+        # empty (0 turns it off; None uses the one calibrated for this size
+        # and budget), within endgame_budget_ms per move; the solved
+        # positions are kept across moves
+        self.endgame_threshold = None
+        self.endgame_budget_ms = endgame.DEFAULT_BUDGET_MS
+        self.endgame_cache = {}
+        # per-move time budget of the Alpha-Beta strategy, in milliseconds
+        self.ab_budget_ms = alphabeta.DEFAULT_BUDGET_MS
+        # per-move limits of the MCTS strategy: milliseconds and playouts (None = no limit)
+        self.mcts_budget_ms = mcts.DEFAULT_BUDGET_MS
+        self.mcts_playouts = None
+        # statistics of the last search that reports any (MCTS playouts per second)
+        self.last_search_stats = None
+        # count search effort per move (see counters.py)
+        self.instrument = counters.DEFAULT
+        # effort counts of the last CPU move (None unless instrumented)
+        self.last_move_counts = None
+        # callable that returns True once the current CPU move is no longer
+        # wanted (see cpu_worker.cancel); the searches then stop early and
+        # play their best move so far
+        self.stop = None
+        self.move = 1
+        # most recent stone placed, as (r, c)
+        self.last_move = None
+        self.ai_mode = 'Greedy'  # Default AI mode: one of STRATEGIES
+        # Per-session CPU timing (seconds) and effort counts by strategy
+        self.session_times = {s: [] for s in STRATEGIES}
+        self.session_counts = {s: [] for s in STRATEGIES}
+
+    def legalMoves(self):
+        '''all empty cells in row-major order'''
+        return [(r, c) for r in range(self.size) for c in range(self.size)
+                if self.state[r][c] == 0]
+
+    def isLegal(self, r, c):
+        return 0 <= r < self.size and 0 <= c < self.size and self.state[r][c] == 0
+
+    def play(self, r, c):
+        '''places a stone for the player to move and passes the turn'''
+        self.placeStone(r, c, self.move)
+        self.move = 3 - self.move
+
+    def placeStone(self, r, c, player):
+        '''puts a stone of player on the board and updates the win detector'''
+        self.state[r][c] = player
+        self.win_detector.place(r, c, player)
+        self.distance_engine.place(r, c, player)
+        keys = self.zobrist_keys[player - 1]
+        i = r * self.size + c
+        self.hash ^= keys[i]
+        self.hash180 ^= keys[opening_book.rotate(self.size, i)]
+        self.column_hashes[c] ^= keys[i]
+        self.last_move = (r, c)
+
+    def checkWin(self):
+        '''returns the winner (2 for Blue, 1 for Green) or 0, answered by the union-find win detector'''
+        return self.win_detector.winner()
+
+    def estimateWinningDistance(self):
+        '''
+        Estimates which player is closer to winning.
+        Models the game as a graph where each hex cell is a node.
+        Returns tuple (player1_distance, player2_distance) where:
+        - player1_distance: minimum moves needed for Green to connect top to bottom
+        - player2_distance: minimum moves needed for Blue to connect left to right
+        Lower distance means closer to winning.
+        The distances are read from the incremental distance engine, which
+        gives the same answer as funcs.estimate_winning_chance on the board.
+        '''
+        return self.distance_engine.distances()
+
+    def cpuMove(self, search=True):
+        '''
+        CPU (Player 2, Blue) makes a move using the selected AI strategy.
+        Positions in the opening book are answered from the book instead
+        (see opening_book.py; use_book turns it off), and positions with at
+        most endgame_threshold empty cells by a proven winning move when the
+        endgame solver finds one in time (see endgame.py). With search=False
+        only those two are tried. Returns True if a move was made.
+        '''
+        strategy = self.ai_mode if self.ai_mode in STRATEGIES else 'Greedy'
+        counts = None
+        if self.instrument:
+            counters.start()
+        try:
+            start = perf_counter()
+            forced = self.bookMove()
+            if forced is not None:
+                counters.add('book_hits')
+            else:
+                forced = self.endgameMove()
+            if forced is not None:
+                self.placeStone(forced[0], forced[1], 2)
+                self.move = 1
+            elif not search:
+                return False
+            elif self.ai_mode == 'Greedy':
+                self._cpuMoveGreedy()
+            elif self.ai_mode == 'D&C':
+                self._cpuMoveDivideConquer()
+            elif self.ai_mode == 'DP':
+                self._cpuMoveDynamicProgramming()
+            elif self.ai_mode == 'Backtracking':
+                self._cpuMoveBacktracking()
+            elif self.ai_mode == 'Alpha-Beta':
+                self._cpuMoveAlphaBeta()
+            elif self.ai_mode == 'MCTS':
+                self._cpuMoveMCTS()
+            else:  # Default fallback to Greedy
+                self._cpuMoveGreedy()
+            end = perf_counter()
+        finally:
+            # counting must not stay on for later moves, even if the strategy raised
+            if self.instrument:
+                counts = counters.stop()
+        self.recordMove(strategy, end - start, counts)
+        return True
+
+    def bookMove(self):
+        '''the opening book's reply for Blue in this position, or None'''
+        if not self.use_book or self.book is None:
+            return None
+        move = self.book.move(self.hash, self.hash180)
+        if move is None or self.state[move[0]][move[1]] != 0:
+            return None
+        return move
+
+    def endgameMove(self):
+        '''a proven winning move for Blue, or None (too many empty cells, no win, or out of time)'''
+        threshold = self.endgame_threshold
+        if threshold is None:
+            threshold = endgame.threshold(self.size, self.endgame_budget_ms)
+        if threshold <= 0:
+            return None
+        empty = sum(row.count(0) for row in self.state)
+        if not 0 < empty <= threshold:
+            return None
+        solver = endgame.EndgameSolver(self.size, self.endgame_budget_ms, self.endgame_cache,
+                                       stop=self.stop)
+        won, move = solver.solve(BitBoard.from_grid(self.state), 2)
+        if not won or move is None:
+            return None
+        counters.add('endgame_solves')
+        return move
+
+    def recordMove(self, strategy, seconds, counts=None):
+        '''adds one CPU move's time (and effort counts, if instrumented) to the session'''
+        self.last_move_counts = counts
+        # Record per-move time in current session; actual log entry is per session at game over.
+        try:
+            self.session_times.setdefault(strategy, []).append(seconds)
+        except AttributeError:
+            self.session_times = {s: [] for s in STRATEGIES}
+            self.session_times[strategy].append(seconds)
+        if counts is not None:
+            self.session_counts.setdefault(strategy, []).append(counts)
+
+    def sessionCounts(self, strategy=None):
+        '''
+        effort counts of the CPU moves so far with strategy (default: the
+        current one), combined by counters.total; None if none were counted
+        '''
+        if strategy is None:
+            strategy = self.ai_mode if self.ai_mode in STRATEGIES else 'Greedy'
+        moves = self.session_counts.get(strategy)
+        if not moves:
+            return None
+        return counters.total(moves)
+    
+    def searchStats(self):
+        '''transposition table statistics of the backtracking search (None before its first move)'''
+        if self.transposition_table is None:
+            return None
+        return self.transposition_table.stats()
+
+    def _cpuMoveGreedy(self):
+        '''
+        Greedy AI: Uses Dijkstra's algorithm (a greedy algorithm) to find optimal moves.
+        Strategy: 
+        1. If CPU can win immediately, do it
+        2. If human is close to winning, prioritize blocking
+        3. Otherwise, balance winning and blocking
+        On large boards with self.parallel set the candidates are split
+        across the worker pool (parallel_eval); otherwise they are scored in one NumPy batch
+        (batch_eval), or with place/undo on the incremental distance engine
+        when numpy is missing.
+        '''
+        # Find all empty cells
+        empty_cells = []
+        for r in range(self.size):
+            for c in range(self.size):
+                if self.state[r][c] == 0:
+                    empty_cells.append((r, c))
+        
+        # If no empty cells, return
+        if not empty_cells:
+            return
+        counters.add('candidates_evaluated', len(empty_cells))
+        
+        # Get current distances before CPU move
+        engine = self.distance_engine
+        human_dist_before, cpu_dist_before = engine.distances()
+        
+        best_move = None
+        best_score = float('-inf')
+        
+        # Distances after each candidate move, in the order of empty_cells:
+        # worker pool on large boards, else one NumPy batch, else place/undo
+        evaluated = None
+        if self.parallel:
+            evaluated = parallel_eval.greedy_distances(self.state, empty_cells, stop=self.stop)
+        if evaluated is None and batch_eval.available():
+            evaluated = batch_eval.candidate_distances(self.state, empty_cells)
+        elif evaluated is None:
+            evaluated = self._incrementalCandidateDistances(empty_cells)
+        
+        # Try each empty cell to find the best move
+        for (r, c), (human_dist_after, cpu_dist_after) in zip(empty_cells, evaluated):
+            # Check if this move makes CPU win immediately
+            if cpu_dist_after == 0:
+                # CPU wins! This is the best move
+                best_move = (r, c)
+                break
+            
+            # Calculate improvements
+            cpu_improvement = cpu_dist_before - cpu_dist_after  # How much closer CPU gets to winning
+            human_block = human_dist_after - human_dist_before  # How much further human is from winning
+            
+            # Determine threat level: how close is human to winning?
+            human_threat_level = human_dist_before
+            
+            # Dynamic scoring based on threat level
+            if human_threat_level <= 2:
+                # Human is very close to winning - prioritize blocking heavily
+                score = (5 * human_block) + cpu_improvement
+            elif human_threat_level <= 4:
+                # Human is moderately close - balance but favor blocking
+                score = (2.5 * human_block) + cpu_improvement
+            else:
+                # Human is not immediately threatening - balance both strategies
+                score = (1.5 * human_block) + cpu_improvement
+            
+            # Keep track of best move
+            if score > best_score:
+                best_score = score
+                best_move = (r, c)
+        
+        # Make the best move
+        if best_move:
+            r, c = best_move
+            self.placeStone(r, c, 2)
+            self.move = 1  # Switch back to human player
+
+    def _incrementalCandidateDistances(self, cells):
+        '''
+        yields (human_dist, cpu_dist) after a CPU stone on each cell; the engine
+        repairs only the part of each distance field the stone affects. A
+        cancelled move (self.stop) ends the cells early
+        '''
+        engine = self.distance_engine
+        stop = self.stop
+        for r, c in cells:
+            if stop is not None and stop():
+                return
+            engine.place(r, c, 2)
+            distances = engine.distances()
+            engine.undo()
+            yield distances
+
+    def _cpuMoveBacktracking(self):
+        '''
+        FULL logical backtracking for CPU (player 2, Blue).
+        CPU connects LEFT → RIGHT, human TOP → BOTTOM.
+
+        For each candidate CPU move M:
+            For every human reply H:
+                CPU must have at least one counter C (adjacent to H)
+                such that, after C, the human has NO immediate winning move.
+            If ANY human reply lacks such a CPU counter, M is rejected.
+
+        If we find a move M that survives all human replies, we play it
+        immediately. If none exist, fall back to a simple delaying move.
+        The search itself lives in backtracking.py; on large boards with
+        self.parallel set the candidates are judged by the worker pool
+        (parallel_eval). Repeated positions are answered from
+        self.transposition_table; see searchStats for its hit rates.
+        '''
+        if self.transposition_table is None:
+            self.transposition_table = TranspositionTable()
+        self.transposition_table.new_search()
+        search = BacktrackingSearch(BitBoard.from_grid(self.state), self.win_detector.copy(),
+                                    self.transposition_table)
+        n = self.size
+
+        # Only trigger the block if human can win in one move
+        block = search.blocking_move()
+        if block is not None:
+            r, c = block
+            self.placeStone(r, c, 2)
+            self.move = 1
+            return
+
+        # STEP 1: Generate CPU candidate moves
+        candidates = search.candidates()
+        if not candidates:
+            return
+
+        # Baseline CPU LEFT→RIGHT connectivity before any move
+        base_conn_before = search.cpu_connectivity_score()
+
+        # STEP 2: Try each candidate M with full logical backtracking
+        verdicts = None
+        if self.parallel:
+            verdicts = parallel_eval.backtracking_verdicts(self.state, candidates, base_conn_before,
+                                                           stop=self.stop)
+        if verdicts is None:
+            # a cancelled move judges no further candidates
+            stop = self.stop or (lambda: False)
+            verdicts = (search.evaluate(mr, mc, base_conn_before)
+                        for mr, mc in takewhile(lambda cell: not stop(), candidates))
+        best_move, _ = pick_move(candidates, verdicts)
+
+        # STEP 3: Play chosen move
+        if best_move is not None:
+            mr, mc = best_move
+            if self.state[mr][mc] == 0:
+                self.placeStone(mr, mc, 2)
+                self.move = 1
+                return
+
+        # No fully safe move respecting connectivity – choose a delaying move
+        center_r, center_c = n // 2, n // 2
+        if self.state[center_r][center_c] == 0:
+            self.placeStone(center_r, center_c, 2)
+            self.move = 1
+            return
+
+        for mr, mc in candidates:
+            if self.state[mr][mc] == 0:
+                self.placeStone(mr, mc, 2)
+                self.move = 1
+                return
+
+    def _cpuMoveAlphaBeta(self):
+        '''
+        Alpha-Beta AI: iterative-deepening negamax with alpha-beta pruning,
+        scoring leaves by the difference of the two winning distances.
+        Deepens until self.ab_budget_ms runs out and plays the best move
+        found so far (see alphabeta.py).
+        '''
+        search = alphabeta.AlphaBetaSearch(self.state, budget_ms=self.ab_budget_ms, stop=self.stop)
+        best_move = search.search(2)
+        if best_move is not None:
+            r, c = best_move
+            self.placeStone(r, c, 2)
+            self.move = 1
+
+    def _cpuMoveMCTS(self):
+        '''
+        MCTS AI: UCT tree search with random-fill playouts, each decided by a
+        single connectivity check. Runs until self.mcts_budget_ms or
+        self.mcts_playouts is used up, plays the most visited move and leaves
+        the playout rate in self.last_search_stats (see mcts.py).
+        '''
+        search = mcts.MonteCarloSearch(self.state, budget_ms=self.mcts_budget_ms,
+                                       max_playouts=self.mcts_playouts, stop=self.stop)
+        best_move = search.search(2)
+        self.last_search_stats = search.stats()
+        if best_move is not None:
+            r, c = best_move
+            self.placeStone(r, c, 2)
+            self.move = 1
+
+    def _dcTables(self, changed=None):
+        """
+        Lookup tables of D&C, brought up to date once before the recursion:
+        - a summed-area table of Blue stones, so _dcStones counts any
+          rectangle in O(1);
+        - the score of every cell. Horizontal neighbours are good and
+          vertical ones bad, and cells without neighbours prefer the centre
+          columns.
+        A cell's score depends only on its own column and the columns next
+        to it. The scores live in self.dc_cache; given the columns changed
+        since its last sync, only the scores around them are recomputed,
+        otherwise all of them are.
+        """
+        n = self.size
+        sat = [[0] * (n + 1)]
+        for row in self.state:
+            run = accumulate(1 if v == 2 else 0 for v in row)
+            sat.append([0] + list(map(add, sat[-1][1:], run)))
+        self._dc_stones = sat
+        
+        cache = self.dc_cache
+        if changed is None or cache.scores is None:
+            cache.scores = [float('-inf')] * (n * n)
+            columns = range(n)
+        else:
+            columns = sorted({x for c in changed for x in (c - 1, c, c + 1) if 0 <= x < n})
+        self._dc_scores = cache.scores
+        if columns:
+            self._dcScoreColumns(columns)
+
+    def _dcScoreColumns(self, columns):
+        """Recomputes the D&C scores of the cells in the given columns (ascending)."""
+        n = self.size
+        topo = topology(n)
+        horizontal = topo.offset_table(HORIZONTAL)
+        vertical = topo.offset_table(VERTICAL)
+        # Blue neighbour counts from one pass over the Blue stones that can
+        # touch these columns; both offset sets are symmetric, so a stone is
+        # the same kind of neighbour to each cell it touches
+        h_count = [0] * (n * n)
+        v_count = [0] * (n * n)
+        for c in range(max(columns[0] - 1, 0), min(columns[-1] + 2, n)):
+            for r in range(n):
+                if self.state[r][c] == 2:
+                    for j in horizontal[r * n + c]:
+                        h_count[j] += 1
+                    for j in vertical[r * n + c]:
+                        v_count[j] += 1
+        
+        center_col = n // 2
+        scores = self._dc_scores
+        for c in columns:
+            for r in range(n):
+                i = r * n + c
+                if self.state[r][c] != 0:
+                    scores[i] = float('-inf')
+                    continue
+                h, v = h_count[i], v_count[i]
+                if h == 0 and v == 0:
+                    scores[i] = 5.0 - abs(c - center_col) * 0.1
+                else:
+                    scores[i] = h * 10.0 - v * 5.0
+
+    def _dcStones(self, rowStart, rowEnd, colStart, colEnd):
+        """Blue stones in a rectangle (bounds inclusive), from the summed-area table."""
+        sat = self._dc_stones
+        return (sat[rowEnd + 1][colEnd + 1] - sat[rowStart][colEnd + 1]
+                - sat[rowEnd + 1][colStart] + sat[rowStart][colStart])
+
+    def _dcBest(self, rowStart, rowEnd, colStart, colEnd):
+        """Best-scoring empty cell of a rectangle as (r, c, score); the first in row-major order on ties."""
+        scores = self._dc_scores
+        n = self.size
+        best_r, best_c, best_score = None, None, float('-inf')
+        for r in range(rowStart, rowEnd + 1):
+            line = scores[r * n + colStart:r * n + colEnd + 1]
+            top = max(line)
+            if top > best_score:
+                best_score = top
+                best_r, best_c = r, colStart + line.index(top)
+        return (best_r, best_c, best_score)
+
+    def _dcSolve(self, rowStart, rowEnd, colStart, colEnd, depth=0):
+        """
+        Simple D&C over column halves; needs the tables of _dcTables.
+        Results come from self.dc_cache when the region is unchanged.
+        """
+        counters.add('dc_calls')
+        counters.peak('dc_max_depth', depth)
+        cache = self.dc_cache
+        if cache is not None:
+            result = cache.get(rowStart, rowEnd, colStart, colEnd)
+            if result is not None:
+                counters.add('dc_cache_hits')
+                return result
+        result = self._dcCompute(rowStart, rowEnd, colStart, colEnd, depth)
+        if cache is not None:
+            cache.put(rowStart, rowEnd, colStart, colEnd, result)
+        return result
+
+    def _dcCompute(self, rowStart, rowEnd, colStart, colEnd, depth):
+        """
+        One D&C subproblem: best cell of a small region, or the two halves
+        combined by where Blue already has stones.
+        """
+        height = rowEnd - rowStart + 1
+        width = colEnd - colStart + 1
+        
+        # BASE CASE
+        if width <= 4 or height <= 4:
+            return self._dcBest(rowStart, rowEnd, colStart, colEnd)
+        
+        # DIVIDE
+        mid_col = colStart + width // 2
+        
+        if mid_col <= colStart or mid_col > colEnd:
+            return self._dcBest(rowStart, rowEnd, colStart, colEnd)
+        
+        # CONQUER
+        left_result = self._dcSolve(rowStart, rowEnd, colStart, mid_col - 1, depth + 1)
+        right_result = self._dcSolve(rowStart, rowEnd, mid_col, colEnd, depth + 1)
+        
+        r_left, c_left, score_left = left_result
+        r_right, c_right, score_right = right_result
+        
+        # COMBINE: Blue stones anywhere in the columns of either half
+        has_left = self._dcStones(0, self.size - 1, colStart, mid_col - 1) > 0
+        has_right = self._dcStones(0, self.size - 1, mid_col, colEnd) > 0
+        
+        if not has_left and not has_right:
+            return right_result if score_right > score_left else left_result
+        elif has_left and not has_right:
+            return right_result if r_right is not None else left_result
+        elif has_right and not has_left:
+            return left_result if r_left is not None else right_result
+        else:
+            return right_result if score_right > score_left else left_result
+
+
+    def _cpuMoveDivideConquer(self):
+        """
+        Main entry point: builds the lookup tables once, then solves the
+        whole board. Subproblems over columns that did not change since the
+        last move are answered by self.dc_cache (see dc_cache.py); its hit
+        rates end up in self.last_search_stats.
+        """
+        if self.dc_cache is None:
+            self.dc_cache = SubproblemCache(self.size)
+        self._dcTables(self.dc_cache.sync(self.column_hashes))
+        result = self._dcSolve(0, self.size - 1, 0, self.size - 1)
+        self.last_search_stats = self.dc_cache.stats()
+        r, c, _ = result
+        if r is not None and c is not None and self.state[r][c] == 0:
+            self.placeStone(r, c, 2)
+            self.move = 1
+            return
+        
+        for ri in range(self.size):
+            for cj in range(self.size):
+                if self.state[ri][cj] == 0:
+                    self.placeStone(ri, cj, 2)
+                    self.move = 1
+                    return
+    
+    def _cpuMoveDynamicProgramming(self):
+        '''
+        Pure DP Table Solution using bidirectional shortest path.
+        
+        DP Tables:
+        1. dp_left[r][c] = minimum cost to reach (r,c) from LEFT edge
+        2. dp_right[r][c] = minimum cost from (r,c) to RIGHT edge
+        3. Combine: Pick empty cell that minimizes total path length
+        
+        The tables and the decision are vectorized column sweeps over NumPy
+        arrays (batch_eval.dp_choice); without numpy, _dpChoice fills them
+        cell by cell. Both include paths that double back along a column
+        and pick the same cell. The NumPy tables are kept in self.dp_tables
+        between turns, and each turn recomputes only the columns the new
+        stones can affect.
+        '''
+        counters.add('candidates_evaluated', sum(row.count(0) for row in self.state))
+        if batch_eval.available():
+            if self.dp_tables is None:
+                self.dp_tables = batch_eval.DPTables()
+            best = batch_eval.dp_choice(self.state, self.dp_tables)
+            self.last_search_stats = self.dp_tables.stats()
+        else:
+            best = self._dpChoice()
+        
+        # Make the move
+        if best is not None:
+            self.placeStone(best[0], best[1], 2)
+            self.move = 1
+            return
+        
+        # Fallback: no empty cell lies on a path
+        for r in range(self.size):
+            for c in range(self.size):
+                if self.state[r][c] == 0:
+                    self.placeStone(r, c, 2)
+                    self.move = 1
+                    return
+
+    def _dpChoice(self):
+        '''
+        The DP tables in plain Python: each column is filled top-down from
+        the column before and the cell above, then bottom-up from the cell
+        below. Returns the best empty cell, or None.
+        
+        Complexity: O(n²)
+        '''
+        n = self.size
+        INF = 10 ** 9
+        topo = topology(n)
+        predecessors = topo.cell_table(DP_PREDECESSORS)
+        successors = topo.cell_table(DP_SUCCESSORS)
+        
+        
+        # DP TABLE 1: dp_left[r][c] - Distance from LEFT to (r,c)
+        
+        
+        dp_left = [[INF] * n for _ in range(n)]
+        
+        # Base case: LEFT edge (column 0)
+        for r in range(n):
+            if self.state[r][0] == 2:
+                dp_left[r][0] = 0  # Our stone - free
+            elif self.state[r][0] == 0:
+                dp_left[r][0] = 1  # Empty - costs 1
+            else:
+                dp_left[r][0] = INF  # Opponent - blocked
+        
+        # Fill table column by column (left to right)
+        for c in range(1, n):
+            for r in range(n):
+                # Skip opponent cells
+                if self.state[r][c] == 1:
+                    continue
+                
+                # Cost of current cell
+                if self.state[r][c] == 2:
+                    cell_cost = 0
+                else:
+                    cell_cost = 1
+                
+                # Find minimum cost from previous positions
+                # Hexagonal neighbors that could lead to (r,c)
+                min_prev = INF
+                for pr, pc in predecessors[r * n + c]:
+                    min_prev = min(min_prev, dp_left[pr][pc])
+                
+                # DP recurrence
+                if min_prev < INF:
+                    dp_left[r][c] = min_prev + cell_cost
+            
+            # Paths that come up the column from below
+            for r in range(n - 2, -1, -1):
+                if self.state[r][c] != 1 and dp_left[r + 1][c] < INF:
+                    cell_cost = 0 if self.state[r][c] == 2 else 1
+                    dp_left[r][c] = min(dp_left[r][c], dp_left[r + 1][c] + cell_cost)
+        
+        
+        # DP TABLE 2: dp_right[r][c] - Distance from (r,c) to RIGHT
+        
+        
+        dp_right = [[INF] * n for _ in range(n)]
+        
+        # Base case: RIGHT edge (column n-1)
+        for r in range(n):
+            if self.state[r][n-1] == 2:
+                dp_right[r][n-1] = 0
+            elif self.state[r][n-1] == 0:
+                dp_right[r][n-1] = 1
+            else:
+                dp_right[r][n-1] = INF
+        
+        # Fill table column by column (right to left)
+        for c in range(n - 2, -1, -1):
+            for r in range(n):
+                # Skip opponent cells
+                if self.state[r][c] == 1:
+                    continue
+                
+                # Cost of current cell
+                if self.state[r][c] == 2:
+                    cell_cost = 0
+                else:
+                    cell_cost = 1
+                
+                # Find minimum cost to next positions
+                # Hexagonal neighbors that (r,c) can reach
+                min_next = INF
+                for nr, nc in successors[r * n + c]:
+                    min_next = min(min_next, dp_right[nr][nc])
+                
+                # DP recurrence
+                if min_next < INF:
+                    dp_right[r][c] = min_next + cell_cost
+            
+            # Paths that continue down the column
+            for r in range(n - 2, -1, -1):
+                if self.state[r][c] != 1 and dp_right[r + 1][c] < INF:
+                    cell_cost = 0 if self.state[r][c] == 2 else 1
+                    dp_right[r][c] = min(dp_right[r][c], dp_right[r + 1][c] + cell_cost)
+        
+        
+        # DECISION: Find best empty cell to play
+        
+        
+        best_r, best_c = None, None
+        best_total = INF
+        
+        for r in range(n):
+            for c in range(n):
+                if self.state[r][c] != 0:
+                    continue  # Not empty
+                
+                
+                # Path = (LEFT → this cell) + (this cell → RIGHT)
+                
+                
+                # Best distance TO this cell (from left neighbors)
+                dist_to = INF
+                for pr, pc in predecessors[r * n + c]:
+                    dist_to = min(dist_to, dp_left[pr][pc])
+                
+                # Special case: if this is in column 0
+                if c == 0:
+                    dist_to = 0
+                
+                # Best distance FROM this cell (to right neighbors)
+                dist_from = INF
+                for nr, nc in successors[r * n + c]:
+                    dist_from = min(dist_from, dp_right[nr][nc])
+                
+                # Special case: if this is in column n-1
+                if c == n - 1:
+                    dist_from = 0
+                
+                # Total path length if we play here (this cell = 0 cost)
+                total = dist_to + 0 + dist_from
+                
+                # Track minimum
+                if total < best_total:
+                    best_total = total
+                    best_r, best_c = r, c
+        
+        if best_r is None:
+            return None
+        return (best_r, best_c)
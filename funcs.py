@@ -1,32 +1,11 @@
 import pygame as pg
-from math import sqrt, hypot
-from collections import deque
+from math import sqrt
+from collections import deque, OrderedDict
 import heapq
 
-class Point:
-    def __init__(self, *pos):
-        if len(pos) == 1:
-            self.x, self.y = pos[0]
-            self.X, self.Y = list(map(int, pos[0]))
-        else:
-            self.x, self.y = pos
-            self.X, self.Y = list(map(int, pos))
-
-    def dist(self, other):
-        return hypot(self.x - other.x, self.y - other.y)
-
-    def __add__(self, other):
-        return Point(self.x + other.x, self.y + other.y)
-
-    def __str__(self):
-        return '[x:{x}, y:{y}]'.format(x=self.x, y=self.y)
-
-    def __iter__(self):
-        '''for unpacking'''
-        return (x for x in (self.x, self.y))
-
-
 from consts import *
+from topology import topology
+import counters
 
 def triangleS(A, B, C):
     '''retrun the surface of a triangle'''
@@ -69,22 +48,66 @@ def inBounds(v, w, h):
     return (v.X >= 0 and v.X < h and\
             v.Y >= 0 and v.Y < w)
 
+# face used by every text helper
+FONT_FACE = 'Verdana'
+# rendered text surfaces kept by renderText, least recently used dropped first
+TEXT_CACHE_SIZE = 256
+
+_fonts = {}
+_text_cache = OrderedDict()
+_text_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+def getFont(size, face=FONT_FACE):
+    '''the shared pygame font for (face, size); SysFont looks the face up only once'''
+    font = _fonts.get((face, size))
+    if font is None:
+        font = _fonts[(face, size)] = pg.font.SysFont(face, size)
+    return font
+
+def renderText(txt, size, col, antialias=False, face=FONT_FACE):
+    '''
+    rendered surface of txt, shared between calls with the same text, size,
+    colour, antialiasing and face; callers must not draw on it
+    '''
+    key = (txt, size, tuple(col), antialias, face)
+    text = _text_cache.get(key)
+    if text is not None:
+        _text_cache.move_to_end(key)
+        _text_stats['hits'] += 1
+        return text
+    _text_stats['misses'] += 1
+    text = _text_cache[key] = getFont(size, face).render(txt, antialias, col)
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+        _text_stats['evictions'] += 1
+    return text
+
+def text_cache_stats():
+    '''hits, misses and evictions of the text cache, plus its fonts and entries'''
+    stats = dict(_text_stats)
+    stats['entries'] = len(_text_cache)
+    stats['fonts'] = len(_fonts)
+    return stats
+
+def clear_text_cache():
+    '''drops every cached font and text surface and resets the counters'''
+    _fonts.clear()
+    _text_cache.clear()
+    for name in _text_stats:
+        _text_stats[name] = 0
+
 def textRect(txt, size):
-    font = pg.font.SysFont('Verdana', size)
-    text = font.render(txt, False, BLACK)
-    return text.get_rect()
+    return renderText(txt, size, BLACK).get_rect()
 
 def textOut(surface, data, size, col, pos):
     txt = str(data)
-    font = pg.font.SysFont('Verdana', size)
-    text = font.render(txt, False, col)
+    text = renderText(txt, size, col)
     rect = text.get_rect(center=pos)
     surface.blit(text, rect)
 
 def textOutMultiline(surface, txt, size, col, pos):
-    font = pg.font.SysFont('Verdana', size)
     for y, line in enumerate(txt.split('\n')):
-        text = font.render(line, False, col)
+        text = renderText(line, size, col)
         rect = text.get_rect(center=(pos[0], pos[1]+(y+5)*size))
         surface.blit(text, rect)
 
@@ -93,63 +116,64 @@ def dijkstra_check_win(grid, player):
     Uses Dijkstra's algorithm to check if a player has won.
     A player wins if they have a path from one side to the opposite side using only their pieces.
     Returns True if player has won, False otherwise.
+    Cells are flat indices (r*size + c) of the cached board topology, whose
+    distance buffer is reused instead of allocating a matrix per call.
     '''
     size = len(grid)
-    INF = float('inf')
-    
-    # Initialize distance matrix
-    dist = [[INF for _ in range(size)] for __ in range(size)]
-    
-    # Priority queue: (distance, row, col)
+    topo = topology(size)
+    coords, neighbors, edges = topo.coords, topo.neighbors, topo.edges
+    goal = topo.goal_flag(player)
+
+    # Reset the shared distance buffer
+    dist = topo.distances()
+
+    # Priority queue: (distance, cell); heap traffic is reported to counters
     pq = []
-    
-    if player == 1:  # Green: connect top (row 0) to bottom (row size-1)
-        # Initialize all cells in top row that belong to player
-        for col in range(size):
-            if grid[0][col] == player:
-                dist[0][col] = 0
-                heapq.heappush(pq, (0, 0, col))
-    else:  # Player 2 (Blue): connect left (col 0) to right (col size-1)
-        # Initialize all cells in left column that belong to player
-        for row in range(size):
-            if grid[row][0] == player:
-                dist[row][0] = 0
-                heapq.heappush(pq, (0, row, 0))
-    
+    pushes = pops = settled = 0
+
+    # Green starts from the top row, Blue from the left column;
+    # only cells that belong to the player can start a path
+    for i in topo.start_edge(player):
+        r, c = coords[i]
+        if grid[r][c] == player:
+            dist[i] = 0
+            heapq.heappush(pq, (0, i))
+            pushes += 1
+
     # Dijkstra's algorithm - only traverse through player's own pieces
     while pq:
-        d, r, c = heapq.heappop(pq)
-        
+        d, i = heapq.heappop(pq)
+        pops += 1
+
         # If we've already found a better path, skip
-        if d > dist[r][c]:
+        if d > dist[i]:
             continue
-        
-        # Check if we've reached the target side
-        if player == 1 and r == size - 1:  # Green reached bottom
-            return True
-        elif player == 2 and c == size - 1:  # Blue reached right
+        settled += 1
+
+        # Check if we've reached the target side (Green bottom, Blue right)
+        if edges[i] & goal:
+            counters.heap(pushes, pops, settled)
             return True
-        
+
         # Explore neighbors (hexagonal adjacency) - only through player's pieces
-        for move in moves:
-            nr, nc = r + move.X, c + move.Y
-            
-            if not (0 <= nr < size and 0 <= nc < size):
-                continue
-            
+        for j in neighbors[i]:
+            nr, nc = coords[j]
+
             # Only traverse through player's own pieces (weight 0)
             if grid[nr][nc] == player:
                 weight = 0
             else:
                 continue  # Skip opponent's cells and empty cells
-            
+
             # Relax edge
-            new_dist = dist[r][c] + weight
-            if new_dist < dist[nr][nc]:
-                dist[nr][nc] = new_dist
-                heapq.heappush(pq, (new_dist, nr, nc))
-    
+            new_dist = d + weight
+            if new_dist < dist[j]:
+                dist[j] = new_dist
+                heapq.heappush(pq, (new_dist, j))
+                pushes += 1
+
     # No path found to target side
+    counters.heap(pushes, pops, settled)
     return False
 def dijkstra_winning_distance(grid, player):
     '''
@@ -162,60 +186,56 @@ def dijkstra_winning_distance(grid, player):
     For Player 2 (Blue): finds shortest path from left column (col 0) to right column (col size-1)
     
     Returns the minimum distance (number of moves needed) to win, or float('inf') if impossible.
+    Like dijkstra_check_win it works on flat cell indices and the reused
+    distance buffer of the cached board topology.
     '''
     size = len(grid)
     INF = float('inf')
-    
-    # Initialize distance matrix
-    dist = [[INF for _ in range(size)] for __ in range(size)]
-    
-    # Priority queue: (distance, row, col)
+    topo = topology(size)
+    coords, neighbors, edges = topo.coords, topo.neighbors, topo.edges
+    goal = topo.goal_flag(player)
+
+    # Reset the shared distance buffer
+    dist = topo.distances()
+
+    # Priority queue: (distance, cell); heap traffic is reported to counters
     pq = []
-    
-    if player == 1:  # Green: connect top (row 0) to bottom (row size-1)
-        # Initialize all cells in top row
-        for col in range(size):
-            if grid[0][col] == player:
-                dist[0][col] = 0
-                heapq.heappush(pq, (0, 0, col))
-            elif grid[0][col] == 0:  # Empty cell
-                dist[0][col] = 1
-                heapq.heappush(pq, (1, 0, col))
-            # If opponent's cell, distance remains INF (can't start from there)
-    else:  # Player 2 (Blue): connect left (col 0) to right (col size-1)
-        # Initialize all cells in left column
-        for row in range(size):
-            if grid[row][0] == player:
-                dist[row][0] = 0
-                heapq.heappush(pq, (0, row, 0))
-            elif grid[row][0] == 0:  # Empty cell
-                dist[row][0] = 1
-                heapq.heappush(pq, (1, row, 0))
-            # If opponent's cell, distance remains INF
-    
+    pushes = pops = settled = 0
+
+    # Initialize the start side: top row for Green, left column for Blue
+    for i in topo.start_edge(player):
+        r, c = coords[i]
+        if grid[r][c] == player:
+            dist[i] = 0
+            heapq.heappush(pq, (0, i))
+            pushes += 1
+        elif grid[r][c] == 0:  # Empty cell
+            dist[i] = 1
+            heapq.heappush(pq, (1, i))
+            pushes += 1
+        # If opponent's cell, distance remains INF (can't start from there)
+
     # Dijkstra's algorithm
     while pq:
-        d, r, c = heapq.heappop(pq)
-        
+        d, i = heapq.heappop(pq)
+        pops += 1
+
         # If we've already found a better path, skip
-        if d > dist[r][c]:
+        if d > dist[i]:
             continue
-        
+        settled += 1
+
         # Check if we've reached the target side
         # Since Dijkstra processes nodes in order of increasing distance,
         # the first target node we pop is guaranteed to be the shortest path
-        if player == 1 and r == size - 1:  # Green reached bottom
-            return dist[r][c]
-        elif player == 2 and c == size - 1:  # Blue reached right
-            return dist[r][c]
-        
+        if edges[i] & goal:
+            counters.heap(pushes, pops, settled)
+            return d
+
         # Explore neighbors (hexagonal adjacency)
-        for move in moves:
-            nr, nc = r + move.X, c + move.Y
-            
-            if not (0 <= nr < size and 0 <= nc < size):
-                continue
-            
+        for j in neighbors[i]:
+            nr, nc = coords[j]
+
             # Calculate edge weight
             if grid[nr][nc] == player:
                 weight = 0  # Already owned by player
@@ -223,14 +243,16 @@ def dijkstra_winning_distance(grid, player):
                 weight = 1  # Empty cell, need to claim it
             else:
                 continue  # Opponent's cell, can't traverse
-            
+
             # Relax edge
-            new_dist = dist[r][c] + weight
-            if new_dist < dist[nr][nc]:
-                dist[nr][nc] = new_dist
-                heapq.heappush(pq, (new_dist, nr, nc))
-    
+            new_dist = d + weight
+            if new_dist < dist[j]:
+                dist[j] = new_dist
+                heapq.heappush(pq, (new_dist, j))
+                pushes += 1
+
     # No path found to target side
+    counters.heap(pushes, pops, settled)
     return INF
 
 def estimate_winning_chance(grid):
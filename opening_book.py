@@ -0,0 +1,111 @@
+"""
+Opening book: precomputed Blue replies for early positions, one file per
+board size (books/hex_<size>.book, written by book_builder.py).
+
+Positions are keyed by their canonical Zobrist hash. Turning the board
+by 180 degrees maps each player's edges onto themselves, so a position
+and its rotation share one entry. The canonical key is the smaller of
+the two hashes, and the stored move is in the orientation of that key.
+HexEngine keeps both hashes up to date as stones are placed, so a lookup
+never has to scan the board.
+
+File layout (little endian):
+    header  8s magic, H size, H reserved, I count      (16 bytes)
+    keys    count x Q, sorted ascending
+    moves   count x H, flat cell index r * size + c
+
+The file is memory-mapped, and the key and move sections are read as
+typed memoryviews straight from the mapping. A probe is one bisect over
+the keys. It never loads or copies the book.
+"""
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left
+
+MAGIC = b'HEXBOOK1'
+HEADER = struct.Struct('<8sHHI')
+BOOK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'books')
+
+_books = {}
+
+
+def book_path(size, directory=BOOK_DIR):
+    return os.path.join(directory, 'hex_{}.book'.format(size))
+
+
+def rotate(size, cell):
+    '''flat index of cell after turning the board by 180 degrees'''
+    return size * size - 1 - cell
+
+
+class OpeningBook:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, _, self.count = HEADER.unpack_from(self._map, 0)
+        end = HEADER.size + 10 * self.count
+        if magic != MAGIC or len(self._map) < end:
+            self._map.close()
+            raise ValueError('not an opening book: {}'.format(path))
+        view = memoryview(self._map)
+        key_end = HEADER.size + 8 * self.count
+        self.keys = view[HEADER.size:key_end].cast('Q')
+        self.moves = view[key_end:end].cast('H')
+
+    def __len__(self):
+        return self.count
+
+    def probe(self, key):
+        '''stored flat move for a canonical key, or None'''
+        i = bisect_left(self.keys, key)
+        if i < self.count and self.keys[i] == key:
+            return self.moves[i]
+        return None
+
+    def move(self, hash0, hash180):
+        '''
+        book move for the position with Zobrist hash hash0 (and hash180 of
+        its rotation), as (r, c) on the actual board, or None
+        '''
+        if hash180 < hash0:
+            cell = self.probe(hash180)
+            if cell is not None:
+                cell = rotate(self.size, cell)
+        else:
+            cell = self.probe(hash0)
+        if cell is None:
+            return None
+        return divmod(cell, self.size)
+
+    def close(self):
+        self.keys.release()
+        self.moves.release()
+        self._map.close()
+
+
+def book(size):
+    '''the mapped book for size, opened once per process; None if there is none'''
+    if size in _books:
+        return _books[size]
+    found = None
+    # the typed views use native byte order, and books are little endian
+    if sys.byteorder == 'little':
+        try:
+            found = OpeningBook(book_path(size))
+        except (OSError, ValueError):
+            found = None
+    _books[size] = found
+    return found
+
+
+def write_book(path, size, entries):
+    '''writes {canonical key: flat move} as a book file, atomically'''
+    items = sorted(entries.items())
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, size, 0, len(items)))
+        f.write(struct.pack('<{}Q'.format(len(items)), *(k for k, _ in items)))
+        f.write(struct.pack('<{}H'.format(len(items)), *(m for _, m in items)))
+    os.replace(tmp, path)
@@ -0,0 +1,246 @@
+"""
+Process-pool fan-out of CPU candidate evaluation.
+
+Greedy candidate scoring and the backtracking candidate loop judge every
+candidate move independently, so the candidates are split into ordered
+chunks and handed to a persistent pool of worker processes. The board
+itself is not pickled: the parent writes it once per move into a
+shared-memory block and the tasks only carry the block name, the board
+size and their slice of candidates. For Greedy the parent also solves the
+two base distance fields once (batch_eval.candidate_fields) and writes
+them into the same block, so a chunk only does its per-candidate repairs
+and the fixed cost is not paid again per chunk. Results come back in
+candidate order, so the callers combine them exactly as the in-process
+loops do.
+
+Small boards, short candidate lists and single-core machines are cheaper
+to evaluate in-process; the public helpers return None in those cases
+(and whenever the pool cannot be used) and the caller falls back. A pool
+that fails in any way is discarded, and the next move starts a new one.
+"""
+import atexit
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import batch_eval
+import counters
+from backtracking import BacktrackingSearch
+from distance_engine import DistanceEngine
+from zobrist import TranspositionTable
+
+# boards smaller than this are always evaluated in-process
+PARALLEL_MIN_SIZE = 11
+# fewer candidates than this per worker is not worth the round trip
+MIN_CANDIDATES_PER_WORKER = 4
+# chunks per worker, so uneven candidates still balance out
+CHUNKS_PER_WORKER = 2
+
+_pool = None
+_pool_failed = False
+_board_shm = None
+# worker side: backtracking transposition tables by board size, kept across tasks
+_tables = {}
+
+
+def workers():
+    return os.cpu_count() or 1
+
+
+def worthwhile(size, n_candidates):
+    '''True if fanning out n_candidates on a size x size board should pay off'''
+    return (not _pool_failed and size >= PARALLEL_MIN_SIZE and workers() > 1
+            and n_candidates >= 2 * MIN_CANDIDATES_PER_WORKER)
+
+
+def _warm():
+    '''worker initializer; importing this module already loaded the evaluators'''
+    if batch_eval.available():
+        batch_eval.board_distances([[0] * PARALLEL_MIN_SIZE] * PARALLEL_MIN_SIZE)
+
+
+def _get_pool():
+    global _pool, _pool_failed
+    if _pool is None and not _pool_failed:
+        try:
+            # spawn keeps SDL/pygame state out of the workers
+            _pool = mp.get_context('spawn').Pool(workers(), initializer=_warm)
+        except Exception:
+            _pool_failed = True
+    return _pool
+
+
+def prepare(size):
+    '''starts the pool ahead of the first move if boards of this size will use it'''
+    if worthwhile(size, 2 * MIN_CANDIDATES_PER_WORKER):
+        _get_pool()
+
+
+def _fields_offset(n):
+    '''byte offset of the distance fields in the shared block, after the board'''
+    return -(-n * n // 4) * 4
+
+
+def _share_board(grid, fields=None):
+    '''
+    writes grid, and the int32 n x n arrays of fields if given, into the
+    shared board block (resized if needed); returns its name
+    '''
+    global _board_shm
+    n = len(grid)
+    size = n * n
+    if fields is not None:
+        size = _fields_offset(n) + 4 * n * n * len(fields)
+    if _board_shm is None or _board_shm.size < size:
+        if _board_shm is not None:
+            _board_shm.close()
+            _board_shm.unlink()
+        _board_shm = shared_memory.SharedMemory(create=True, size=size)
+    _board_shm.buf[:n * n] = bytes(v for row in grid for v in row)
+    if fields is not None:
+        np = batch_eval.np
+        out = np.ndarray((len(fields), n, n), dtype=np.int32, buffer=_board_shm.buf,
+                         offset=_fields_offset(n))
+        for i, field in enumerate(fields):
+            out[i] = field
+        del out
+    return _board_shm.name
+
+
+def _read_board(name, n, fields=0):
+    '''the shared board, and with fields > 0 also that many shared n x n arrays'''
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        data = bytes(shm.buf[:n * n])
+        if fields:
+            np = batch_eval.np
+            arrays = np.ndarray((fields, n, n), dtype=np.int32, buffer=shm.buf,
+                                offset=_fields_offset(n)).copy()
+    finally:
+        # the parent may replace the block, so no attachment is kept
+        shm.close()
+    grid = [list(data[r * n:(r + 1) * n]) for r in range(n)]
+    if fields:
+        return grid, arrays
+    return grid
+
+
+def _chunks(items):
+    count = min(workers() * CHUNKS_PER_WORKER, max(1, len(items) // MIN_CANDIDATES_PER_WORKER))
+    step = -(-len(items) // count)
+    return [items[i:i + step] for i in range(0, len(items), step)]
+
+
+def _greedy_task(args):
+    name, n, cells, bests = args
+    if bests is None:
+        grid = _read_board(name, n)
+        engine = DistanceEngine(grid)
+        out = []
+        for r, c in cells:
+            engine.place(r, c, 2)
+            out.append(engine.distances())
+            engine.undo()
+        return out
+    grid, (own_through, opp_through) = _read_board(name, n, fields=2)
+    fields = (bests[0], own_through, bests[1], opp_through)
+    return batch_eval.candidate_distances(grid, cells, fields=fields)
+
+
+def _backtracking_task(args):
+    name, n, cells, base_conn = args
+    table = _tables.get(n)
+    if table is None:
+        table = _tables[n] = TranspositionTable()
+    search = BacktrackingSearch.from_grid(_read_board(name, n), table)
+    return [search.evaluate(r, c, base_conn) for r, c in cells]
+
+
+def _counted(args):
+    '''runs a task, with its effort counts when the parent is counting'''
+    task, instrument, task_args = args
+    if not instrument:
+        return task(task_args), None
+    counters.start()
+    try:
+        result = task(task_args)
+    finally:
+        counts = counters.stop()
+    return result, counts
+
+
+def _fan_out(task, grid, cells, *extra, stop=None, fields=None):
+    '''
+    the results of every cell in order; with stop set, the chunks after the
+    one during which it turned true are dropped, so a prefix comes back.
+    fields are arrays shared with the tasks next to the board
+    '''
+    pool = _get_pool()
+    if pool is None:
+        return None
+    try:
+        name = _share_board(grid, fields)
+        n = len(grid)
+        instrument = counters.ENABLED
+        parts = []
+        for part in pool.imap(_counted, [(task, instrument, (name, n, chunk) + extra)
+                                         for chunk in _chunks(cells)]):
+            parts.append(part)
+            if stop is not None and stop():
+                break
+    except Exception:
+        # a dead worker, a broken pipe, a pickling error, ...: the caller
+        # evaluates in-process, and the next move gets a fresh pool
+        _discard_pool()
+        return None
+    for _, counts in parts:
+        counters.merge(counts)
+    return [result for part, _ in parts for result in part]
+
+
+def greedy_distances(grid, cells, stop=None):
+    '''
+    (human_dist, cpu_dist) after a CPU stone on each cell, in order, computed
+    by the worker pool; None if the caller should evaluate in-process. Only
+    a prefix of the cells is answered once stop() is true
+    '''
+    if not worthwhile(len(grid), len(cells)):
+        return None
+    if not batch_eval.available():
+        return _fan_out(_greedy_task, grid, list(cells), None, stop=stop)
+    own_best, own_through, opp_best, opp_through = batch_eval.candidate_fields(grid)
+    return _fan_out(_greedy_task, grid, list(cells), (own_best, opp_best), stop=stop,
+                    fields=(own_through, opp_through))
+
+
+def backtracking_verdicts(grid, cells, base_conn, stop=None):
+    '''
+    BacktrackingSearch.evaluate verdicts for each cell, in order, computed by
+    the worker pool; None if the caller should evaluate in-process. Only a
+    prefix of the cells is answered once stop() is true
+    '''
+    if not worthwhile(len(grid), len(cells)):
+        return None
+    return _fan_out(_backtracking_task, grid, list(cells), base_conn, stop=stop)
+
+
+def _discard_pool():
+    global _pool
+    if _pool is not None:
+        try:
+            _pool.terminate()
+            _pool.join()
+        except Exception:
+            pass
+        _pool = None
+
+
+@atexit.register
+def shutdown():
+    '''stops the pool and releases the shared board block'''
+    global _board_shm
+    _discard_pool()
+    if _board_shm is not None:
+        _board_shm.close()
+        _board_shm.unlink()
+        _board_shm = None
@@ -0,0 +1,329 @@
+"""
+Append-only log of per-session CPU timings.
+
+Each session is one JSON object per line (NDJSON) in LOG_FILE. Logging a
+session only queues the entry. A background thread appends queued
+entries in batches and fsyncs them according to FSYNC_POLICY, so the
+game-over screen never waits on disk and the cost of a write no longer
+grows with the history.
+
+Rotation: when the active file grows past MAX_BYTES, it is renamed to
+LOG_FILE.1 and older segments shift up (.1 -> .2, ...). Compaction: when
+there are more than MAX_SEGMENTS rotated segments, the two oldest are
+merged into one. While the merged segment is larger than MAX_BYTES, each
+(strategy, board size) pair of its entries is merged into one entry
+with a `sessions` count: avg_execution_time becomes the mean over those
+sessions, moves_count and counters their totals. No session is dropped,
+but the oldest history gets coarser with every compaction. The log thus
+takes at most about (MAX_SEGMENTS + 1) * MAX_BYTES on disk, and a
+rotation rewrites at most two segments, so its cost does not grow with
+the history either. Rewrites (compaction, the legacy migration) go to a
+temporary file that is then renamed over the old one.
+
+The first time the writer runs, the old JSON array file (LEGACY_FILE) is
+converted into LOG_FILE. The old file is left in place. Only the writer
+thread migrates; readers fall back to LEGACY_FILE until it has.
+
+Readers use read_entries(), which yields every entry oldest first,
+across all segments. An entry stands for entry.get('sessions', 1)
+sessions.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+from time import monotonic
+
+LOG_FILE = 'cpu_performance_log.ndjson'
+LEGACY_FILE = 'cpu_performance_log.json'
+
+# 'always': fsync after every batch; 'interval': at most every FSYNC_INTERVAL seconds;
+# 'never': leave it to the OS
+FSYNC_POLICY = 'interval'
+FSYNC_INTERVAL = 5.0
+# entries written with one write call
+BATCH_SIZE = 64
+# how long the writer waits for more entries before writing a partial batch
+FLUSH_INTERVAL = 0.5
+# the active file is rotated past this size
+MAX_BYTES = 1 << 20
+# rotated segments kept; older ones are compacted into the oldest
+MAX_SEGMENTS = 8
+
+_queue = None
+_thread = None
+_lock = threading.Lock()
+
+
+def segment(n, log_file=LOG_FILE):
+    '''path of segment n; 0 is the active file, higher numbers are older'''
+    return log_file if n == 0 else '{}.{}'.format(log_file, n)
+
+
+def segments(log_file=LOG_FILE):
+    '''existing segment paths, oldest first'''
+    found = []
+    n = 1
+    while os.path.exists(segment(n, log_file)):
+        found.append(segment(n, log_file))
+        n += 1
+    found.reverse()
+    if os.path.exists(log_file):
+        found.append(log_file)
+    return found
+
+
+def _encode(entry):
+    return json.dumps(entry, separators=(',', ':')) + '\n'
+
+
+def _parse_lines(f):
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # torn or corrupt record
+            continue
+        if isinstance(entry, dict):
+            yield entry
+
+
+def _replace(target, entries):
+    '''atomically replaces target with the given entries'''
+    tmp = target + '.tmp'
+    with open(tmp, 'w') as f:
+        f.writelines(_encode(entry) for entry in entries)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+
+
+def migrate(log_file=LOG_FILE, legacy_file=LEGACY_FILE):
+    '''converts the legacy JSON array log once; returns the number of entries moved'''
+    if os.path.exists(log_file) or segments(log_file) or not os.path.exists(legacy_file):
+        return 0
+    entries = legacy_entries(legacy_file)
+    try:
+        _replace(log_file, entries)
+    except (IOError, OSError):
+        return 0
+    return len(entries)
+
+
+def legacy_entries(legacy_file):
+    try:
+        with open(legacy_file, 'r') as f:
+            data = json.load(f)
+    except (ValueError, IOError):
+        return []
+    if not isinstance(data, list):
+        return []
+    return [entry for entry in data if isinstance(entry, dict)]
+
+
+def _read_segment(name):
+    try:
+        with open(name, 'r') as f:
+            # read the segment whole so a concurrent rotation cannot split it
+            lines = f.readlines()
+    except IOError:
+        return []
+    return list(_parse_lines(lines))
+
+
+def read_entries(log_file=LOG_FILE, legacy_file=LEGACY_FILE):
+    '''every logged entry, oldest first'''
+    names = segments(log_file)
+    if not names:
+        # not migrated yet (the writer has not run), or a read-only directory
+        for entry in legacy_entries(legacy_file):
+            yield entry
+        return
+    for name in names:
+        for entry in _read_segment(name):
+            yield entry
+
+
+def rotate(log_file=LOG_FILE):
+    '''moves the active file to segment 1, shifting older segments up'''
+    if not os.path.exists(log_file):
+        return
+    n = 1
+    while os.path.exists(segment(n, log_file)):
+        n += 1
+    for k in range(n, 0, -1):
+        os.replace(segment(k - 1, log_file), segment(k, log_file))
+    compact(log_file)
+    # an empty active file right away, so readers never see the log without one
+    open(log_file, 'a').close()
+
+
+def _number(x):
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+
+def sessions(entry):
+    '''how many sessions an entry stands for (more than one after compaction)'''
+    n = entry.get('sessions', 1)
+    return n if isinstance(n, int) and not isinstance(n, bool) and n > 0 else 1
+
+
+def _merge(a, b):
+    '''one entry for the sessions of a and the later b'''
+    wa, wb = sessions(a), sessions(b)
+    merged = dict(a)
+    merged['sessions'] = wa + wb
+    for key in ('avg_execution_time', 'execution_time'):
+        if _number(a.get(key)) and _number(b.get(key)):
+            merged[key] = round((a[key] * wa + b[key] * wb) / (wa + wb), 6)
+    if _number(a.get('moves_count')) and _number(b.get('moves_count')):
+        merged['moves_count'] = a['moves_count'] + b['moves_count']
+    if isinstance(a.get('counters'), dict) and isinstance(b.get('counters'), dict):
+        counts = dict(a['counters'])
+        for name, value in b['counters'].items():
+            if _number(value) and _number(counts.get(name, 0)):
+                counts[name] = counts.get(name, 0) + value
+        merged['counters'] = counts
+    return merged
+
+
+def _halve(entries):
+    '''merges consecutive entries of the same strategy and board size in pairs'''
+    halved = []
+    waiting = {}
+    for entry in entries:
+        key = (entry.get('strategy'), entry.get('board_size'))
+        i = waiting.pop(key, None)
+        if i is None:
+            waiting[key] = len(halved)
+            halved.append(entry)
+        else:
+            halved[i] = _merge(halved[i], entry)
+    return halved
+
+
+def compact(log_file=LOG_FILE, max_segments=None):
+    '''
+    merges the oldest rotated segments until at most max_segments (default
+    MAX_SEGMENTS) remain, halving the merged entries until they fit in MAX_BYTES
+    '''
+    if max_segments is None:
+        max_segments = MAX_SEGMENTS
+    rotated = [name for name in segments(log_file) if name != log_file]
+    # rotated is oldest first; merging the two oldest keeps the numbers contiguous
+    while len(rotated) > max(max_segments, 1):
+        oldest, into = rotated[0], rotated[1]
+        entries = _read_segment(oldest) + _read_segment(into)
+        while sum(len(_encode(entry)) for entry in entries) > MAX_BYTES:
+            halved = _halve(entries)
+            if len(halved) == len(entries):
+                break
+            entries = halved
+        # a crash between the two leaves the oldest sessions twice, never lost
+        _replace(into, entries)
+        os.remove(oldest)
+        rotated.pop(0)
+
+
+class _Writer:
+    def __init__(self, log_file):
+        self.log_file = log_file
+        self.last_sync = monotonic()
+
+    def _open(self):
+        f = open(self.log_file, 'ab+')
+        # a crash can leave a half-written last line; start the next record on a new one
+        end = f.seek(0, os.SEEK_END)
+        if end > 0:
+            f.seek(end - 1)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        return f
+
+    def write(self, batch):
+        try:
+            with self._open() as f:
+                f.write(''.join(_encode(entry) for entry in batch).encode())
+                f.flush()
+                now = monotonic()
+                if FSYNC_POLICY == 'always' or (FSYNC_POLICY == 'interval'
+                                                and now - self.last_sync >= FSYNC_INTERVAL):
+                    os.fsync(f.fileno())
+                    self.last_sync = now
+                size = f.tell()
+            if size > MAX_BYTES:
+                rotate(self.log_file)
+        except (IOError, OSError):
+            # logging must never break the game
+            pass
+
+
+def _run(q, log_file):
+    try:
+        migrate(log_file)
+    except (IOError, OSError):
+        pass
+    writer = _Writer(log_file)
+    done = False
+    while not done:
+        item = q.get()
+        batch, flushes = [], []
+        while True:
+            if item is None:
+                done = True
+            elif isinstance(item, threading.Event):
+                flushes.append(item)
+            else:
+                batch.append(item)
+            if done or len(batch) >= BATCH_SIZE:
+                break
+            try:
+                item = q.get(timeout=0 if flushes else FLUSH_INTERVAL)
+            except queue.Empty:
+                break
+        if batch:
+            writer.write(batch)
+        for event in flushes:
+            event.set()
+
+
+def _start():
+    global _queue, _thread
+    if _thread is None or not _thread.is_alive():
+        _queue = queue.Queue()
+        _thread = threading.Thread(target=_run, args=(_queue, LOG_FILE),
+                                   name='perf-log', daemon=True)
+        _thread.start()
+
+
+def append(entry):
+    '''queues one session entry for the background writer'''
+    with _lock:
+        _start()
+        _queue.put(entry)
+
+
+def flush(timeout=5.0):
+    '''waits until everything queued so far is on disk; False on timeout'''
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            return True
+        event = threading.Event()
+        _queue.put(event)
+    return event.wait(timeout)
+
+
+@atexit.register
+def close(timeout=5.0):
+    '''writes what is queued and stops the writer thread'''
+    global _thread
+    with _lock:
+        if _thread is None:
+            return
+        thread, _thread = _thread, None
+        _queue.put(None)
+    thread.join(timeout)
@@ -0,0 +1,320 @@
+"""
+Incremental per-strategy statistics over the performance log.
+
+A StatsStore remembers how far into the active log file it has read (the
+file's identity and a byte offset). refresh() stats the file and, if it
+grew, parses only the new complete lines. An unchanged file costs one
+os.stat call. If the active file was rotated (perf_log renames it to
+segment 1), the store finishes the old file under its new name and
+starts the new one from 0. If the history cannot be followed (the file
+was truncated, or compacted into an older segment), the store rebuilds
+from all segments. A compacted entry counts as the sessions it stands for.
+
+Each strategy keeps:
+- count, last, best, worst and the running total;
+- a QuantileSketch for p50/p95/p99;
+- a Histogram over fixed decade bins.
+
+Both the sketch and the histogram are mergeable and have a size that
+does not depend on the number of sessions. Summaries are recomputed
+only after new entries arrive, so a frame that draws the table costs
+the same no matter how long the history is.
+"""
+import json
+import os
+from math import ceil, log
+
+import perf_log
+from consts import STRATEGIES
+
+# quantiles reported by StrategyStats.summary()
+QUANTILES = (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))
+# bytes from the start of the active file kept to recognise it after a rename
+HEAD_BYTES = 64
+# histogram bin edges in seconds: below 10us, decades up to 100s, above
+HISTOGRAM_EDGES = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0, 100.0)
+
+
+def _head(name):
+    try:
+        with open(name, 'rb') as f:
+            return f.read(HEAD_BYTES)
+    except (IOError, OSError):
+        return None
+
+
+def _mtime(name):
+    try:
+        return os.stat(name).st_mtime_ns
+    except OSError:
+        return None
+
+
+class QuantileSketch:
+    '''
+    Log-bucketed quantile sketch: every estimate is within `accuracy` relative
+    error of a true sample value. Values go into bucket ceil(log_gamma(x)) and
+    two sketches with the same accuracy merge by adding bucket counts.
+    '''
+    def __init__(self, accuracy=0.01):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, x, n=1):
+        self.count += n
+        if x <= 0:
+            self.zeros += n
+            return
+        k = int(ceil(log(x) / self._log_gamma))
+        self.buckets[k] = self.buckets.get(k, 0) + n
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError('sketches with different accuracy cannot be merged')
+        for k, n in other.buckets.items():
+            self.buckets[k] = self.buckets.get(k, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantile(self, q):
+        '''estimated q-quantile, or None if nothing was added'''
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if rank < seen:
+                # midpoint of (gamma^(k-1), gamma^k] in relative terms
+                return 2 * self.gamma ** k / (1 + self.gamma)
+        return 2 * self.gamma ** max(self.buckets) / (1 + self.gamma)
+
+
+class Histogram:
+    '''session counts per bin of `edges`, plus one bin below and one above'''
+    def __init__(self, edges=HISTOGRAM_EDGES):
+        self.edges = tuple(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+
+    def add(self, x, n=1):
+        i = 0
+        for edge in self.edges:
+            if x < edge:
+                break
+            i += 1
+        self.counts[i] += n
+
+    def merge(self, other):
+        if other.edges != self.edges:
+            raise ValueError('histograms with different bins cannot be merged')
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+
+
+class StrategyStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = None
+        self.best = None
+        self.worst = None
+        self.sketch = QuantileSketch()
+        self.histogram = Histogram()
+
+    def add(self, t, n=1):
+        '''n sessions that took t on average'''
+        self.count += n
+        self.total += t * n
+        self.last = t
+        if self.best is None or t < self.best:
+            self.best = t
+        if self.worst is None or t > self.worst:
+            self.worst = t
+        self.sketch.add(t, n)
+        self.histogram.add(t, n)
+
+    def merge(self, other):
+        '''adds other's sessions, taken to be the later ones'''
+        if not other.count:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.last = other.last
+        self.best = other.best if self.best is None else min(self.best, other.best)
+        self.worst = other.worst if self.worst is None else max(self.worst, other.worst)
+        self.sketch.merge(other.sketch)
+        self.histogram.merge(other.histogram)
+
+    def summary(self):
+        summary = {
+            'count': self.count,
+            'last': self.last,
+            'best': self.best,
+            'worst': self.worst,
+            'mean': self.total / self.count if self.count else None,
+            'histogram': list(self.histogram.counts),
+        }
+        for name, q in QUANTILES:
+            summary[name] = self.sketch.quantile(q)
+        return summary
+
+
+class StatsStore:
+    def __init__(self, log_file=perf_log.LOG_FILE, strategies=STRATEGIES):
+        self.log_file = log_file
+        self.strategies = tuple(strategies)
+        self._reset()
+
+    def _reset(self):
+        self.stats = {s: StrategyStats() for s in self.strategies}
+        # (device, inode) of the active file read so far (None if there was
+        # none), its first bytes (inode numbers can be reused) and the bytes consumed
+        self.file_id = None
+        self.head = b''
+        self.offset = 0
+        self.legacy_mtime = None
+        self._summaries = None
+        self.loaded = False
+
+    def _add(self, entry):
+        st = self.stats.get(entry.get('strategy'))
+        if st is None:
+            return
+        t = entry.get('avg_execution_time', entry.get('execution_time'))
+        if isinstance(t, (int, float)) and not isinstance(t, bool):
+            st.add(t, perf_log.sessions(entry))
+            self._summaries = None
+
+    def _consume(self, name, offset):
+        '''parses the complete lines of name from offset; returns the new offset'''
+        try:
+            with open(name, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except (IOError, OSError):
+            return offset
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict):
+                self._add(entry)
+        return offset + end
+
+    def _rebuild(self):
+        self._reset()
+        self.loaded = True
+        names = perf_log.segments(self.log_file)
+        if not names:
+            self._read_legacy()
+            return
+        for name in names:
+            if name == self.log_file:
+                st = os.stat(name)
+                self.file_id = (st.st_dev, st.st_ino)
+                self.offset = self._consume(name, 0)
+                self.head = _head(name) or b''
+            else:
+                self._consume(name, 0)
+
+    def _read_legacy(self):
+        self.legacy_mtime = _mtime(perf_log.LEGACY_FILE)
+        if self.legacy_mtime is None:
+            return
+        for entry in perf_log.legacy_entries(perf_log.LEGACY_FILE):
+            self._add(entry)
+
+    def _same_head(self, name):
+        '''True if name still starts with the bytes seen when it was read'''
+        head = _head(name)
+        return head is not None and head[:len(self.head)] == self.head
+
+    def _rotated(self):
+        '''
+        the segments written since the last read, oldest first, starting with the
+        one that is now the file read so far; None if rotation did not keep it whole
+        '''
+        rotated = [name for name in perf_log.segments(self.log_file) if name != self.log_file]
+        for i, name in enumerate(rotated):
+            st = os.stat(name)
+            if ((st.st_dev, st.st_ino) == self.file_id and st.st_size >= self.offset
+                    and self._same_head(name)):
+                return rotated[i:]
+        return None
+
+    def refresh(self):
+        '''reads whatever was logged since the last call; True if anything changed'''
+        if not self.loaded:
+            self._rebuild()
+            return True
+        try:
+            st = os.stat(self.log_file)
+            file_id = (st.st_dev, st.st_ino)
+        except OSError:
+            st = file_id = None
+        if file_id == self.file_id:
+            if st is None:
+                # no active file: only an unmigrated legacy log can have changed
+                if self.legacy_mtime is not None and self.legacy_mtime != _mtime(perf_log.LEGACY_FILE):
+                    self._rebuild()
+                    return True
+                return False
+            if st.st_size == self.offset:
+                return False
+            if st.st_size < self.offset or not self._same_head(self.log_file):
+                self._rebuild()
+                return True
+            self.offset = self._consume(self.log_file, self.offset)
+            if len(self.head) < HEAD_BYTES:
+                self.head = _head(self.log_file) or self.head
+            return True
+        if self.file_id is None:
+            if self.legacy_mtime is not None:
+                # the legacy log was migrated meanwhile
+                self._rebuild()
+                return True
+        else:
+            # the active file changed identity: follow a rotation or start over
+            try:
+                old = self._rotated()
+            except OSError:
+                old = None
+            if old is None:
+                self._rebuild()
+                return True
+            self._consume(old[0], self.offset)
+            for name in old[1:]:
+                self._consume(name, 0)
+        self.file_id, self.offset, self.head = file_id, 0, b''
+        if st is not None:
+            self.offset = self._consume(self.log_file, 0)
+            self.head = _head(self.log_file) or b''
+        return True
+
+    def summaries(self):
+        '''{strategy: summary dict}, recomputed only after new sessions'''
+        if self._summaries is None:
+            self._summaries = {s: st.summary() for s, st in self.stats.items()}
+        return self._summaries
+
+
+_stores = {}
+
+
+def stats_store(log_file=perf_log.LOG_FILE):
+    '''the shared StatsStore of log_file, so reopening the stats screen does not reparse'''
+    store = _stores.get(log_file)
+    if store is None:
+        store = _stores[log_file] = StatsStore(log_file)
+    return store
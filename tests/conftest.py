@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+# the modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def random_game():
+    def random_game(size, rng, moves=None):
+        '''(r, c, player) of `moves` random stones (every cell by default), alternating colours (Green first)'''
+        cells = [(r, c) for r in range(size) for c in range(size)]
+        rng.shuffle(cells)
+        return [(r, c, 1 if i % 2 == 0 else 2) for i, (r, c) in enumerate(cells[:moves])]
+    return random_game
+
+
+@pytest.fixture
+def new_engine():
+    def new_engine(size, ai_mode):
+        '''a HexEngine that plays ai_mode itself, without the opening book or the endgame solver'''
+        from engine import HexEngine
+        engine = HexEngine(size)
+        engine.use_book = False
+        engine.endgame_threshold = 0
+        engine.ai_mode = ai_mode
+        return engine
+    return new_engine
+
+
+@pytest.fixture
+def game(monkeypatch):
+    '''a Game drawn on pygame's dummy video driver, without the CPU worker'''
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    monkeypatch.setenv('SDL_AUDIODRIVER', 'dummy')
+    import pygame as pg
+    import cpu_worker
+    monkeypatch.setattr(cpu_worker, 'start', lambda: False)
+    from Game import Game
+    yield Game
+    pg.quit()
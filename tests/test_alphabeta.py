@@ -0,0 +1,72 @@
+from time import perf_counter
+
+import alphabeta
+
+
+def empty(size):
+    return [[0] * size for _ in range(size)]
+
+
+def test_takes_an_immediate_win():
+    grid = empty(6)
+    for c in range(6):
+        if c != 4:
+            grid[2][c] = 2
+    grid[0][0] = grid[1][1] = grid[4][2] = grid[5][5] = grid[3][3] = 1
+    search = alphabeta.AlphaBetaSearch(grid, budget_ms=200)
+    assert search.search(2) == (2, 4)
+    assert search.depth_reached == 1
+
+
+def test_blocks_the_opponents_winning_cell():
+    grid = empty(6)
+    for r in range(6):
+        if r != 3:
+            grid[r][1] = 1
+    grid[0][4] = grid[2][5] = grid[4][3] = grid[5][0] = 2
+    grid[1][4] = 1
+    assert alphabeta.AlphaBetaSearch(grid, budget_ms=200).search(2) == (3, 1)
+
+
+def test_green_searches_top_to_bottom():
+    grid = empty(5)
+    for r in range(5):
+        if r != 2:
+            grid[r][3] = 1
+    grid[0][0] = grid[1][0] = grid[3][1] = 2
+    assert alphabeta.AlphaBetaSearch(grid, budget_ms=200).search(1) == (2, 3)
+
+
+def test_input_board_is_left_alone():
+    grid = empty(7)
+    grid[3][3] = 1
+    before = [row[:] for row in grid]
+    alphabeta.AlphaBetaSearch(grid, budget_ms=50).search(2)
+    assert grid == before
+
+
+def test_full_board_has_no_move():
+    grid = [[1 if (r + c) % 2 else 2 for c in range(4)] for r in range(4)]
+    assert alphabeta.AlphaBetaSearch(grid, budget_ms=50).search(2) is None
+
+
+def test_stop_keeps_the_depth_one_move():
+    grid = empty(9)
+    grid[4][4] = 1
+    depth_one = alphabeta.AlphaBetaSearch(grid).children(2, 1)[0][1]
+    search = alphabeta.AlphaBetaSearch(grid, budget_ms=10 ** 6, stop=lambda: True)
+    assert search.search(2) == depth_one
+    assert search.depth_reached == 1
+
+
+def test_budget_and_depth_limits():
+    grid = empty(11)
+    grid[5][5] = 1
+    search = alphabeta.AlphaBetaSearch(grid, budget_ms=100)
+    start = perf_counter()
+    assert search.search(2) is not None
+    # the clock is read at every node, and a node is one batch
+    assert perf_counter() - start < 1.0
+    shallow = alphabeta.AlphaBetaSearch(grid, budget_ms=10 ** 6, max_depth=2)
+    shallow.search(2)
+    assert shallow.depth_reached == 2
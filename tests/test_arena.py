@@ -0,0 +1,72 @@
+from itertools import permutations
+
+import pytest
+
+import arena
+
+
+def test_schedule_plays_every_pairing_with_both_colours():
+    players = ('Greedy', 'DP', arena.RANDOM)
+    tasks = arena.schedule([5, 7], players, games=3, seed=1)
+    assert len(tasks) == 2 * 6 * 3
+    assert [t[0] for t in tasks] == list(range(len(tasks)))
+    assert len({t[4] for t in tasks}) == len(tasks)
+    for size in (5, 7):
+        pairs = [(t[2], t[3]) for t in tasks if t[1] == size]
+        assert sorted(set(pairs)) == sorted(permutations(players, 2))
+        assert all(pairs.count(p) == 3 for p in set(pairs))
+
+
+def test_games_replay_from_their_seed():
+    task = (0, 5, 'D&C', arena.RANDOM, 7, 2)
+    first = arena.play_game(task)
+    second = arena.play_game(task)
+    first.pop('latency')
+    second.pop('latency')
+    assert first == second
+    assert first['winner'] in (1, 2)
+    assert 0 < first['moves'] <= 25
+
+
+@pytest.mark.parametrize('colour', [1, 2])
+def test_greedy_beats_random_with_either_colour(colour):
+    # Green plays on the transposed board; a wrong view would lose to Random
+    for seed in range(6):
+        green, blue = ('Greedy', arena.RANDOM) if colour == 1 else (arena.RANDOM, 'Greedy')
+        result = arena.play_game((seed, 5, green, blue, seed, 2))
+        assert result['winner'] == colour
+        assert result['fallbacks'] == 0
+
+
+def test_elo_is_zero_sum_and_rewards_the_winner():
+    results = [
+        {'game_id': 0, 'green': 'A', 'blue': 'B', 'winner': 1},
+        {'game_id': 1, 'green': 'B', 'blue': 'A', 'winner': 2},
+        {'game_id': 2, 'green': 'C', 'blue': 'B', 'winner': 2},
+    ]
+    ratings = arena.elo(results, ('A', 'B', 'C'))
+    assert sum(ratings.values()) == pytest.approx(3 * arena.ELO_START)
+    assert ratings['A'] > arena.ELO_START > ratings['C']
+    assert ratings['A'] > ratings['B']
+    # the first game moves both ratings by half of K
+    first = arena.elo(results[:1], ('A', 'B'))
+    assert first['A'] == pytest.approx(arena.ELO_START + arena.ELO_K / 2)
+
+
+def test_nearest_rank_percentile():
+    values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert arena.percentile(values, 50) == 5
+    assert arena.percentile(values, 90) == 9
+    assert arena.percentile(values, 99) == 10
+    assert arena.percentile(values, 0) == 1
+    assert arena.percentile([], 50) is None
+
+
+def test_summary_counts_games_wins_and_latencies():
+    results = arena.run([5], ('Greedy', arena.RANDOM), games=2, workers=1, seed=3)
+    report = arena.summarize(results, ('Greedy', arena.RANDOM))
+    greedy, rand = report[5]['Greedy'], report[5][arena.RANDOM]
+    assert greedy['games'] == rand['games'] == 4
+    assert greedy['wins'] + rand['wins'] == 4
+    assert greedy['moves'] == sum(len(r['latency']['Greedy']) for r in results)
+    assert greedy['p50_ms'] <= greedy['p90_ms'] <= greedy['p99_ms'] <= greedy['max_ms']
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+import batch_eval
+from funcs import estimate_winning_chance
+
+pytestmark = pytest.mark.skipif(not batch_eval.available(), reason='needs numpy')
+
+
+def random_positions(size, rng, random_game, count=8):
+    for _ in range(count):
+        grid = [[0] * size for _ in range(size)]
+        for r, c, player in random_game(size, rng, rng.randrange(size * size)):
+            grid[r][c] = player
+        yield grid
+
+
+def empty_cells(grid):
+    return [(r, c) for r, row in enumerate(grid) for c, v in enumerate(row) if v == 0]
+
+
+@pytest.mark.parametrize('size', [4, 7, 11])
+def test_board_distances_match_dijkstra(size, random_game):
+    rng = random.Random(4 + size)
+    for grid in random_positions(size, rng, random_game):
+        assert batch_eval.board_distances(grid) == estimate_winning_chance(grid)
+
+
+@pytest.mark.parametrize('size', [4, 7, 11])
+@pytest.mark.parametrize('player', [1, 2])
+def test_candidates_match_placing_each_stone(size, player, random_game):
+    rng = random.Random(40 + size * player)
+    for grid in random_positions(size, rng, random_game):
+        cells = empty_cells(grid)
+        rng.shuffle(cells)
+        expected = []
+        for r, c in cells:
+            grid[r][c] = player
+            expected.append(estimate_winning_chance(grid))
+            grid[r][c] = 0
+        assert batch_eval.candidate_distances(grid, cells, player) == expected
+        fields = batch_eval.candidate_fields(grid, player)
+        assert batch_eval.candidate_distances(grid, cells, player, fields) == expected
+
+
+def test_no_candidates():
+    assert batch_eval.candidate_distances([[0] * 5 for _ in range(5)], []) == []
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import benchmark
+from engine import HexEngine
+
+
+@pytest.mark.parametrize('fill', benchmark.DEFAULT_FILLS)
+def test_positions_are_seeded_and_blue_to_move(fill):
+    positions = benchmark.generate_positions(7, fill, 4, seed=8)
+    assert positions == benchmark.generate_positions(7, fill, 4, seed=8)
+    assert positions != benchmark.generate_positions(7, fill, 4, seed=9) or fill == 0.0
+    for grid in positions:
+        green = sum(row.count(1) for row in grid)
+        blue = sum(row.count(2) for row in grid)
+        assert green - blue == (1 if green + blue else 0)
+        engine = HexEngine(7)
+        for r, row in enumerate(grid):
+            for c, v in enumerate(row):
+                if v:
+                    engine.placeStone(r, c, v)
+        assert not engine.checkWin()
+
+
+def entry(median_ms):
+    return {'median_ms': median_ms}
+
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {'a': entry(10.0), 'b': entry(10.0), 'c': entry(0.01), 'd': entry(0.0)}
+    results = {'a': entry(13.0), 'b': entry(12.0), 'c': entry(0.05), 'd': entry(1.0), 'new': entry(5.0)}
+    # b is within 25%, c is below the noise floor, new has no baseline
+    assert benchmark.compare(results, baseline, 0.25) == [
+        ('a', 10.0, 13.0, pytest.approx(1.3)),
+        ('d', 0.0, 1.0, float('inf')),
+    ]
+    assert benchmark.compare(results, baseline, 0.5) == [('d', 0.0, 1.0, float('inf'))]
+
+
+def test_run_writes_and_checks_a_baseline(tmp_path, capsys):
+    out, base = str(tmp_path / 'bench.json'), str(tmp_path / 'base.json')
+    args = ['--strategies', 'DP', 'Greedy', '--sizes', '5', '6', '--fills', '0.1',
+            '--positions', '1', '--warmup', '0', '--repeat', '2', '--out', out]
+    assert benchmark.main(args + ['--save-baseline', base]) == 0
+    with open(out) as f:
+        results = json.load(f)['results']
+    assert sorted(results) == ['DP|5|0.1', 'DP|6|0.1', 'Greedy|5|0.1', 'Greedy|6|0.1']
+    assert all(r['runs'] == 2 and r['min_ms'] <= r['median_ms'] <= r['max_ms'] for r in results.values())
+    assert benchmark.main(args + ['--baseline', base, '--threshold', '1000']) == 0
+    assert 'no regressions' in capsys.readouterr().out
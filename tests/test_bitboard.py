@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from bitboard import BitBoard
+from funcs import dijkstra_check_win
+
+NEIGHBOURS = ((-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0))
+
+
+def random_positions(size, rng, random_game, count=30):
+    for _ in range(count):
+        grid = [[0] * size for _ in range(size)]
+        for r, c, player in random_game(size, rng, rng.randrange(size * size + 1)):
+            grid[r][c] = player
+        yield grid
+
+
+def groups(grid, player):
+    '''connected groups of player as sets of cells, by breadth-first search'''
+    n = len(grid)
+    seen = set()
+    found = []
+    for r in range(n):
+        for c in range(n):
+            if grid[r][c] != player or (r, c) in seen:
+                continue
+            group, frontier = {(r, c)}, [(r, c)]
+            while frontier:
+                a, b = frontier.pop()
+                for dr, dc in NEIGHBOURS:
+                    cell = (a + dr, b + dc)
+                    if (0 <= cell[0] < n and 0 <= cell[1] < n and cell not in group
+                            and grid[cell[0]][cell[1]] == player):
+                        group.add(cell)
+                        frontier.append(cell)
+            seen |= group
+            found.append(group)
+    return found
+
+
+@pytest.mark.parametrize('size', [2, 5, 9, 14])
+def test_grid_round_trip(size, random_game):
+    rng = random.Random(size)
+    for grid in random_positions(size, rng, random_game, 5):
+        board = BitBoard.from_grid(grid)
+        assert board.to_grid() == grid
+        assert [list(row) for row in board] == grid
+        assert board == BitBoard.from_grid(board.to_grid())
+        board[0][0] = 2
+        assert board.get(0, 0) == 2 and board.green & board.blue == 0
+
+
+@pytest.mark.parametrize('size', [3, 6, 11, 17])
+def test_winner_matches_dijkstra(size, random_game):
+    rng = random.Random(100 + size)
+    for grid in random_positions(size, rng, random_game):
+        board = BitBoard.from_grid(grid)
+        for player in (1, 2):
+            assert board.has_won(player) == dijkstra_check_win(grid, player)
+        expected = 2 if dijkstra_check_win(grid, 2) else 1 if dijkstra_check_win(grid, 1) else 0
+        assert board.winner() == expected
+
+
+@pytest.mark.parametrize('size', [4, 8, 13])
+def test_components_match_a_breadth_first_search(size, random_game):
+    rng = random.Random(200 + size)
+    for grid in random_positions(size, rng, random_game):
+        board = BitBoard.from_grid(grid)
+        for player in (1, 2):
+            found = [set(board.cells(mask)) for mask in board.components(player)]
+            assert sorted(map(sorted, found)) == sorted(map(sorted, groups(grid, player)))
+
+
+@pytest.mark.parametrize('size', [4, 7, 10])
+def test_winning_cells_are_the_winning_moves(size, random_game):
+    rng = random.Random(300 + size)
+    for grid in random_positions(size, rng, random_game, 60):
+        board = BitBoard.from_grid(grid)
+        for player in (1, 2):
+            if board.has_won(player):
+                continue
+            wins = set()
+            for r, c in board.cells(board.empty()):
+                grid[r][c] = player
+                if dijkstra_check_win(grid, player):
+                    wins.add((r, c))
+                grid[r][c] = 0
+            assert set(board.cells(board.winning_cells(player))) == wins
+
+
+def test_shifts_never_wrap_onto_the_next_row():
+    size = 5
+    board = BitBoard(size)
+    board.set(1, size - 1, 2)
+    grown = set(board.cells(board.dilate(board.blue)))
+    assert grown == {(1, 4), (0, 4), (1, 3), (2, 3), (2, 4)}
+    board = BitBoard(size)
+    board.set(2, 0, 1)
+    assert set(board.cells(board.dilate(board.green))) == {(2, 0), (1, 0), (1, 1), (2, 1), (3, 0)}
@@ -0,0 +1,52 @@
+import random
+
+import pygame as pg
+
+from Game import _hexSprite
+from consts import BLUE, DARKRED, LIGHTYELLOW
+from funcs import drawHex
+
+
+def snapshot(surface, fmt='RGB'):
+    return pg.image.tobytes(surface, fmt)
+
+
+def full_redraw(g):
+    g.invalidate()
+    g.renderBoard()
+    return snapshot(g.screen)
+
+
+def test_hex_sprites_are_cached(game):
+    g = game(9)
+    assert _hexSprite(BLUE, g.tile_size) is _hexSprite(BLUE, g.tile_size)
+    assert _hexSprite(BLUE, g.tile_size) is not _hexSprite(DARKRED, g.tile_size)
+
+
+def test_sprite_matches_draw_hex(game):
+    g = game(9)
+    for r, c in ((0, 0), (4, 5), (8, 8)):
+        rect = g.cellRects()[r*g.size + c]
+        direct = pg.Surface(rect.size, pg.SRCALPHA)
+        drawHex(direct, BLUE, LIGHTYELLOW, (g.coords(r, c)[0] - rect.x, g.coords(r, c)[1] - rect.y), g.tile_size)
+        assert snapshot(direct, 'RGBA') == snapshot(_hexSprite(BLUE, g.tile_size), 'RGBA')
+
+
+def test_dirty_cells_render_like_a_full_redraw(game, random_game):
+    g = game(11)
+    g.renderBoard()
+    rng = random.Random(15)
+    for r, c, player in random_game(11, rng, moves=40):
+        g.placeStone(r, c, player)
+        g.move = 3 - player
+        g.highlight(g.coords(rng.randrange(11), rng.randrange(11)))
+        updated = g.renderBoard()
+        assert all(rect.width < 200 for rect in updated)
+        incremental = snapshot(g.screen)
+        assert incremental == full_redraw(g)
+
+
+def test_nothing_dirty_draws_nothing(game):
+    g = game(7)
+    assert g.renderBoard() == [g.screen.get_rect()]
+    assert g.renderBoard() == []
@@ -0,0 +1,81 @@
+import random
+from math import cos, pi, sin, sqrt
+
+import pytest
+
+from funcs import inHex
+
+
+def centre(g, r, c):
+    '''exact pixel centre of (r, c); coords() rounds it to integers'''
+    a = g.tile_size
+    return g.origin.x + c*3/2*a, g.origin.y + (c + 2*r)*a*sqrt(3)/2
+
+
+@pytest.mark.parametrize('size', [5, 11, 20])
+def test_centres_hit_their_own_cell(game, size):
+    g = game(size)
+    for r in range(size):
+        for c in range(size):
+            assert g.cellAt(centre(g, r, c)) == (r, c)
+            assert g.cellAt(g.coords(r, c)) == (r, c)
+
+
+@pytest.mark.parametrize('size', [5, 11, 20])
+def test_points_near_edges_and_corners_match_in_hex(game, size):
+    # just inside every edge and corner of every hexagon: the point lies
+    # in that hexagon only, so cellAt must agree with the area test
+    g = game(size)
+    a = g.tile_size
+    for r in range(size):
+        for c in range(size):
+            x, y = centre(g, r, c)
+            for k in range(12):
+                # corners at multiples of 60 degrees, edge midpoints between
+                angle = k*pi/6
+                reach = (0.99 if k % 2 == 0 else 0.99*sqrt(3)/2) * a
+                pos = (x + reach*cos(angle), y + reach*sin(angle))
+                assert inHex(pos, x, y, a)
+                assert g.cellAt(pos) == (r, c), (r, c, k)
+
+
+def test_random_points_agree_with_the_nearest_centre(game):
+    size = 11
+    g = game(size)
+    rng = random.Random(14)
+    centres = {(r, c): centre(g, r, c) for r in range(size) for c in range(size)}
+    for _ in range(3000):
+        pos = (rng.uniform(0, 600), rng.uniform(0, 600))
+        cell = min(centres, key=lambda rc: (centres[rc][0] - pos[0])**2 + (centres[rc][1] - pos[1])**2)
+        inside = inHex(pos, *centres[cell], g.tile_size)
+        # hexagons tile the plane: a point outside the nearest board hexagon
+        # lies in a hexagon off the board
+        assert g.cellAt(pos) == (cell if inside else None)
+
+
+def test_points_off_the_board_hit_nothing(game):
+    g = game(7)
+    a = g.tile_size
+    for r, c in ((-1, 0), (0, -1), (7, 3), (3, 7), (-1, 7), (7, -1)):
+        x, y = centre(g, r, c)
+        assert g.cellAt((x, y)) is None
+        assert g.cellAt((x + a/2, y)) is None
+
+
+def test_highlight_tracks_the_empty_cell_under_the_mouse(game):
+    g = game(7)
+    g.renderBoard()
+    assert g.highlight(centre(g, 2, 3)) == [(2, 3)]
+    assert g.hover == (2, 3)
+    assert g.dirty == {(2, 3)}
+    # moving inside the same hexagon changes nothing
+    assert g.highlight(g.coords(2, 3)) == []
+    g.renderBoard()
+    # onto a stone: the old hover cell is redrawn, nothing is highlighted
+    g.placeStone(4, 4, 1)
+    g.dirty.clear()
+    assert g.highlight(centre(g, 4, 4)) == [(2, 3)]
+    assert g.hover is None
+    assert g.dirty == {(2, 3)}
+    # hover state never reaches the board
+    assert all(v in (0, 1) for row in g.state for v in row)
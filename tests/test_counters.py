@@ -0,0 +1,44 @@
+import pytest
+
+import counters
+from engine import HexEngine
+
+
+def instrumented_engine(ai_mode):
+    engine = HexEngine(7)
+    engine.use_book = False
+    engine.endgame_threshold = 0
+    engine.instrument = True
+    engine.ai_mode = ai_mode
+    engine.placeStone(3, 3, 1)
+    engine.move = 2
+    return engine
+
+
+@pytest.mark.parametrize('ai_mode', ['Greedy', 'D&C', 'DP', 'Backtracking'])
+def test_counting_is_off_after_a_move(ai_mode):
+    engine = instrumented_engine(ai_mode)
+    engine.cpuMove()
+    assert not counters.ENABLED
+    assert any(engine.last_move_counts.values())
+
+
+def test_counting_is_off_after_a_strategy_raises():
+    engine = instrumented_engine('MCTS')
+    engine.mcts_budget_ms = None
+    engine.mcts_playouts = None
+    with pytest.raises(ValueError):
+        engine.cpuMove()
+    assert not counters.ENABLED
+    # the next move starts from zero, not from the failed move's counts
+    engine.ai_mode = 'Greedy'
+    engine.cpuMove()
+    assert engine.last_move_counts['candidates_evaluated'] == 48
+
+
+def test_counts_stay_zero_when_not_instrumented():
+    engine = instrumented_engine('Greedy')
+    engine.instrument = False
+    engine.cpuMove()
+    assert not counters.ENABLED
+    assert engine.last_move_counts is None
@@ -0,0 +1,90 @@
+import cpu_worker
+from engine import HexEngine
+
+
+def test_catch_up_places_only_new_stones():
+    engine = HexEngine(5)
+    engine.placeStone(2, 2, 1)
+    grid = [row[:] for row in engine.state]
+    grid[1][3] = 2
+    grid[4][0] = 1
+    assert cpu_worker._catch_up(engine, grid)
+    assert engine.state == grid
+    assert engine.win_detector.owner[1 * 5 + 3] == 2
+
+
+def test_catch_up_refuses_a_board_that_lost_stones():
+    engine = HexEngine(5)
+    engine.placeStone(2, 2, 1)
+    engine.placeStone(0, 0, 2)
+    grid = [[0] * 5 for _ in range(5)]
+    grid[2][2] = 1
+    grid[3][3] = 1
+    before = [row[:] for row in engine.state]
+    assert not cpu_worker._catch_up(engine, grid)
+    # nothing was placed
+    assert engine.state == before
+
+
+def test_catch_up_matches_a_replayed_engine():
+    engine = HexEngine(6)
+    grid = [[0] * 6 for _ in range(6)]
+    moves = [(0, 1, 1), (3, 3, 2), (1, 1, 1), (2, 4, 2), (5, 0, 1)]
+    for k, (r, c, player) in enumerate(moves):
+        grid[r][c] = player
+        if k % 2:
+            assert cpu_worker._catch_up(engine, grid)
+    assert cpu_worker._catch_up(engine, grid)
+    replayed = HexEngine(6)
+    for r, c, player in moves:
+        replayed.placeStone(r, c, player)
+    assert engine.hash == replayed.hash
+    assert engine.column_hashes == replayed.column_hashes
+    assert engine.estimateWinningDistance() == replayed.estimateWinningDistance()
+    assert engine.checkWin() == replayed.checkWin()
+
+
+def test_cpu_move_without_search_plays_only_forced_moves():
+    engine = HexEngine(5)
+    engine.use_book = False
+    engine.placeStone(0, 0, 1)
+    engine.move = 2
+    assert not engine.cpuMove(search=False)
+    assert engine.move == 2 and sum(row.count(0) for row in engine.state) == 24
+    # Blue needs only (2, 2), which the endgame solver proves
+    for c in (0, 1, 3, 4):
+        engine.placeStone(2, c, 2)
+    for r, c in ((1, 2), (3, 2), (4, 4), (0, 4)):
+        engine.placeStone(r, c, 1)
+    engine.endgame_threshold = 25
+    assert engine.cpuMove(search=False)
+    assert engine.last_move == (2, 2)
+
+
+def test_stop_ends_the_incremental_greedy_scan():
+    engine = HexEngine(7)
+    cells = [(r, c) for r in range(7) for c in range(7)]
+    seen = []
+    engine.stop = lambda: len(seen) >= 5
+    for distances in engine._incrementalCandidateDistances(cells):
+        seen.append(distances)
+    assert len(seen) == 5
+
+
+def test_fan_out_returns_a_prefix_once_stopped(monkeypatch):
+    import parallel_eval
+
+    class InlinePool:
+        def imap(self, func, items):
+            return map(func, items)
+
+    monkeypatch.setattr(parallel_eval, '_get_pool', lambda: InlinePool())
+    monkeypatch.setattr(parallel_eval, 'workers', lambda: 4)
+    grid = [[0] * 11 for _ in range(11)]
+    cells = [(r, c) for r in range(11) for c in range(11)]
+    whole = parallel_eval.greedy_distances(grid, cells)
+    assert len(whole) == len(cells)
+    part = parallel_eval._fan_out(parallel_eval._greedy_task, grid, cells, None, stop=lambda: True)
+    assert 0 < len(part) < len(cells)
+    assert part == whole[:len(part)]
+    parallel_eval.shutdown()
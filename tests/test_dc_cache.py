@@ -0,0 +1,14 @@
+def test_dc_cache_drops_entries_over_changed_columns(new_engine):
+    engine = new_engine(12, 'D&C')
+    engine.play(5, 5)
+    engine.cpuMove()
+    cache = engine.dc_cache
+    before = dict(cache.entries)
+    blue_column = engine.last_move[1]
+    engine.play(0, 11)
+    changed = cache.sync(engine.column_hashes)
+    # Blue's reply came after the last sync, Green's stone after that
+    assert changed == sorted({blue_column, 11})
+    for key in before:
+        lo, hi = cache._span(key[2], key[3])
+        assert (key in cache.entries) == (not any(lo <= c <= hi for c in changed))
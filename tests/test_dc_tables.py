@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from dc_cache import SubproblemCache
+
+
+def tables(engine):
+    engine.dc_cache = SubproblemCache(engine.size)
+    engine._dcTables()
+    return engine
+
+
+@pytest.mark.parametrize('size', [5, 9, 13])
+def test_summed_area_table_counts_every_rectangle(size, new_engine, random_game):
+    rng = random.Random(23 + size)
+    engine = new_engine(size, 'D&C')
+    for r, c, player in random_game(size, rng, size * size * 2 // 3):
+        engine.placeStone(r, c, player)
+    tables(engine)
+    for top in range(size):
+        for bottom in range(top, size):
+            for left in range(size):
+                for right in range(left, size):
+                    count = sum(engine.state[r][c] == 2
+                                for r in range(top, bottom + 1)
+                                for c in range(left, right + 1))
+                    assert engine._dcStones(top, bottom, left, right) == count
+
+
+def test_tables_follow_the_board(new_engine):
+    engine = tables(new_engine(7, 'D&C'))
+    assert engine._dcStones(0, 6, 0, 6) == 0
+    engine.placeStone(3, 4, 2)
+    engine.placeStone(0, 0, 1)
+    tables(engine)
+    assert engine._dcStones(0, 6, 0, 6) == 1
+    assert engine._dcStones(3, 3, 4, 4) == 1
+    assert engine._dcStones(0, 2, 0, 6) == 0
+    assert engine._dcStones(0, 6, 0, 3) == 0
+
+
+@pytest.mark.parametrize('size', [6, 11])
+def test_best_cell_of_a_region_matches_a_scan(size, new_engine, random_game):
+    rng = random.Random(230 + size)
+    engine = new_engine(size, 'D&C')
+    for r, c, player in random_game(size, rng, size * size // 2):
+        engine.placeStone(r, c, player)
+    tables(engine)
+    scores = engine._dc_scores
+    for _ in range(200):
+        top, bottom = sorted(rng.randrange(size) for _ in range(2))
+        left, right = sorted(rng.randrange(size) for _ in range(2))
+        cells = [(r, c) for r in range(top, bottom + 1) for c in range(left, right + 1)]
+        # max keeps the first of equal scores, in row-major order
+        r, c = max(cells, key=lambda rc: scores[rc[0] * size + rc[1]])
+        best = scores[r * size + c]
+        if best == float('-inf'):
+            # only stones in the region
+            r = c = None
+        assert engine._dcBest(top, bottom, left, right) == (r, c, best)
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from distance_engine import DistanceEngine
+from funcs import estimate_winning_chance
+
+
+@pytest.mark.parametrize('size', [2, 5, 8, 11])
+def test_place_matches_full_dijkstra(size, random_game):
+    rng = random.Random(size)
+    for _ in range(5):
+        grid = [[0] * size for _ in range(size)]
+        engine = DistanceEngine(grid)
+        for r, c, player in random_game(size, rng, size * size):
+            engine.place(r, c, player)
+            grid[r][c] = player
+            assert engine.distances() == estimate_winning_chance(grid)
+
+
+@pytest.mark.parametrize('size', [5, 9])
+def test_undo_restores_the_fields(size, random_game):
+    rng = random.Random(10 + size)
+    grid = [[0] * size for _ in range(size)]
+    engine = DistanceEngine(grid)
+    snapshots = []
+    moves = random_game(size, rng, size * size // 2)
+    for r, c, player in moves:
+        snapshots.append([field.dist[:] for field in engine.fields])
+        engine.place(r, c, player)
+    for snapshot in reversed(snapshots):
+        engine.undo()
+        assert [field.dist for field in engine.fields] == snapshot
+    assert engine.distances() == (size, size)
+
+
+def test_candidate_probing_leaves_the_engine_unchanged(random_game):
+    # the greedy strategy's place/undo loop over every empty cell
+    rng = random.Random(3)
+    size = 7
+    grid = [[0] * size for _ in range(size)]
+    for r, c, player in random_game(size, rng, 20):
+        grid[r][c] = player
+    engine = DistanceEngine(grid)
+    before = engine.distances()
+    for r in range(size):
+        for c in range(size):
+            if grid[r][c] == 0:
+                engine.place(r, c, 2)
+                grid[r][c] = 2
+                assert engine.distances() == estimate_winning_chance(grid)
+                engine.undo()
+                grid[r][c] = 0
+    assert engine.distances() == before == estimate_winning_chance(grid)
+
+
+def test_blocked_player_is_infinitely_far():
+    size = 3
+    grid = [[0] * size for _ in range(size)]
+    engine = DistanceEngine(grid)
+    # a full Blue row cuts Green off from the bottom
+    for c in range(size):
+        engine.place(1, c, 2)
+    assert engine.distances() == (float('inf'), 0)
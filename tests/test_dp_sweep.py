@@ -0,0 +1,77 @@
+import heapq
+import random
+
+import pytest
+
+import batch_eval
+from engine import DP_PREDECESSORS, DP_SUCCESSORS, HexEngine
+
+pytestmark = pytest.mark.skipif(not batch_eval.available(), reason='needs numpy')
+
+
+def shortest_paths(grid, edge, steps):
+    '''
+    Dijkstra reference for a DP table: cost of the cheapest path of Blue
+    from the column `edge` to each cell, moving by `steps`, both ends paid
+    '''
+    n = len(grid)
+    cost = [[0 if v == 2 else 1 if v == 0 else None for v in row] for row in grid]
+    dist = [[batch_eval.BIG] * n for _ in range(n)]
+    heap = []
+    for r in range(n):
+        if cost[r][edge] is not None:
+            dist[r][edge] = cost[r][edge]
+            heap.append((dist[r][edge], r, edge))
+    heapq.heapify(heap)
+    while heap:
+        d, r, c = heapq.heappop(heap)
+        if d > dist[r][c]:
+            continue
+        for dr, dc in steps:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < n and 0 <= nc < n and cost[nr][nc] is not None:
+                if d + cost[nr][nc] < dist[nr][nc]:
+                    dist[nr][nc] = d + cost[nr][nc]
+                    heapq.heappush(heap, (dist[nr][nc], nr, nc))
+    return dist
+
+
+def positions(size, rng, random_game, count=12):
+    for _ in range(count):
+        grid = [[0] * size for _ in range(size)]
+        for r, c, player in random_game(size, rng, rng.randrange(size * size)):
+            grid[r][c] = player
+        yield grid
+
+
+@pytest.mark.parametrize('size', [5, 8, 11, 16])
+def test_column_sweeps_find_the_shortest_paths(size, random_game):
+    rng = random.Random(22 + size)
+    # dp_left follows the predecessor offsets backwards, dp_right the successors
+    forward = [(-dr, -dc) for dr, dc in DP_PREDECESSORS]
+    backward = [(-dr, -dc) for dr, dc in DP_SUCCESSORS]
+    for grid in positions(size, rng, random_game):
+        left, right = batch_eval.dp_tables(grid)
+        assert left.tolist() == shortest_paths(grid, 0, forward)
+        assert right.tolist() == shortest_paths(grid, size - 1, backward)
+
+
+@pytest.mark.parametrize('size', [5, 8, 11, 16])
+def test_dp_choice_matches_plain_python(size, random_game):
+    rng = random.Random(220 + size)
+    for grid in positions(size, rng, random_game):
+        engine = HexEngine(size)
+        for r, row in enumerate(grid):
+            for c, v in enumerate(row):
+                if v:
+                    engine.placeStone(r, c, v)
+        assert batch_eval.dp_choice(grid) == engine._dpChoice()
+
+
+def test_no_choice_behind_a_green_wall():
+    size = 6
+    engine = HexEngine(size)
+    for r in range(size):
+        engine.placeStone(r, 2, 1)
+    assert engine._dpChoice() is None
+    assert batch_eval.dp_choice(engine.state) is None
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from engine import HexEngine
+import batch_eval
+
+numpy_only = pytest.mark.skipif(not batch_eval.available(), reason='needs numpy')
+
+
+@numpy_only
+@pytest.mark.parametrize('size', [5, 8, 11, 14])
+def test_dp_tables_update_matches_a_rebuild(size, random_game):
+    rng = random.Random(size)
+    tables = batch_eval.DPTables()
+    grid = [[0] * size for _ in range(size)]
+    for r, c, player in random_game(size, rng, size * size):
+        grid[r][c] = player
+        dp = tables.update(batch_eval.np.array(grid, dtype=batch_eval.np.int8))
+        left, right = batch_eval.dp_tables(grid)
+        assert (dp[0].T == left).all()
+        assert (dp[1].T[:, ::-1] == right).all()
+    assert tables.stats()['updates'] == size * size
+
+
+@numpy_only
+@pytest.mark.parametrize('size', [6, 9, 13])
+def test_dp_choice_with_kept_tables_matches_plain_python(size, random_game):
+    rng = random.Random(20 + size)
+    engine = HexEngine(size)
+    tables = batch_eval.DPTables()
+    for r, c, player in random_game(size, rng, size * size - 1):
+        engine.placeStone(r, c, player)
+        assert batch_eval.dp_choice(engine.state, tables) == engine._dpChoice()
+        assert batch_eval.dp_choice(engine.state) == engine._dpChoice()
@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from bitboard import BitBoard
+import endgame
+from engine import HexEngine
+
+
+def brute_force_wins(board, player):
+    '''True if player, to move, wins by plain minimax over every empty cell'''
+    winner = board.winner()
+    if winner:
+        return winner == player
+    for r, c in board.cells(board.empty()):
+        board.set(r, c, player)
+        opponent_wins = brute_force_wins(board, 3 - player)
+        board.set(r, c, 0)
+        if not opponent_wins:
+            return True
+    return False
+
+
+@pytest.mark.parametrize('size,empty', [(3, 4), (3, 6), (4, 5), (4, 7), (4, 9)])
+def test_solver_agrees_with_brute_force(size, empty):
+    rng = random.Random(size * 100 + empty)
+    for _ in range(15):
+        board = endgame.random_position(size, empty, rng)
+        won, move = endgame.EndgameSolver(size, budget_ms=None).solve(board, 2)
+        assert won == brute_force_wins(board, 2)
+        if won:
+            # the proven move must be legal and really win
+            assert board.get(*move) == 0
+            board.set(move[0], move[1], 2)
+            assert not brute_force_wins(board, 1)
+
+
+def test_solver_takes_an_immediate_win():
+    board = BitBoard(5)
+    for c in (0, 1, 3, 4):
+        board.set(2, c, 2)
+    for r, c in ((0, 0), (1, 2), (3, 2), (4, 4), (0, 4)):
+        board.set(r, c, 1)
+    assert endgame.EndgameSolver(5).solve(board, 2) == (True, (2, 2))
+
+
+def test_cached_solver_gives_the_same_answers():
+    rng = random.Random(5)
+    cache = {}
+    for _ in range(10):
+        board = endgame.random_position(5, 8, rng)
+        cold = endgame.EndgameSolver(5, budget_ms=None).solve(board, 2)
+        warm = endgame.EndgameSolver(5, budget_ms=None, cache=cache).solve(board, 2)
+        assert cold[0] == warm[0]
+    assert cache
+
+
+def test_stop_ends_the_search_like_a_timeout():
+    rng = random.Random(1)
+    board = endgame.random_position(9, 30, rng)
+    solver = endgame.EndgameSolver(9, budget_ms=None, stop=lambda: True)
+    result = solver.solve(board, 2)
+    # positions this large take far more than one clock check to solve
+    assert result == (None, None)
+
+
+def test_random_position_rejects_the_wrong_parity():
+    with pytest.raises(ValueError):
+        endgame.random_position(5, 9, random.Random(0))
+
+
+def test_threshold_follows_size_and_budget():
+    for budget, table in endgame.THRESHOLDS.items():
+        for size, value in table.items():
+            assert endgame.threshold(size, budget) == value
+    smallest = min(endgame.THRESHOLDS)
+    assert endgame.threshold(11, smallest - 1) == 0
+    # a budget between two measured ones uses the smaller
+    assert endgame.threshold(11, 300) == endgame.THRESHOLDS[250][11]
+    # sizes outside the table use the nearest measured one
+    largest = max(endgame.THRESHOLDS[250])
+    assert endgame.threshold(largest + 5) == endgame.THRESHOLDS[250][largest]
+
+
+def test_thresholds_are_monotone():
+    budgets = sorted(endgame.THRESHOLDS)
+    for budget in budgets:
+        row = endgame.THRESHOLDS[budget]
+        sizes = sorted(row)
+        # a larger board never gets more empty cells in the same budget
+        assert all(row[a] >= row[b] for a, b in zip(sizes, sizes[1:]))
+    for smaller, larger in zip(budgets, budgets[1:]):
+        # a larger budget never gets fewer
+        assert all(endgame.THRESHOLDS[larger][size] >= endgame.THRESHOLDS[smaller][size]
+                   for size in endgame.THRESHOLDS[smaller])
+    assert endgame.monotone(endgame.THRESHOLDS) == endgame.THRESHOLDS
+
+
+def test_monotone_caps_larger_boards_and_lifts_larger_budgets():
+    measured = {100: {5: 10, 6: 12, 7: 8}, 250: {5: 9, 6: 14, 7: 11}}
+    assert endgame.monotone(measured) == {100: {5: 10, 6: 10, 7: 8}, 250: {5: 10, 6: 10, 7: 9}}
+
+
+def test_engine_plays_the_proven_win():
+    engine = HexEngine(5)
+    engine.use_book = False
+    engine.instrument = True
+    # Blue needs only (2, 2); every other cell is filled or left for Green
+    for c in (0, 1, 3, 4):
+        engine.placeStone(2, c, 2)
+    for r, c in ((0, 0), (1, 2), (3, 2), (4, 4), (0, 4)):
+        engine.placeStone(r, c, 1)
+    engine.endgame_threshold = 25
+    engine.move = 2
+    engine.cpuMove()
+    assert engine.last_move == (2, 2)
+    assert engine.checkWin() == 2
+    assert engine.last_move_counts['endgame_solves'] == 1
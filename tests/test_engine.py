@@ -0,0 +1,56 @@
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from consts import STRATEGIES
+from engine import HexEngine
+from funcs import estimate_winning_chance
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize('module', ['engine', 'cpu_worker', 'arena', 'benchmark', 'book_builder'])
+def test_headless_modules_do_not_load_pygame(module):
+    code = 'import sys, {}; sys.exit("pygame" in sys.modules)'.format(module)
+    assert subprocess.run([sys.executable, '-c', code], cwd=ROOT).returncode == 0
+
+
+def test_play_alternates_and_tracks_the_board():
+    engine = HexEngine(5)
+    assert len(engine.legalMoves()) == 25
+    engine.play(2, 2)
+    engine.play(1, 3)
+    assert engine.state[2][2] == 1 and engine.state[1][3] == 2
+    assert engine.move == 1
+    assert engine.last_move == (1, 3)
+    assert not engine.isLegal(2, 2) and not engine.isLegal(5, 0) and engine.isLegal(0, 0)
+    assert (2, 2) not in engine.legalMoves() and len(engine.legalMoves()) == 23
+
+
+def test_distances_follow_the_board(random_game):
+    rng = random.Random(6)
+    engine = HexEngine(7)
+    for r, c, player in random_game(7, rng):
+        engine.placeStone(r, c, player)
+        assert engine.estimateWinningDistance() == estimate_winning_chance(engine.state)
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+def test_every_strategy_finishes_a_game_without_a_display(strategy, new_engine):
+    rng = random.Random(strategy)
+    engine = new_engine(5, strategy)
+    engine.ab_budget_ms = 20
+    engine.mcts_budget_ms = 20
+    while not engine.checkWin():
+        engine.play(*rng.choice(engine.legalMoves()))
+        if engine.checkWin():
+            break
+        empty = len(engine.legalMoves())
+        assert engine.cpuMove()
+        assert engine.move == 1
+        assert len(engine.legalMoves()) == empty - 1
+    assert engine.checkWin() in (1, 2)
+    assert engine.session_times[strategy]
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+import batch_eval
+
+numpy_only = pytest.mark.skipif(not batch_eval.available(), reason='needs numpy')
+
+# strategy, the engine attribute it keeps between moves, and a check that it was reused
+KEPT_STATE = [
+    ('D&C', 'dc_cache', lambda stats: stats['hits'] > 0),
+    pytest.param('DP', 'dp_tables', lambda stats: stats['rebuilds'] < stats['updates'],
+                 marks=numpy_only),
+]
+
+
+@pytest.mark.parametrize('ai_mode,attr,reused', KEPT_STATE)
+@pytest.mark.parametrize('size', [7, 12, 20])
+def test_state_kept_across_a_game_matches_fresh_engines(new_engine, ai_mode, attr, reused, size):
+    def fresh_move(state):
+        '''the move of a new engine, so without state from earlier moves'''
+        fresh = new_engine(len(state), ai_mode)
+        for r, row in enumerate(state):
+            for c, v in enumerate(row):
+                if v:
+                    fresh.placeStone(r, c, v)
+        fresh.move = 2
+        fresh.cpuMove()
+        return fresh.last_move
+
+    rng = random.Random(size)
+    engine = new_engine(size, ai_mode)
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    while not engine.checkWin():
+        empty = [cell for cell in cells if engine.state[cell[0]][cell[1]] == 0]
+        if len(empty) < 2:
+            break
+        engine.play(*rng.choice(empty))
+        if engine.checkWin():
+            break
+        expected = fresh_move(engine.state)
+        engine.cpuMove()
+        assert engine.last_move == expected
+    assert reused(getattr(engine, attr).stats())
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from bitboard import BitBoard
+import mcts
+
+
+def test_search_needs_a_limit():
+    with pytest.raises(ValueError):
+        mcts.MonteCarloSearch([[0] * 5 for _ in range(5)], budget_ms=None, max_playouts=None)
+
+
+def test_playout_limit_is_respected():
+    search = mcts.MonteCarloSearch([[0] * 5 for _ in range(5)], budget_ms=None,
+                                   max_playouts=200, seed=1)
+    r, c = search.search(2)
+    assert 0 <= r < 5 and 0 <= c < 5
+    assert search.stats()['playouts'] == 200
+
+
+@pytest.mark.parametrize('size', [3, 6, 9])
+def test_connectivity_check_matches_bitboard(size):
+    rng = random.Random(size)
+    search = mcts.MonteCarloSearch([[0] * size for _ in range(size)], max_playouts=1)
+    for _ in range(50):
+        cells = list(range(size * size))
+        rng.shuffle(cells)
+        board = BitBoard(size)
+        for k, i in enumerate(cells):
+            search.work[i] = 1 if k % 2 == 0 else 2
+            board.set(i // size, i % size, search.work[i])
+        assert search._blue_connects() == (board.winner() == 2)
+
+
+def test_stop_ends_the_search():
+    search = mcts.MonteCarloSearch([[0] * 7 for _ in range(7)], budget_ms=None,
+                                   max_playouts=10 ** 9, stop=lambda: True)
+    assert search.search(2) is not None
+    assert search.stats()['playouts'] == 1
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+import opening_book
+from engine import HexEngine
+
+
+def rotated(size, stones):
+    return [(size - 1 - r, size - 1 - c, player) for r, c, player in stones]
+
+
+def engine_with(size, stones, book=None):
+    engine = HexEngine(size)
+    if book is not None:
+        engine.book = book
+    for r, c, player in stones:
+        engine.placeStone(r, c, player)
+    return engine
+
+
+def test_rotated_positions_share_their_hashes(random_game):
+    rng = random.Random(20)
+    for size in (5, 8, 11):
+        stones = random_game(size, rng, moves=7)
+        a = engine_with(size, stones)
+        b = engine_with(size, rotated(size, stones))
+        assert (a.hash, a.hash180) == (b.hash180, b.hash)
+
+
+def test_lookup_is_symmetric_under_rotation(tmp_path, random_game):
+    size = 7
+    rng = random.Random(20)
+    positions = []
+    entries = {}
+    for _ in range(50):
+        stones = random_game(size, rng, moves=rng.randrange(1, 8))
+        engine = engine_with(size, stones)
+        taken = {(r, c) for r, c, _ in stones}
+        reply = rng.choice([(r, c) for r in range(size) for c in range(size) if (r, c) not in taken])
+        flat = reply[0] * size + reply[1]
+        # the stored move is in the orientation of the smaller hash
+        if engine.hash <= engine.hash180:
+            entries[engine.hash] = flat
+        else:
+            entries[engine.hash180] = opening_book.rotate(size, flat)
+        positions.append((stones, reply))
+    path = str(tmp_path / 'hex_7.book')
+    opening_book.write_book(path, size, entries)
+    book = opening_book.OpeningBook(path)
+    try:
+        assert len(book) == len(entries)
+        for stones, (r, c) in positions:
+            assert engine_with(size, stones, book).bookMove() == (r, c)
+            turned = engine_with(size, rotated(size, stones), book)
+            assert turned.bookMove() == (size - 1 - r, size - 1 - c)
+    finally:
+        book.close()
+
+
+@pytest.mark.parametrize('size', [5, 7, 11])
+def test_shipped_books_answer_rotated_openings_alike(size):
+    if opening_book.book(size) is None:
+        pytest.skip('no book for this size')
+    answered = 0
+    for r in range(size):
+        for c in range(size):
+            if (r, c) == (size - 1 - r, size - 1 - c):
+                # the centre is its own rotation, so either reply is right
+                continue
+            move = engine_with(size, [(r, c, 1)]).bookMove()
+            turned = engine_with(size, [(size - 1 - r, size - 1 - c, 1)]).bookMove()
+            if move is None:
+                assert turned is None
+                continue
+            answered += 1
+            assert turned == (size - 1 - move[0], size - 1 - move[1])
+    assert answered
+
+
+def test_positions_outside_the_book_are_not_answered(tmp_path):
+    path = str(tmp_path / 'hex_5.book')
+    opening_book.write_book(path, 5, {})
+    book = opening_book.OpeningBook(path)
+    try:
+        assert engine_with(5, [(2, 2, 1)], book).bookMove() is None
+    finally:
+        book.close()
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+import batch_eval
+import parallel_eval
+
+
+class InlinePool:
+    '''runs the pool's tasks in this process, through the same shared block'''
+    def imap(self, func, items):
+        return map(func, items)
+
+
+@pytest.fixture
+def inline_pool(monkeypatch):
+    monkeypatch.setattr(parallel_eval, '_get_pool', lambda: InlinePool())
+    monkeypatch.setattr(parallel_eval, 'workers', lambda: 4)
+    yield
+    parallel_eval.shutdown()
+
+
+@pytest.mark.skipif(not batch_eval.available(), reason='needs numpy')
+@pytest.mark.parametrize('size', [11, 14])
+def test_greedy_chunks_with_shared_fields_match_one_batch(inline_pool, random_game, size):
+    rng = random.Random(size)
+    for _ in range(5):
+        grid = [[0] * size for _ in range(size)]
+        for r, c, player in random_game(size, rng, rng.randrange(size * size // 2)):
+            grid[r][c] = player
+        cells = [(r, c) for r in range(size) for c in range(size) if grid[r][c] == 0]
+        assert parallel_eval.greedy_distances(grid, cells) == batch_eval.candidate_distances(grid, cells)
+
+
+def test_shared_block_round_trips_the_board(inline_pool):
+    grid = [[(r + c) % 3 for c in range(7)] for r in range(7)]
+    name = parallel_eval._share_board(grid)
+    assert parallel_eval._read_board(name, 7) == grid
@@ -0,0 +1,49 @@
+import os
+
+import perf_log
+
+
+def test_compaction_keeps_every_session_in_max_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(perf_log, 'MAX_BYTES', 500)
+    monkeypatch.setattr(perf_log, 'MAX_SEGMENTS', 3)
+    log_file = str(tmp_path / 'log.ndjson')
+    writer = perf_log._Writer(log_file)
+    for i in range(300):
+        writer.write([{'strategy': 'DP' if i % 3 else 'MCTS', 'avg_execution_time': 0.001 * i,
+                       'moves_count': 10, 'board_size': 11, 'i': i}])
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        'log.ndjson', 'log.ndjson.1', 'log.ndjson.2', 'log.ndjson.3']
+    for name in perf_log.segments(log_file):
+        assert os.path.getsize(name) <= 500 + 200
+    entries = list(perf_log.read_entries(log_file))
+    # the oldest sessions were merged, not dropped
+    assert sum(perf_log.sessions(e) for e in entries) == 300
+    assert perf_log.sessions(entries[0]) > 1
+    assert sum(e['moves_count'] for e in entries) == 3000
+    for strategy in ('DP', 'MCTS'):
+        own = [e for e in entries if e['strategy'] == strategy]
+        expected = sum(0.001 * i for i in range(300) if (strategy == 'DP') == bool(i % 3))
+        total = sum(e['avg_execution_time'] * perf_log.sessions(e) for e in own)
+        assert abs(total - expected) < 1e-3
+    # the newest sessions stay as they were logged, in order
+    assert [e['i'] for e in entries[-5:]] == list(range(295, 300))
+
+
+def test_read_entries_falls_back_to_the_given_legacy_file(tmp_path):
+    legacy = tmp_path / 'legacy.json'
+    legacy.write_text('[{"strategy": "DP", "avg_execution_time": 0.5}]')
+    log_file = str(tmp_path / 'log.ndjson')
+    entries = list(perf_log.read_entries(log_file, legacy_file=str(legacy)))
+    assert entries == [{'strategy': 'DP', 'avg_execution_time': 0.5}]
+    # readers leave the migration to the writer
+    assert not os.path.exists(log_file)
+    assert list(perf_log.read_entries(log_file, legacy_file=str(tmp_path / 'none.json'))) == []
+
+
+def test_torn_lines_are_skipped(tmp_path):
+    log_file = str(tmp_path / 'log.ndjson')
+    with open(log_file, 'w') as f:
+        f.write('{"strategy":"DP","avg_execution_time":1}\n{"strat')
+    writer = perf_log._Writer(log_file)
+    writer.write([{'strategy': 'MCTS', 'avg_execution_time': 2}])
+    assert [e['strategy'] for e in perf_log.read_entries(log_file)] == ['DP', 'MCTS']
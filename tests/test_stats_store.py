@@ -0,0 +1,121 @@
+import random
+
+import pytest
+
+import perf_log
+import stats_store
+from consts import STRATEGIES
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    # no legacy log from the working directory
+    monkeypatch.setattr(perf_log, 'LEGACY_FILE', str(tmp_path / 'legacy.json'))
+    return str(tmp_path / 'log.ndjson')
+
+
+def sessions(rng, count):
+    return [{'strategy': rng.choice(STRATEGIES), 'avg_execution_time': rng.lognormvariate(-5, 2),
+             'moves_count': 10, 'board_size': 11} for _ in range(count)]
+
+
+@pytest.mark.parametrize('accuracy', [0.01, 0.05])
+def test_sketch_quantiles_are_within_accuracy(accuracy):
+    rng = random.Random(18)
+    values = [rng.lognormvariate(-5, 2) for _ in range(5000)]
+    sketch = stats_store.QuantileSketch(accuracy)
+    for x in values:
+        sketch.add(x)
+    values.sort()
+    for q in (0.0, 0.1, 0.5, 0.9, 0.95, 0.99, 1.0):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= accuracy * exact * (1 + 1e-9)
+
+
+def test_merged_sketches_equal_one_sketch_of_everything():
+    rng = random.Random(180)
+    whole, left, right = (stats_store.QuantileSketch() for _ in range(3))
+    for i in range(1000):
+        x = rng.expovariate(100) if i % 10 else 0.0
+        whole.add(x)
+        (left if i % 2 else right).add(x)
+    left.merge(right)
+    assert (left.buckets, left.zeros, left.count) == (whole.buckets, whole.zeros, whole.count)
+    with pytest.raises(ValueError):
+        left.merge(stats_store.QuantileSketch(0.05))
+
+
+def test_histogram_bins():
+    histogram = stats_store.Histogram()
+    for x in (0.0, 5e-6, 1e-5, 0.5, 1.0, 250.0):
+        histogram.add(x)
+    histogram.add(0.002, n=3)
+    assert histogram.counts == [2, 1, 0, 3, 0, 1, 1, 0, 1]
+
+
+def test_incremental_refresh_matches_a_rebuild(log_file, monkeypatch):
+    # small segments, so the live store follows rotations
+    monkeypatch.setattr(perf_log, 'MAX_BYTES', 2000)
+    monkeypatch.setattr(perf_log, 'MAX_SEGMENTS', 100)
+    rng = random.Random(1800)
+    writer = perf_log._Writer(log_file)
+    live = stats_store.StatsStore(log_file)
+    assert live.refresh()
+    for _ in range(40):
+        writer.write(sessions(rng, rng.randrange(1, 12)))
+        assert live.refresh()
+        assert not live.refresh()
+        fresh = stats_store.StatsStore(log_file)
+        fresh.refresh()
+        assert live.summaries() == fresh.summaries()
+    assert len(perf_log.segments(log_file)) > 3
+
+
+def test_live_store_stays_exact_through_compaction(log_file, monkeypatch):
+    monkeypatch.setattr(perf_log, 'MAX_BYTES', 2000)
+    monkeypatch.setattr(perf_log, 'MAX_SEGMENTS', 2)
+    rng = random.Random(1801)
+    writer = perf_log._Writer(log_file)
+    live = stats_store.StatsStore(log_file)
+    live.refresh()
+    expected = {s: stats_store.StrategyStats() for s in STRATEGIES}
+    for _ in range(40):
+        batch = sessions(rng, rng.randrange(1, 12))
+        writer.write(batch)
+        for entry in batch:
+            expected[entry['strategy']].add(entry['avg_execution_time'])
+        live.refresh()
+        assert live.summaries() == {s: st.summary() for s, st in expected.items()}
+    # a rebuild reads the compacted entries: same sessions and means (merged
+    # averages are rounded to the microsecond, like logged ones), coarser spread
+    fresh = stats_store.StatsStore(log_file)
+    fresh.refresh()
+    for s, summary in fresh.summaries().items():
+        assert summary['count'] == expected[s].count
+        if summary['count']:
+            assert summary['mean'] == pytest.approx(expected[s].total / expected[s].count, abs=1e-6)
+
+
+def test_summaries_track_count_mean_and_extremes(log_file):
+    writer = perf_log._Writer(log_file)
+    writer.write([{'strategy': 'DP', 'avg_execution_time': t} for t in (0.3, 0.1, 0.2)])
+    writer.write([{'strategy': 'DP', 'avg_execution_time': 0.4, 'sessions': 2},
+                  {'strategy': 'Unknown', 'avg_execution_time': 9.0}])
+    store = stats_store.StatsStore(log_file)
+    store.refresh()
+    dp = store.summaries()['DP']
+    assert (dp['count'], dp['last'], dp['best'], dp['worst']) == (5, 0.4, 0.1, 0.4)
+    assert dp['mean'] == pytest.approx(1.4 / 5)
+    assert store.summaries()['MCTS']['count'] == 0
+
+
+def test_truncated_log_is_read_again(log_file):
+    writer = perf_log._Writer(log_file)
+    writer.write([{'strategy': 'DP', 'avg_execution_time': 0.1}] * 5)
+    store = stats_store.StatsStore(log_file)
+    store.refresh()
+    with open(log_file, 'w') as f:
+        f.write('{"strategy": "DP", "avg_execution_time": 0.7}\n')
+    assert store.refresh()
+    assert store.summaries()['DP']['count'] == 1
+    assert store.summaries()['DP']['last'] == 0.7
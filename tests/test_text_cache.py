@@ -0,0 +1,55 @@
+import pygame as pg
+import pytest
+
+import funcs
+from Button import Button
+from consts import BLACK, WHITE
+
+
+@pytest.fixture(autouse=True)
+def fonts():
+    pg.font.init()
+    funcs.clear_text_cache()
+    yield
+    funcs.clear_text_cache()
+    pg.font.quit()
+
+
+def test_repeated_text_is_rendered_once():
+    first = funcs.renderText('Greedy', 20, WHITE)
+    assert funcs.renderText('Greedy', 20, WHITE) is first
+    # any part of the key makes a new surface
+    assert funcs.renderText('Greedy', 20, BLACK) is not first
+    assert funcs.renderText('Greedy', 21, WHITE) is not first
+    assert funcs.renderText('Greedy', 20, WHITE, antialias=True) is not first
+    stats = funcs.text_cache_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 4, 4)
+    # one SysFont per size
+    assert stats['fonts'] == 2
+
+
+def test_least_recently_used_text_is_evicted(monkeypatch):
+    monkeypatch.setattr(funcs, 'TEXT_CACHE_SIZE', 3)
+    a = funcs.renderText('a', 20, WHITE)
+    funcs.renderText('b', 20, WHITE)
+    funcs.renderText('c', 20, WHITE)
+    # 'a' is used again, so 'b' is the oldest when 'd' arrives
+    assert funcs.renderText('a', 20, WHITE) is a
+    funcs.renderText('d', 20, WHITE)
+    stats = funcs.text_cache_stats()
+    assert (stats['entries'], stats['evictions']) == (3, 1)
+    assert funcs.renderText('a', 20, WHITE) is a
+    assert funcs.text_cache_stats()['misses'] == 4
+    funcs.renderText('b', 20, WHITE)
+    assert funcs.text_cache_stats()['misses'] == 5
+
+
+def test_buttons_redraw_from_the_cache():
+    surface = pg.Surface((200, 100))
+    button = Button((100, 50), 30, 'Start', col=WHITE)
+    for _ in range(10):
+        button.show(surface)
+    stats = funcs.text_cache_stats()
+    # textRect renders in black once, show renders in white once
+    assert stats['misses'] == 2
+    assert stats['hits'] == 9
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from backtracking import BacktrackingSearch
+from topology import topology
+
+
+@pytest.mark.parametrize('size', [2, 5, 11])
+def test_bridge_carriers_are_the_two_shared_neighbours(size):
+    topo = topology(size)
+    for i, bridges in enumerate(topo.bridges):
+        for target, a, b in bridges:
+            assert target not in topo.neighbors[i] and target != i
+            shared = set(topo.neighbors[i]) & set(topo.neighbors[target])
+            assert shared == {a, b}
+    # every bridge is listed from both ends
+    pairs = {(i, t) for i, bridges in enumerate(topo.bridges) for t, _, _ in bridges}
+    assert all((t, i) in pairs for i, t in pairs)
+
+
+def pairwise_connections(search, player):
+    '''the VC check without the bridge table: every pair of groups compares reach'''
+    board = search.board
+    empty = board.empty()
+    reach = [board.dilate(g) & empty for g in board.components(player)]
+    found = []
+    for i in range(len(reach)):
+        for j in range(i + 1, len(reach)):
+            if (reach[i] & reach[j]).bit_count() >= 2:
+                found.append(reach[i] & reach[j])
+    if player == 1:
+        for edge in board.edges(1):
+            found.extend(g & edge for g in reach if (g & edge).bit_count() >= 2)
+    return sorted(found)
+
+
+@pytest.mark.parametrize('size', [5, 9, 13])
+def test_virtual_connections_match_a_pairwise_scan(size, random_game):
+    rng = random.Random(size)
+    for _ in range(30):
+        moves = random_game(size, rng, rng.randrange(size * size))
+        grid = [[0] * size for _ in range(size)]
+        for r, c, player in moves:
+            grid[r][c] = player
+        search = BacktrackingSearch.from_grid(grid)
+        for player in (1, 2):
+            assert sorted(search._virtual_connections(player)) == pairwise_connections(search, player)
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from bitboard import BitBoard
+from union_find import HexUnionFind
+
+
+def test_blue_row_wins_on_its_last_stone():
+    uf = HexUnionFind(5)
+    for c in range(4):
+        uf.place(2, c, 2)
+        assert uf.winner() == 0
+    uf.place(2, 4, 2)
+    assert uf.winner() == 2
+    assert not uf.has_won(1)
+
+
+def test_green_column_wins():
+    uf = HexUnionFind(4)
+    for r in range(4):
+        uf.place(r, 1, 1)
+    assert uf.winner() == 1
+
+
+def test_diagonal_neighbours_connect():
+    # (r, c) touches (r - 1, c + 1) and (r + 1, c - 1), not (r + 1, c + 1)
+    uf = HexUnionFind(3)
+    for r, c in ((2, 0), (1, 1), (0, 2)):
+        uf.place(r, c, 1)
+    assert uf.winner() == 1
+    other = HexUnionFind(3)
+    for r, c in ((0, 0), (1, 1), (2, 2)):
+        other.place(r, c, 1)
+    assert other.winner() == 0
+
+
+@pytest.mark.parametrize('size', [3, 5, 8, 11])
+def test_matches_bitboard_on_random_games(size, random_game):
+    rng = random.Random(size)
+    for _ in range(20):
+        uf = HexUnionFind(size)
+        board = BitBoard(size)
+        for r, c, player in random_game(size, rng):
+            uf.place(r, c, player)
+            board.set(r, c, player)
+            assert uf.has_won(1) == board.has_won(1)
+            assert uf.has_won(2) == board.has_won(2)
+        # a full Hex board has exactly one winner
+        assert uf.winner() == board.winner() != 0
+
+
+@pytest.mark.parametrize('size', [4, 7, 10])
+def test_undo_restores_every_earlier_verdict(size, random_game):
+    rng = random.Random(100 + size)
+    uf = HexUnionFind(size)
+    verdicts = []
+    moves = random_game(size, rng)
+    for r, c, player in moves:
+        verdicts.append((uf.has_won(1), uf.has_won(2)))
+        uf.place(r, c, player)
+    for (r, c, player), before in zip(reversed(moves), reversed(verdicts)):
+        uf.undo()
+        assert (uf.has_won(1), uf.has_won(2)) == before
+    assert uf.parent == list(range(size * size + 4))
+    assert uf.owner == [0] * (size * size)
+
+
+def test_from_grid_and_copy_agree_with_incremental_placement(random_game):
+    rng = random.Random(7)
+    size = 9
+    moves = random_game(size, rng)[:40]
+    grid = [[0] * size for _ in range(size)]
+    uf = HexUnionFind(size)
+    for r, c, player in moves:
+        grid[r][c] = player
+        uf.place(r, c, player)
+    built = HexUnionFind.from_grid(grid)
+    assert built.winner() == uf.winner()
+    assert built.trail == []
+    copy = uf.copy()
+    for r in range(size):
+        for c in range(size):
+            if grid[r][c] == 0:
+                copy.place(r, c, 2)
+                uf.place(r, c, 2)
+                assert copy.has_won(2) == uf.has_won(2)
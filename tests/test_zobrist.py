@@ -0,0 +1,27 @@
+from zobrist import TranspositionTable, MISS
+
+
+def test_probe_returns_stored_values():
+    table = TranspositionTable(16)
+    table.store(5, 'five')
+    assert table.probe(5, 'kind') == 'five'
+    assert table.probe(6, 'kind') is MISS
+    assert table.stats()['kinds']['kind'] == {'lookups': 2, 'hits': 1, 'hit_rate': 0.5}
+
+
+def test_clear_resets_everything():
+    table = TranspositionTable(8)
+    table.new_search()
+    table.store(3, 'a', cost=9)
+    table.store(11, 'b', cost=1)
+    table.probe(3, 'kind')
+    table.clear()
+    fresh = TranspositionTable(8)
+    for name in ('keys', 'values', 'costs', 'generations', 'generation'):
+        assert getattr(table, name) == getattr(fresh, name)
+    assert table.stats() == fresh.stats()
+    # replacement after a clear behaves as in a new table
+    for t in (table, fresh):
+        t.store(3, 'x', cost=5)
+        t.store(11, 'y', cost=1)
+    assert table.keys == fresh.keys
@@ -1,10 +1,16 @@
 """
 CPU Strategy Time Complexity Dashboard.
-Reads cpu_performance_log.json and plots avg_execution_time vs session index.
+Reads the performance log (perf_log) and plots avg_execution_time vs session index.
 """
-import json
 from collections import defaultdict
 
+import perf_log
+from consts import STRATEGIES
+
+# plot colour of each strategy
+COLORS = {'Greedy': 'green', 'D&C': 'blue', 'DP': 'gold', 'Backtracking': 'orange',
+          'Alpha-Beta': 'limegreen', 'MCTS': 'red'}
+
 
 def show_time_complexity_dashboard():
     """Read log file, group by strategy, plot all on same graph. Opens matplotlib window."""
@@ -14,17 +20,7 @@ def show_time_complexity_dashboard():
         print("matplotlib not installed. Run: pip install matplotlib")
         return
 
-    log_file = 'cpu_performance_log.json'
-    try:
-        with open(log_file, 'r') as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        data = []
-    except json.JSONDecodeError:
-        data = []
-
-    if not isinstance(data, list):
-        data = []
+    data = list(perf_log.read_entries())
 
     if not data:
         fig, ax = plt.subplots(figsize=(10, 6))
@@ -57,8 +53,7 @@ def show_time_complexity_dashboard():
         return
 
     fig, ax = plt.subplots(figsize=(10, 6))
-    colors = {'Greedy': 'green', 'D&C': 'blue', 'DP': 'gold', 'Backtracking': 'orange'}
-    for strategy in ('Greedy', 'D&C', 'DP', 'Backtracking'):
+    for strategy in STRATEGIES:
         if strategy not in by_strategy:
             continue
         times = by_strategy[strategy]
@@ -67,7 +62,7 @@ def show_time_complexity_dashboard():
         # Convert seconds to milliseconds for finer scale on Y-axis
         times_ms = [t * 1000.0 for t in times]
         x = list(range(1, len(times_ms) + 1))
-        ax.plot(x, times_ms, 'o-', label=strategy, color=colors.get(strategy, 'gray'))
+        ax.plot(x, times_ms, 'o-', label=strategy, color=COLORS.get(strategy, 'gray'))
 
     ax.set_title('CPU Strategy Time Complexity Comparison')
     ax.set_xlabel('Session Number')
@@ -0,0 +1,120 @@
+"""
+Precomputed board topology, one cached object per board size.
+
+Cell (r, c) has the flat index r * size + c. A Topology holds, for every
+flat index:
+- its coordinates;
+- its hex neighbours, as flat indices;
+- which board edges it lies on;
+- its bridges: (target, carrier, carrier) triples, where target is
+  two steps away and the two carriers are the cells between them. With
+  both carriers empty, stones on the cell and the target are virtually
+  connected (the backtracking search's VC check reads these).
+Tables for other offset patterns (e.g. the DP's directed neighbours) are
+built on request and cached as well.
+
+Each Topology also owns scratch buffers for searches on boards of its
+size: a distance array, a visited array marked with stamps (so it never
+needs clearing), and a stack. A search borrows them for the duration of
+one call, so hot loops do not allocate per call. Searches run one at a
+time in a process, and a borrower must not call into another borrower
+of the same buffer.
+"""
+from consts import OFFSETS
+
+INF = float('inf')
+
+# bit flags of Topology.edges
+TOP, BOTTOM, LEFT, RIGHT = 1, 2, 4, 8
+
+# neighbour offsets that change the column ("horizontal") or only the row
+HORIZONTAL = tuple(o for o in OFFSETS if o[1] != 0)
+VERTICAL = tuple(o for o in OFFSETS if o[1] == 0)
+
+# neighbours in ring order around a cell; each consecutive pair carries a bridge
+_RING = ((-1, 0), (-1, 1), (0, 1), (1, 0), (1, -1), (0, -1))
+
+_TOPOLOGIES = {}
+
+
+def topology(size):
+    '''the shared Topology of a size x size board'''
+    topo = _TOPOLOGIES.get(size)
+    if topo is None:
+        topo = _TOPOLOGIES[size] = Topology(size)
+    return topo
+
+
+class Topology:
+    def __init__(self, size):
+        n = self.size = size
+        self.cells = n * n
+        self.coords = tuple(divmod(i, n) for i in range(n * n))
+        self._tables = {}
+        self.neighbors = self.offset_table(OFFSETS)
+        self.top = tuple(range(n))
+        self.bottom = tuple((n - 1) * n + c for c in range(n))
+        self.left = tuple(r * n for r in range(n))
+        self.right = tuple(r * n + n - 1 for r in range(n))
+        edges = [0] * (n * n)
+        for flag, cells in ((TOP, self.top), (BOTTOM, self.bottom),
+                            (LEFT, self.left), (RIGHT, self.right)):
+            for i in cells:
+                edges[i] |= flag
+        self.edges = tuple(edges)
+        bridges = []
+        for r, c in self.coords:
+            found = []
+            for k in range(6):
+                (ar, ac), (br, bc) = _RING[k], _RING[(k + 1) % 6]
+                tr, tc = r + ar + br, c + ac + bc
+                if 0 <= tr < n and 0 <= tc < n:
+                    found.append((tr * n + tc, (r + ar) * n + c + ac, (r + br) * n + c + bc))
+            bridges.append(tuple(found))
+        self.bridges = tuple(bridges)
+        # search workspaces
+        self._infs = (INF,) * (n * n)
+        self.dist = list(self._infs)
+        self.visited = [0] * (n * n)
+        self.stamp = 0
+        self.stack = [0] * (n * n)
+
+    def start_edge(self, player):
+        '''flat cells of the edge player connects from (Green top, Blue left)'''
+        return self.top if player == 1 else self.left
+
+    def goal_flag(self, player):
+        '''edge flag of the edge player connects to (Green bottom, Blue right)'''
+        return BOTTOM if player == 1 else RIGHT
+
+    def offset_table(self, offsets):
+        '''per flat cell, the in-board cells at the given offsets as flat indices'''
+        key = ('flat', tuple(offsets))
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = tuple(
+                tuple((r + dr) * self.size + c + dc for dr, dc in offsets
+                      if 0 <= r + dr < self.size and 0 <= c + dc < self.size)
+                for r, c in self.coords)
+        return table
+
+    def cell_table(self, offsets):
+        '''per flat cell, the in-board cells at the given offsets as (r, c)'''
+        key = ('cell', tuple(offsets))
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = tuple(
+                tuple((r + dr, c + dc) for dr, dc in offsets
+                      if 0 <= r + dr < self.size and 0 <= c + dc < self.size)
+                for r, c in self.coords)
+        return table
+
+    def distances(self):
+        '''the shared distance buffer, reset to INF'''
+        self.dist[:] = self._infs
+        return self.dist
+
+    def new_stamp(self):
+        '''a fresh mark for the visited buffer; cells marked before read as unvisited'''
+        self.stamp += 1
+        return self.stamp
@@ -0,0 +1,118 @@
+"""
+Incremental win detection for Hex with a disjoint-set (union-find) forest.
+
+Every cell is a node, plus four virtual edge nodes (top, bottom, left,
+right). Placing a stone unions it with its same-coloured neighbours and
+with the virtual nodes of the edges it touches; a player has won as soon
+as their two virtual edge nodes share a root. The verdict is cached per
+player when a stone is placed, so asking "has X won" is O(1).
+
+Placements can be undone in LIFO order, which is what search needs. To
+keep undo exact the forest uses union by rank without path compression,
+so a placement costs O(log n) finds instead of O(alpha(n)).
+"""
+from topology import topology
+
+
+class HexUnionFind:
+    """Union-find over a size x size board with virtual edge nodes."""
+
+    def __init__(self, size):
+        self.size = size
+        cells = size * size
+        self.TOP, self.BOTTOM, self.LEFT, self.RIGHT = range(cells, cells + 4)
+        self.parent = list(range(cells + 4))
+        self.rank = [0] * (cells + 4)
+        self.owner = [0] * cells
+        self.won = [False, False, False]
+        # undo records: (cell, player, was_won, [(child, root, old_rank), ...])
+        self.trail = []
+        self.neighbors = topology(size).neighbors
+
+    @classmethod
+    def from_grid(cls, grid):
+        '''builds the forest for an existing list-of-lists board (values other than 1/2 are empty)'''
+        uf = cls(len(grid))
+        for r, row in enumerate(grid):
+            for c, v in enumerate(row):
+                if v == 1 or v == 2:
+                    uf.place(r, c, v)
+        uf.trail.clear()
+        return uf
+
+    def copy(self):
+        other = HexUnionFind.__new__(HexUnionFind)
+        other.size = self.size
+        other.TOP, other.BOTTOM, other.LEFT, other.RIGHT = self.TOP, self.BOTTOM, self.LEFT, self.RIGHT
+        other.parent = self.parent[:]
+        other.rank = self.rank[:]
+        other.owner = self.owner[:]
+        other.won = self.won[:]
+        other.trail = []
+        other.neighbors = self.neighbors
+        return other
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    def _union(self, a, b, merges):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.rank[ra] > self.rank[rb]:
+            ra, rb = rb, ra
+        # ra hangs under rb
+        merges.append((ra, rb, self.rank[rb]))
+        self.parent[ra] = rb
+        if self.rank[ra] == self.rank[rb]:
+            self.rank[rb] += 1
+
+    def place(self, r, c, player):
+        '''puts a stone of player (1 or 2) on the empty cell (r, c)'''
+        n = self.size
+        idx = r * n + c
+        owner = self.owner
+        owner[idx] = player
+        merges = []
+        for nb in self.neighbors[idx]:
+            if owner[nb] == player:
+                self._union(idx, nb, merges)
+        if player == 1:
+            if r == 0:
+                self._union(idx, self.TOP, merges)
+            if r == n - 1:
+                self._union(idx, self.BOTTOM, merges)
+            start, goal = self.TOP, self.BOTTOM
+        else:
+            if c == 0:
+                self._union(idx, self.LEFT, merges)
+            if c == n - 1:
+                self._union(idx, self.RIGHT, merges)
+            start, goal = self.LEFT, self.RIGHT
+        was_won = self.won[player]
+        if not was_won and merges and self.find(start) == self.find(goal):
+            self.won[player] = True
+        self.trail.append((idx, player, was_won, merges))
+
+    def undo(self):
+        '''takes back the most recent placement'''
+        idx, player, was_won, merges = self.trail.pop()
+        for child, root, old_rank in reversed(merges):
+            self.parent[child] = child
+            self.rank[root] = old_rank
+        self.owner[idx] = 0
+        self.won[player] = was_won
+
+    def has_won(self, player):
+        return self.won[player]
+
+    def winner(self):
+        '''2 if Blue has won, 1 if Green has won, 0 otherwise'''
+        if self.won[2]:
+            return 2
+        if self.won[1]:
+            return 1
+        return 0
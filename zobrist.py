@@ -0,0 +1,128 @@
+"""
+Zobrist hashing and a bounded transposition table for board searches.
+
+Every (player, cell) pair gets a fixed random 64-bit key; the hash of a
+position is the XOR of the keys of its stones, so placing or removing a
+stone updates it with a single XOR. Keys are generated from a seed per
+board size, so every process (including parallel_eval workers) computes
+the same hashes.
+
+TranspositionTable maps hashes to cached results in a fixed number of
+slots. Each hash may live in two slots (its own index and the neighbour
+index ^ 1). The first slot is "cost preferred": an entry from an older
+search, or one that was cheaper to compute, makes way for the new one.
+The second slot always takes the newest entry.
+"""
+import random
+
+# one salt per kind of cached result, so they never collide in the table
+WIN_CHECK = 'win_check'
+VIRTUAL_CONNECTIONS = 'virtual_connections'
+REFUTATION = 'refutation'
+_salt_rng = random.Random(0x2B0B)
+SALTS = {kind: _salt_rng.getrandbits(64)
+         for kind in (WIN_CHECK, VIRTUAL_CONNECTIONS, REFUTATION)}
+
+_KEYS = {}
+
+
+def zobrist_keys(size):
+    '''(green keys, blue keys, move keys) per flat cell index, cached per size'''
+    keys = _KEYS.get(size)
+    if keys is None:
+        rng = random.Random(0x7A11 + size)
+        cells = size * size
+        keys = tuple([rng.getrandbits(64) for _ in range(cells)] for _ in range(3))
+        _KEYS[size] = keys
+    return keys
+
+
+def board_hash(board):
+    '''Zobrist hash of a BitBoard from scratch'''
+    green_keys, blue_keys, _ = zobrist_keys(board.size)
+    h = 0
+    n = board.size
+    for r, c in board.cells(board.green):
+        h ^= green_keys[r * n + c]
+    for r, c in board.cells(board.blue):
+        h ^= blue_keys[r * n + c]
+    return h
+
+
+# returned by probe() when the key is not in the table
+MISS = object()
+
+
+class TranspositionTable:
+    """Fixed-size hash -> result cache with hit-rate statistics."""
+
+    def __init__(self, capacity=1 << 16):
+        # round up to a power of two so the slot index is a mask
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.mask = size - 1
+        self.keys = [None] * size
+        self.values = [None] * size
+        self.costs = [0] * size
+        self.generations = [0] * size
+        self.generation = 0
+        self.hits = {}
+        self.misses = {}
+        self.stores = 0
+        self.replacements = 0
+
+    def new_search(self):
+        '''ages every stored entry so a new search may overwrite them first'''
+        self.generation += 1
+
+    def probe(self, key, kind):
+        idx = key & self.mask
+        for slot in (idx, idx ^ 1):
+            if self.keys[slot] == key:
+                self.hits[kind] = self.hits.get(kind, 0) + 1
+                return self.values[slot]
+        self.misses[kind] = self.misses.get(kind, 0) + 1
+        return MISS
+
+    def store(self, key, value, cost=1):
+        idx = key & self.mask
+        keys = self.keys
+        if keys[idx] is None or keys[idx] == key or self.generations[idx] != self.generation \
+                or self.costs[idx] <= cost:
+            slot = idx
+        else:
+            slot = idx ^ 1
+        if keys[slot] is not None and keys[slot] != key:
+            self.replacements += 1
+        keys[slot] = key
+        self.values[slot] = value
+        self.costs[slot] = cost
+        self.generations[slot] = self.generation
+        self.stores += 1
+
+    def clear(self):
+        '''empties the table and resets its bookkeeping and statistics, as if new'''
+        size = len(self.keys)
+        self.keys[:] = [None] * size
+        self.values[:] = [None] * size
+        self.costs[:] = [0] * size
+        self.generations[:] = [0] * size
+        self.generation = 0
+        self.hits.clear()
+        self.misses.clear()
+        self.stores = 0
+        self.replacements = 0
+
+    def stats(self):
+        '''lookups, hits and hit rate per kind of result, plus store counts'''
+        out = {'stores': self.stores, 'replacements': self.replacements, 'kinds': {}}
+        for kind in sorted(set(self.hits) | set(self.misses)):
+            hits = self.hits.get(kind, 0)
+            lookups = hits + self.misses.get(kind, 0)
+            out['kinds'][kind] = {
+                'lookups': lookups,
+                'hits': hits,
+                'hit_rate': hits / lookups if lookups else 0.0,
+            }
+        return out